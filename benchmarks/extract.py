@@ -0,0 +1,90 @@
+"""Throughput and output-size benchmark for HTML text extraction.
+
+Extracts every saved page in a corpus with the old BeautifulSoup
+``get_text()`` path and with ``src.extract.TextExtractor`` and reports
+throughput together with how many characters, estimated tokens and research
+chunks each one hands to the LLM stages.
+
+    python benchmarks/extract.py                        # benchmarks/corpus/*.html
+    python benchmarks/extract.py artifacts/.page_cache/blobs -n 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.extract import TextExtractor  # noqa: E402
+from src.rate_limit import estimate_tokens  # noqa: E402
+
+
+def load_corpus(paths):
+    """Read every file under ``paths`` that looks like an HTML page."""
+    pages = []
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        for file in files:
+            with open(file, "rb") as f:
+                body = f.read()
+            if b"<html" in body[:2048].lower():
+                pages.append(body)
+    return pages
+
+
+def extractors():
+    from bs4 import BeautifulSoup
+
+    engines = {"bs4 get_text (html.parser)": lambda body: BeautifulSoup(body, "html.parser").get_text()}
+    try:
+        import lxml  # noqa: F401
+        engines["bs4 get_text (lxml)"] = lambda body: BeautifulSoup(body, "lxml").get_text()
+    except ImportError:
+        pass
+    engines[f"TextExtractor ({TextExtractor.name})"] = TextExtractor().extract
+    return engines
+
+
+def measure(extract, pages, runs):
+    """Median wall time over ``runs`` passes of the corpus, and the texts of the last pass."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        texts = [extract(body) for body in pages]
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=[os.path.join(PROJECT_ROOT, "benchmarks", "corpus")])
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    args = parser.parse_args()
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    pages = load_corpus(args.paths)
+    if not pages:
+        sys.exit(f"No HTML pages found in {args.paths}")
+    corpus_mb = sum(len(body) for body in pages) / 1e6
+
+    print(f"## {len(pages)} pages, {corpus_mb:.2f} MB (median of {args.runs} passes)\n")
+    print("| extractor | ms/page | MB/s | chars out | est. tokens | chunks |")
+    print("|---|---:|---:|---:|---:|---:|")
+    for name, extract in extractors().items():
+        seconds, texts = measure(extract, pages, args.runs)
+        chars = sum(len(text) for text in texts)
+        tokens = sum(estimate_tokens(text) for text in texts)
+        chunks = sum(len(splitter.split_text(text)) for text in texts)
+        print(f"| {name} | {seconds / len(pages) * 1000:.2f} | {corpus_mb / seconds:.1f} | "
+              f"{chars} | {tokens} | {chunks} |")
+
+
+if __name__ == "__main__":
+    main()
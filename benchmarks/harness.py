@@ -0,0 +1,192 @@
+"""Offline stand-ins for the pipeline's external services, used by the benchmarks and tests.
+
+``FakeChatModel`` replaces the provider chat model with one that sleeps for a
+configurable first-token latency and decode rate and reports token usage
+like OpenAI does; ``FixtureServer`` serves saved pages over local HTTP; and
+``offline_pipeline`` wires both (plus a fixture search backend pointing at
+the server) into the pipeline's configuration for the duration of a block.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from functools import partial
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+import src.llm as llm_registry
+from src.rate_limit import estimate_tokens
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+PROVIDER = "BENCH"
+
+# Calls and tokens seen by every FakeChatModel in the process
+llm_stats = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_stats_lock = threading.Lock()
+
+
+def reset_llm_stats():
+    with _stats_lock:
+        llm_stats.update(calls=0, prompt_tokens=0, completion_tokens=0)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers after ``latency`` seconds plus ``output_tokens / tokens_per_second``.
+
+    Replies are deterministic filler of ``output_tokens`` words (valid JSON
+    when the prompt asks for JSON) so repeated runs do identical work.
+    """
+
+    model_name: str = "fake-bench"
+    temperature: float = 0.7
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    output_tokens: int = 200
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-bench"
+
+    def _reply(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        words = [f"w{(len(prompt) + i) % 997}" for i in range(self.output_tokens)]
+        if "JSON format" in prompt:
+            return json.dumps({"section 1": words[:self.output_tokens // 2], "section 2": words[self.output_tokens // 2:]})
+        return " ".join(words)
+
+    def _usage(self, messages):
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        with _stats_lock:
+            llm_stats["calls"] += 1
+            llm_stats["prompt_tokens"] += prompt_tokens
+            llm_stats["completion_tokens"] += self.output_tokens
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": self.output_tokens,
+                "total_tokens": prompt_tokens + self.output_tokens}
+
+    def _decode_time(self, tokens):
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _result(self, messages):
+        message = AIMessage(content=self._reply(messages), response_metadata={"token_usage": self._usage(messages)})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages):
+        pieces = self._reply(messages).split(" ")
+        for i, piece in enumerate(pieces):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece if i == 0 else f" {piece}"))
+
+    def _usage_chunk(self, messages):
+        usage = self._usage(messages)
+        return ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata={
+            "input_tokens": usage["prompt_tokens"], "output_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"]}))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency + self._decode_time(self.output_tokens))
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency + self._decode_time(self.output_tokens))
+        return self._result(messages)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            time.sleep(self._decode_time(1))
+            yield chunk
+        yield self._usage_chunk(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            await asyncio.sleep(self._decode_time(1))
+            yield chunk
+        yield self._usage_chunk(messages)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves the files in ``directory`` on an ephemeral localhost port and counts requests."""
+
+    def __init__(self, directory=CORPUS_DIR):
+        self.directory = directory
+        self.requests = 0
+        server = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                server.requests += 1
+                super().do_GET()
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=directory))
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def urls(self):
+        return [f"{self.base_url}/{name}" for name in sorted(os.listdir(self.directory)) if name.endswith(".html")]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@contextmanager
+def offline_pipeline(workdir, corpus_dir=CORPUS_DIR, **fake_llm):
+    """Point the pipeline at local fixtures and a FakeChatModel while the block runs.
+
+    Artifacts, caches and the topic store are created under ``workdir``,
+    which also becomes the working directory. Yields the FixtureServer.
+    """
+    # Load .env first, as main() does, so the overrides below win and are restored on top of it
+    llm_registry.load_env()
+    os.makedirs(workdir, exist_ok=True)
+    search_dir = os.path.join(workdir, "search")
+    os.makedirs(search_dir, exist_ok=True)
+
+    with FixtureServer(corpus_dir) as server:
+        with open(os.path.join(search_dir, "default.json"), "w") as f:
+            json.dump({"results": [{"url": url, "title": os.path.basename(url), "content": ""}
+                                   for url in server.urls()]}, f)
+        env = {
+            "LLM_PROVIDER": PROVIDER, f"{PROVIDER}_RPM": "1000000000", f"{PROVIDER}_TPM": "1000000000",
+            "LLM_CACHE": "off", "SEARCH_BACKEND": "fixture", "SEARCH_FIXTURE_DIR": search_dir, "SEARCH_CACHE": "off",
+            "PAGE_CACHE_DIR": os.path.join(workdir, "page_cache"),
+            "TOPIC_DB_PATH": os.path.join(workdir, "topics.sqlite3"),
+        }
+        saved_env = {name: os.environ.get(name) for name in env}
+        saved_provider = llm_registry.PROVIDERS.get(PROVIDER)
+        cwd = os.getcwd()
+        os.environ.update(env)
+        llm_registry.PROVIDERS[PROVIDER] = (lambda: FakeChatModel(**fake_llm), "model_name")
+        llm_registry._clients.pop(PROVIDER, None)
+        os.chdir(workdir)
+        try:
+            yield server
+        finally:
+            os.chdir(cwd)
+            llm_registry._clients.pop(PROVIDER, None)
+            if saved_provider is None:
+                llm_registry.PROVIDERS.pop(PROVIDER, None)
+            else:
+                llm_registry.PROVIDERS[PROVIDER] = saved_provider
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
@@ -0,0 +1,70 @@
+"""Import-time report for the Content Weaver entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters and
+reports the median cumulative import time of each module together with the
+heaviest imports it pulls in.
+
+    python benchmarks/importtime.py                 # src.agents and main
+    python benchmarks/importtime.py src.agents -n 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_importtime(stderr: str):
+    """Return [(module, depth, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), depth, self_us, cumulative_us))
+    return rows
+
+
+def measure(module: str, runs: int):
+    """Median total import time of ``module`` and of each import it triggers directly."""
+    totals, children = [], {}
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+        pending = []
+        # -X importtime prints children before their parent
+        for name, depth, _, cumulative in parse_importtime(proc.stderr):
+            if depth == 1:
+                pending.append((name, cumulative))
+            elif depth == 0:
+                if name == module:
+                    totals.append(cumulative)
+                    for child, child_cumulative in pending:
+                        children.setdefault(child, []).append(child_cumulative)
+                pending = []
+    return statistics.median(totals), {name: statistics.median(v) for name, v in children.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["src.agents", "main"])
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        total, heaviest = measure(module, args.runs)
+        print(f"## import {module}: {total / 1000:.1f} ms (median of {args.runs})\n")
+        print("| direct import | cumulative ms |")
+        print("|---|---:|")
+        for name, cumulative in sorted(heaviest.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"| {name} | {cumulative / 1000:.1f} |")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""End-to-end pipeline benchmark against a fake LLM and a local page server.
+
+Each scenario runs in a fresh interpreter (so peak RSS is per scenario)
+with ``benchmarks.harness.offline_pipeline``: search results come from a
+fixture backend, pages from ``benchmarks/corpus`` over local HTTP, and
+every LLM call from a FakeChatModel with the given latency and decode rate.
+Results are printed as a table and written as JSON; pass an earlier result
+file to ``--compare`` to flag regressions.
+
+    python benchmarks/pipeline.py                                   # 1 and 8 topics
+    python benchmarks/pipeline.py --topics 1 4 16 --latency 0.5 --tps 80
+    python benchmarks/pipeline.py --output new.json --compare benchmarks/results/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Metrics compared by --compare, and whether larger values are worse
+COMPARED = {"wall_seconds": True, "llm_calls": True, "prompt_tokens": True, "completion_tokens": True,
+            "peak_rss_mb": True, "topics_per_minute": False}
+
+
+def run_scenario(topics: int, workers: int, llm_concurrency: int, fake_llm: dict) -> dict:
+    """Run ``topics`` topics through the pipeline in this process and return its metrics."""
+    from benchmarks.harness import llm_stats, offline_pipeline, reset_llm_stats
+    from src.agents import OrchestratorAgent
+    from src.llm import set_llm_concurrency
+
+    with tempfile.TemporaryDirectory() as workdir, offline_pipeline(workdir, **fake_llm) as server:
+        reset_llm_stats()
+        set_llm_concurrency(llm_concurrency)
+        # Same shape as main.process_pending_topics: one shared orchestrator, a pool of topic workers
+        orchestrator = OrchestratorAgent()
+        titles = [f"Benchmark topic {i}" for i in range(topics)]
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda title: orchestrator.execute(title, force=True), titles))
+        wall = time.monotonic() - start
+        orchestrator.close()
+
+        stage_durations = {}
+        for result in results:
+            for stage, timing in result["stage_timings"].items():
+                stage_durations.setdefault(stage, []).append(timing["duration"])
+        return {
+            "topics": topics,
+            "wall_seconds": round(wall, 3),
+            "topics_per_minute": round(topics / wall * 60, 2),
+            "stage_seconds": {stage: round(statistics.median(durations), 3)
+                              for stage, durations in stage_durations.items()},
+            "llm_calls": llm_stats["calls"],
+            "prompt_tokens": llm_stats["prompt_tokens"],
+            "completion_tokens": llm_stats["completion_tokens"],
+            "page_requests": server.requests,
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """Print metric changes against ``baseline``; return the regressions beyond ``tolerance``."""
+    regressions = []
+    print(f"\n## Compared with {baseline.get('commit')}\n")
+    print("| scenario | metric | baseline | current | change |")
+    print("|---|---|---:|---:|---:|")
+    for name, scenario in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for metric, higher_is_worse in COMPARED.items():
+            old, new = before.get(metric), scenario.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            print(f"| {name} | {metric} | {old} | {new} | {change:+.1%} |")
+            if (change if higher_is_worse else -change) > tolerance:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, nargs="+", default=[1, 8], help="scenario sizes to run")
+    parser.add_argument("--workers", type=int, default=4, help="topics processed concurrently")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds to first token")
+    parser.add_argument("--tps", type=float, default=200.0, help="fake LLM output tokens per second")
+    parser.add_argument("--output-tokens", type=int, default=200, help="fake LLM tokens per reply")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)  # internal: run one scenario
+    args = parser.parse_args()
+
+    fake_llm = {"latency": args.latency, "tokens_per_second": args.tps, "output_tokens": args.output_tokens}
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.workers, args.llm_concurrency, fake_llm)))
+        return
+
+    results = {"commit": _git_commit(), "python": platform.python_version(),
+               "config": dict(fake_llm, workers=args.workers, llm_concurrency=args.llm_concurrency),
+               "scenarios": {}}
+    for topics in args.topics:
+        proc = subprocess.run([sys.executable, __file__, "--scenario", str(topics), "--workers", str(args.workers),
+                               "--llm-concurrency", str(args.llm_concurrency), "--latency", str(args.latency),
+                               "--tps", str(args.tps), "--output-tokens", str(args.output_tokens)],
+                              cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+        results["scenarios"][f"{topics}_topics"] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    stages = sorted({stage for s in results["scenarios"].values() for stage in s["stage_seconds"]})
+    print("| scenario | wall s | topics/min | LLM calls | prompt tok | completion tok | peak RSS MB | "
+          + " | ".join(f"{stage} s" for stage in stages) + " |")
+    print("|---" * (7 + len(stages)) + "|")
+    for name, s in results["scenarios"].items():
+        print(f"| {name} | {s['wall_seconds']} | {s['topics_per_minute']} | {s['llm_calls']} | {s['prompt_tokens']} | "
+              f"{s['completion_tokens']} | {s['peak_rss_mb']} | "
+              + " | ".join(str(s["stage_seconds"].get(stage, "")) for stage in stages) + " |")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
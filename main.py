@@ -1,73 +1,193 @@
-import json
+import argparse
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from src.agents import OrchestratorAgent
+from src.budget import BatchBudget
+from src.call_executor import call_executors
+from src.event_loop import run_sync
+from src.llm import load_env, set_llm_concurrency
+from src.pipeline import StagedPipeline
+from src.router import get_router
+from src.topic_store import TopicStore, akeep_alive, keep_alive, worker_id
 
-def load_topics():
-    """Load topics from topics.json file"""
-    try:
-        with open('topics.json', 'r') as f:
-            data = json.load(f)
-            return data.get('topics', [])
-    except FileNotFoundError:
-        print("Error: topics.json not found")
-        return []
+TOPICS_FILE = 'topics.json'
 
-def update_topic_status(topic_id, status):
-    """Update topic status in topics.json"""
-    try:
-        with open('topics.json', 'r') as f:
-            data = json.load(f)
-        
-        for topic in data['topics']:
-            if topic['id'] == topic_id:
-                topic['status'] = status
-                if status == 'completed':
-                    from datetime import datetime
-                    topic['completed_at'] = datetime.now().isoformat()[:10]
-                break
-        
-        with open('topics.json', 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        return True
-    except Exception as e:
-        print(f"Error updating topic status: {e}")
-        return False
+def open_topic_store():
+    """Open the shared topic store, picking up any topics newly added to topics.json"""
+    store = TopicStore()
+    store.import_json(TOPICS_FILE)
+    return store
 
-def process_next_topic():
-    """Process the next topic with status 'new'"""
-    topics = load_topics()
-    new_topics = [t for t in topics if t['status'] == 'new']
+def process_next_topic(force=False):
+    """Process the next topic with status 'new'; ``force`` reruns stages whose checkpoints are still valid"""
+    store = open_topic_store()
+    owner = worker_id()
+    claimed = store.claim(owner)
     
-    if not new_topics:
+    if not claimed:
         print("No new topics to process")
         return
     
-    topic = new_topics[0]
+    topic = claimed[0]
     topic_id = topic['id']
     topic_title = topic['title']
     
     print(f"Processing topic: {topic_title} ({topic_id})")
-    
-    # Update status to in_progress
-    update_topic_status(topic_id, 'in_progress')
+    store.export_json(TOPICS_FILE)
     
     # Create topic-specific directory
     topic_dir = f"artifacts/{topic_id}"
     os.makedirs(topic_dir, exist_ok=True)
     
-    # Process the topic
+    # Process the topic, keeping its lease alive; if the process dies the lease
+    # expires and another worker picks the topic up again
     orchestrator = OrchestratorAgent()
-    narrative = orchestrator.execute(topic_title)
+    try:
+        with keep_alive(store, topic_id, owner):
+            orchestrator.execute(topic_title, description=topic.get('description'), force=force)
+    except Exception:
+        store.fail(topic_id, owner)
+        store.export_json(TOPICS_FILE)
+        raise
+    finally:
+        orchestrator.close()
     
-    # Update status to completed
-    update_topic_status(topic_id, 'completed')
+    # Update status to completed, unless the lease expired and another worker took the topic over
+    completed = store.complete(topic_id, owner)
+    store.export_json(TOPICS_FILE)
     
+    if not completed:
+        print(f"\n⚠️ Lease lost on {topic_title}; another worker owns it now, not marking it completed")
+        return
     print(f"\n✅ Completed processing: {topic_title}")
     print(f"📁 Artifacts saved to: {topic_dir}")
 
+def _total_tokens(token_usage):
+    """Sum total_tokens over the per-stage token usage returned by the orchestrator."""
+    return sum(usage.get("total_tokens", 0) for usage in token_usage.values() if usage)
+
+async def _arun_topic(orchestrator, store, topic, owner, force=False):
+    """Run one claimed topic and return its summary row."""
+    start = time.monotonic()
+    try:
+        async with akeep_alive(store, topic['id'], owner):
+            result = await orchestrator.aexecute(topic['title'], description=topic.get('description'),
+                                                    force=force)
+        completed = await asyncio.to_thread(store.complete, topic['id'], owner)
+        if not completed:
+            print(f"⚠️ Lease lost on {topic['id']}; another worker owns it now")
+        row = {"id": topic['id'], "status": "completed" if completed else "lease lost",
+               "seconds": time.monotonic() - start,
+               "tokens": _total_tokens(result["token_usage"])}
+    except Exception as e:
+        print(f"❌ Failed processing {topic['id']}: {e}")
+        await asyncio.to_thread(store.fail, topic['id'], owner)
+        row = {"id": topic['id'], "status": "failed", "seconds": time.monotonic() - start, "tokens": 0}
+    # SQLite and topics.json I/O stay off the event loop the other topics are running on
+    await asyncio.to_thread(store.export_json, TOPICS_FILE)
+    return row
+
+def _run_topic(orchestrator, store, topic, owner, force=False):
+    return run_sync(_arun_topic(orchestrator, store, topic, owner, force))
+
+def _claimed_topics(store, owner):
+    """Claim topics one at a time, as the caller asks for them."""
+    while True:
+        claimed = store.claim(owner)
+        if not claimed:
+            return
+        store.export_json(TOPICS_FILE)
+        yield claimed[0]
+
+def _run_pipelined(orchestrator, store, force=False):
+    """Run every pending topic through a StagedPipeline, so one topic's research overlaps another's writing."""
+    owner = worker_id()
+    pipeline = StagedPipeline()
+    rows = run_sync(pipeline.run(_claimed_topics(store, owner),
+                                 lambda topic: _arun_topic(orchestrator, store, topic, owner, force)))
+    print("\nPipeline stages")
+    print(pipeline.summary())
+    return rows
+
+def _batch_worker(orchestrator, store, force=False):
+    """Claim and run topics one at a time until the queue is empty."""
+    owner = worker_id()
+    rows = []
+    while True:
+        claimed = store.claim(owner)
+        if not claimed:
+            return rows
+        store.export_json(TOPICS_FILE)
+        rows.append(_run_topic(orchestrator, store, claimed[0], owner, force))
+
+def process_pending_topics(max_workers=None, llm_concurrency=None, pipelined=False, force=False):
+    """Process every pending topic with a bounded pool of workers pulling from the topic store.
+
+    With ``pipelined`` the topics go through a StagedPipeline instead, whose
+    per-stage workers (PIPELINE_<STAGE>_WORKERS) replace ``max_workers``.
+    ``force`` reruns every stage instead of reusing checkpoints.
+    """
+    max_workers = max_workers or int(os.getenv("TOPIC_WORKERS", 4))
+    llm_concurrency = llm_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+
+    store = open_topic_store()
+    pending = store.count('new')
+    if not pending:
+        print("No new topics to process")
+        return []
+    print(f"Processing {pending} topics {'pipelined' if pipelined else f'with {max_workers} workers'} "
+          f"and at most {llm_concurrency} concurrent LLM calls")
+
+    set_llm_concurrency(llm_concurrency)
+    # One orchestrator for the whole batch so agents share clients and caches
+    orchestrator = OrchestratorAgent()
+    # BATCH_TOKEN_BUDGET / BATCH_COST_BUDGET cap the whole batch; each topic plans against what is left
+    orchestrator.batch_budget = BatchBudget.from_env()
+    start = time.monotonic()
+    try:
+        if pipelined:
+            rows = _run_pipelined(orchestrator, store, force)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="topic") as pool:
+                workers = [pool.submit(_batch_worker, orchestrator, store, force) for _ in range(max_workers)]
+                rows = [row for worker in workers for row in worker.result()]
+    finally:
+        orchestrator.close()
+    wall_time = time.monotonic() - start
+
+    print("\nBatch summary")
+    print(f"{'topic':40} {'status':10} {'wall s':>8} {'tokens':>8}")
+    for row in rows:
+        print(f"{row['id']:40} {row['status']:10} {row['seconds']:8.1f} {row['tokens']:8}")
+    print(f"{'total':40} {'':10} {wall_time:8.1f} {sum(r['tokens'] for r in rows):8}")
+    if orchestrator.batch_budget is not None:
+        print(f"Batch budget spent: {orchestrator.batch_budget.summary()}")
+    for executor in call_executors():
+        print(f"LLM calls {executor.summary()}")
+    if get_router() is not None:
+        print(f"LLM routing: {get_router().summary()}")
+    return rows
+
 def main():
-    process_next_topic()
+    parser = argparse.ArgumentParser(description="Content Weaver topic runner")
+    parser.add_argument("--batch", action="store_true", help="process all pending topics concurrently")
+    parser.add_argument("--workers", type=int, help="topics processed concurrently (default: TOPIC_WORKERS or 4)")
+    parser.add_argument("--llm-concurrency", type=int,
+                        help="LLM calls in flight across all topics (default: LLM_MAX_CONCURRENCY or 8)")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="with --batch, overlap topics stage by stage (see PIPELINE_* settings)")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun every stage instead of reusing checkpointed outputs")
+    args = parser.parse_args()
+    # Settings read before any provider is built (TOPIC_*, LLM_MAX_CONCURRENCY, PAGE_CACHE_DIR, FETCH_*) may live in .env
+    load_env()
+
+    if args.batch:
+        process_pending_topics(args.workers, args.llm_concurrency, args.pipelined, args.force)
+    else:
+        process_next_topic(args.force)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,61 +1,305 @@
 from abc import ABC, abstractmethod
+import asyncio
+import inspect
 import os
 import json
 import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_tavily import TavilySearch
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from bs4 import BeautifulSoup
-import requests
-
-load_dotenv()
+import time
+from functools import cached_property
+from src.call_executor import get_call_executor
+from src.checkpoint import Checkpoint, fingerprint
+from src.dag import DagExecutor, Stage
+from src.extract import TextExtractor
+from src.event_loop import iterate_sync, run_sync
+from src.fetch import AsyncPageFetcher
+from src.llm import allm_slot, get_llm, get_provider
+from src.page_cache import PageCache
+from src.pipeline import pipeline_stage
+from src.rate_limit import estimate_tokens, get_rate_limiter
+from src.router import get_router
+from src.telemetry import export_otel, record, span, trace_run
+
+# Provider SDKs, LangChain and the HTML/search tooling are imported inside the
+# methods that need them so importing this module (and `python main.py`
+# before any topic is picked) stays cheap; see benchmarks/importtime.md.
+
+def streaming_enabled() -> bool:
+    """STREAM_OUTPUT=1 makes the script and article agents stream even without a token callback."""
+    return os.getenv("STREAM_OUTPUT", "").lower() in ("1", "true", "yes")
+
+def _token_usage(message) -> dict:
+    """Token counts of a model reply in the OpenAI-style shape used across the pipeline."""
+    if message is None:
+        return {}
+    usage = message.response_metadata.get("token_usage")
+    if usage:
+        return usage
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return {"prompt_tokens": usage["input_tokens"], "completion_tokens": usage["output_tokens"],
+                "total_tokens": usage["total_tokens"]}
+    return {}
+
+def _add_usage(total: dict, usage: dict) -> dict:
+    """Sum two OpenAI-style token usage dicts."""
+    return {key: total.get(key, 0) + usage.get(key, 0) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+def _write_artifact(path: str, content: str):
+    """Write a text artifact, recorded as a ``write`` span."""
+    with span("write", path=path) as write_span:
+        data = content.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        write_span.set(bytes=len(data))
+
+async def _in_stage(name: str, awaitable):
+    """Await ``awaitable`` as pipeline stage ``name`` (see src/pipeline.py)."""
+    async with pipeline_stage(name):
+        return await awaitable
 
 class BaseAgent(ABC):
+    # Namespace for the LLM response cache and prefix for <NAMESPACE>_MODEL /
+    # <NAMESPACE>_TEMPERATURE overrides; None for agents that never call an LLM.
+    llm_namespace = None
+
+    def __init__(self, model=None, temperature=None):
+        self.model = model
+        self.temperature = temperature
+
+    @cached_property
+    def llm(self):
+        """Chat model for this agent, taken from the shared provider registry on first use."""
+        return self._get_llm()
+
+    def _get_llm(self, model=None, provider=None):
+        from src.llm_cache import with_llm_cache
+        prefix = self.llm_namespace.upper()
+        if provider is None or provider == get_provider():
+            model = model or self.model or os.getenv(f"{prefix}_MODEL")
+        else:
+            # Model names are per provider, so a fallback provider runs its default model
+            model = None
+        temperature = self.temperature
+        if temperature is None and os.getenv(f"{prefix}_TEMPERATURE"):
+            temperature = float(os.getenv(f"{prefix}_TEMPERATURE"))
+        return with_llm_cache(get_llm(model=model, temperature=temperature, provider=provider), self.llm_namespace)
+
+    def fingerprint(self):
+        """Everything besides its inputs that determines this agent's output (prompt and model config)."""
+        return {
+            "agent": type(self).__name__,
+            "template": getattr(self, "template", None),
+            "provider": get_provider(),
+            "model": getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None),
+            "temperature": getattr(self.llm, "temperature", None),
+        }
+
+    async def _ainvoke(self, chain, inputs: dict, purpose: str, reserve_tokens=None):
+        """Invoke ``chain`` while holding an LLM slot, recorded as an ``llm.<purpose>`` span.
+
+        The provider's call executor bounds its concurrency and retries throttled
+        or failed attempts. With ``reserve_tokens`` every attempt first waits
+        for the provider's rate limiter. With LLM_ROUTER_PROVIDERS set, the
+        router may hedge or fail the call over to another provider, which runs
+        the same prompt on its own model. A reply in the model's response
+        cache is returned before any of that, without touching the provider's
+        limits.
+        """
+        with span(f"llm.{purpose}", agent=type(self).__name__) as llm_span:
+            messages = chain.first.invoke(inputs).to_messages()
+            cache, cache_key, response = await self._response_cache(chain.last, messages)
+            if response is None:
+                # Already looked up here, so the model skips its own lookup and the reply is cached below
+                llm = chain.last.model_copy(update={"cache": False}) if cache else chain.last
+
+                async def call(provider):
+                    if provider != get_provider():
+                        return await self._acall(provider, self._llm_for(provider), messages, reserve_tokens,
+                                                 llm_span)
+                    reply = await self._acall(provider, llm, messages, reserve_tokens, llm_span)
+                    await self._fill_cache(cache, cache_key, reply)
+                    return reply
+
+                router = get_router()
+                response = await (call(get_provider()) if router is None else router.call(call))
+            usage = _token_usage(response)
+            llm_span.set(prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0))
+        return response
+
+    async def _acall(self, provider, llm, messages, reserve_tokens, llm_span):
+        waited = time.perf_counter()
+
+        async def throttle():
+            nonlocal waited
+            await get_rate_limiter(provider).aacquire(reserve_tokens)
+            llm_span.add("throttle_seconds", round(time.perf_counter() - waited, 4))
+            waited = time.perf_counter()
+
+        async def attempt():
+            async with allm_slot():
+                llm_span.set(queue_seconds=round(time.perf_counter() - waited, 4))
+                return await llm.ainvoke(messages)
+
+        return await get_call_executor(provider).call(attempt, throttle if reserve_tokens else None)
+
+    @cached_property
+    def _fallback_llms(self):
+        return {}
+
+    def _llm_for(self, provider):
+        """This agent's model on ``provider``; a fallback provider's is built once, like ``self.llm``."""
+        if provider == get_provider():
+            return self.llm
+        if provider not in self._fallback_llms:
+            self._fallback_llms[provider] = self._get_llm(provider=provider)
+        return self._fallback_llms[provider]
+
+    @staticmethod
+    async def _response_cache(llm, messages):
+        """(cache, key, cached reply) for sending ``messages`` to ``llm``, keyed the way LangChain keys its own lookups.
+
+        The lookup runs in a worker thread (``BaseCache.alookup``), off the event loop.
+        """
+        from langchain_core.caches import BaseCache
+        from langchain_core.load import dumps
+
+        cache = llm.cache if isinstance(llm.cache, BaseCache) else None
+        if cache is None:
+            return None, None, None
+        cache_key = (dumps(messages), llm._get_llm_string())
+        cached = await cache.alookup(*cache_key)
+        return cache, cache_key, cached[0].message if cached else None
+
+    @staticmethod
+    async def _fill_cache(cache, cache_key, message):
+        from langchain_core.outputs import ChatGeneration
+
+        if cache and message is not None:
+            await cache.aupdate(*cache_key, [ChatGeneration(message=message)])
+
+    async def _stream_cache(self, messages):
+        """(cache, key, cached reply as one chunk) for a streamed call; LangChain only caches non-streaming calls."""
+        from langchain_core.messages import AIMessageChunk
+
+        cache, cache_key, message = await self._response_cache(self.llm, messages)
+        if message is None:
+            return cache, cache_key, None
+        return cache, cache_key, AIMessageChunk(content=message.content, response_metadata=message.response_metadata,
+                                                usage_metadata=message.usage_metadata)
+
+    async def _astream_to_file(self, prompt, inputs: dict, output_path: str):
+        """Stream the reply to ``prompt`` as message chunks, appending each to ``output_path`` as it arrives.
+
+        Chunks come from the model's ``astream`` through the call executor; with
+        LLM_ROUTER_PROVIDERS set, a stream that fails before its first chunk
+        moves to the next provider. The response cache is checked and filled
+        here; a cached reply arrives as one chunk.
+        """
+        from langchain_core.messages import message_chunk_to_message
+
+        messages = prompt.invoke(inputs).to_messages()
+        cache, cache_key, cached = await self._stream_cache(messages)
+
+        full = None
+        with open(output_path, "w") as f:
+            if cached:
+                f.write(cached.content)
+                yield cached
+                return
+
+            def open_stream(provider):
+                llm = self._llm_for(provider)
+
+                async def attempt():
+                    async with allm_slot():
+                        async for chunk in llm.astream(messages):
+                            yield chunk
+
+                return get_call_executor(provider).stream(attempt)
+
+            router = get_router()
+            chunks = open_stream(get_provider()) if router is None else router.stream(open_stream)
+            async for chunk in chunks:
+                f.write(chunk.content)
+                f.flush()
+                full = chunk if full is None else full + chunk
+                yield chunk
+        if full is not None:
+            await self._fill_cache(cache, cache_key, message_chunk_to_message(full))
+
+    async def _acollect_stream(self, chunks, on_token=None, purpose="stream"):
+        """Drain an async chunk stream, forwarding text to ``on_token`` (awaited if async); returns (content, token_usage)."""
+        with span(f"llm.{purpose}", agent=type(self).__name__, streamed=True) as llm_span:
+            parts, full = [], None
+            async for chunk in chunks:
+                parts.append(chunk.content)
+                if on_token is not None and inspect.isawaitable(sent := on_token(chunk.content)):
+                    await sent
+                full = chunk if full is None else full + chunk
+            usage = _token_usage(full)
+            llm_span.set(prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0))
+        return "".join(parts), usage
+
+    def _stream(self, prompt, inputs: dict, output_path: str, purpose: str):
+        """Blocking generator over the text of ``_astream_to_file``, traced like a streamed ``aexecute``."""
+        yield from iterate_sync(lambda emit: self._acollect_stream(
+            self._astream_to_file(prompt, inputs, output_path), emit, purpose))
+
     @abstractmethod
-    def execute(self, *args, **kwargs):
+    async def aexecute(self, *args, **kwargs):
         pass
 
+    def execute(self, *args, **kwargs):
+        """Blocking ``aexecute``: runs it on the shared pipeline event loop and waits for the result."""
+        return run_sync(self.aexecute(*args, **kwargs))
+
 class ResearchAgent(BaseAgent):
-    def __init__(self):
-        self.llm = self._get_llm()
-        self.web_search_tool = TavilySearch(max_results=5)
-
-    def _get_llm(self):
-        llm_provider = os.getenv("LLM_PROVIDER")
-        if llm_provider == "GOOGLE":
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.7)
-        elif llm_provider == "OPENAI":
-            return ChatOpenAI(model="gpt-4", temperature=0.7)
-        elif llm_provider == "SARVAM":
-            return ChatOpenAI(
-                openai_api_base="https://api.sarvam.ai/v1/",
-                openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
-                model="sarvam-m", # You might need to specify the exact model name here
-                temperature=0.7
-            )
-        else:
-            raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
-
-    def _scrape_and_chunk(self, urls):
-        all_content = []
-        for url in urls:
-            try:
-                response = requests.get(url, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                text = soup.get_text()
-                all_content.append(text)
-            except Exception as e:
-                print(f"Error scraping {url}: {e}")
-        
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=200
-        )
-        chunks = text_splitter.split_text(" ".join(all_content))
-        return chunks
+    llm_namespace = "research"
+    max_results = 5
+    # Passage size for dedup and ranking; AnalysisAgent repacks passages into full request windows
+    chunk_tokens = 256
+
+    def __init__(self, model=None, temperature=None):
+        super().__init__(model, temperature)
+        self.fetcher = AsyncPageFetcher(cache=PageCache())
+        self.extractor = TextExtractor()
+
+    @cached_property
+    def search(self):
+        from src.search import get_search
+        return get_search(self.max_results)
+
+    async def aclose(self):
+        """Close the fetcher's HTTP client on the running loop."""
+        await self.fetcher.aclose()
+
+    async def _scrape_and_chunk(self, urls):
+        """Return ``(url, chunks)`` for every page that could be fetched, in ``urls`` order."""
+        async with pipeline_stage("fetch"):
+            fetched = await self.fetcher.fetch_all(urls)
+        # Parsing is CPU-bound; keep it off the event loop so other topics' I/O is not held up
+        async with pipeline_stage("extract"):
+            return await asyncio.to_thread(self._extract_and_chunk, fetched)
+
+    def _extract_and_chunk(self, fetched):
+        from src.chunking import TokenChunker
+
+        chunker = TokenChunker(self.chunk_tokens)
+        pages = []
+        for page in fetched:
+            if page["error"]:
+                print(f"Error scraping {page['url']}: {page['error']}")
+                continue
+            text = self.fetcher.cache.get_text(page["url"], self.extractor.name) if page["from_cache"] else None
+            if text is None:
+                with span("extract", url=page["url"], extractor=self.extractor.name, bytes=len(page["body"])) as extract_span:
+                    text = self.extractor.extract(page["body"])
+                    extract_span.set(chars=len(text))
+                self.fetcher.cache.put_text(page["url"], text, self.extractor.name)
+            # Chunking each page separately keeps track of which source a chunk came from
+            pages.append((page["url"], chunker.split(text)))
+        print(f"Page cache: {self.fetcher.cache.summary()}")
+        return pages
 
     def _generate_topic_id(self, topic: str) -> str:
         """Generate consistent topic_id from topic string."""
@@ -63,56 +307,85 @@ class ResearchAgent(BaseAgent):
         topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
         return topic_id
 
-    def execute(self, topic: str):
+    def fingerprint(self):
+        return {"agent": type(self).__name__, "max_results": self.max_results, "chunk_tokens": self.chunk_tokens,
+                "search_backend": os.getenv("SEARCH_BACKEND", "tavily"),
+                "extractor": self.extractor.name}
+
+    async def aexecute(self, topic: str, description: str = None):
+        """Search, scrape and chunk ``topic``; returns the topic's ChunkStore."""
         print(f"Researching topic: {topic}")
-        search_results = self.web_search_tool.invoke(topic)
-        urls = [result['url'] for result in search_results['results']]
+        async with pipeline_stage("search"):
+            urls = [result['url'] for result in await self.search.asearch(topic)]
         print(f"Found URLs: {urls}")
-        
-        scraped_content_chunks = self._scrape_and_chunk(urls)
-        
+        print(f"Search cache: {self.search.summary()}")
+
+        pages = dict(await self._scrape_and_chunk(urls))
+        return await asyncio.to_thread(self._store, topic, description, urls, pages)
+
+    def _store(self, topic, description, urls, pages):
+        """Write the chunk store and sources.json for the scraped ``pages``."""
+        import numpy as np
+
+        from src.chunk_store import ChunkStore
+        from src.ranking import BM25Index, topic_query
+
+        # Use topic-specific directory with consistent topic_id generation
+        topic_id = self._generate_topic_id(topic)
+        output_dir = f"artifacts/{topic_id}"
+        with span("write", path=output_dir, artifact="chunk store") as write_span:
+            store = ChunkStore.write(output_dir, [(source_id, pages.get(url, [])) for source_id, url in enumerate(urls)])
+            write_span.set(bytes=int(store.index["end"][-1]) if len(store) else 0, chunks=len(store))
+        scores = BM25Index(store).scores(topic_query(topic, description))
+
+        # Relevance of each source to the topic, so it is visible which pages the analysis will draw on
         sources_data = []
-        for i, url in enumerate(urls):
+        for source_id, url in enumerate(urls):
+            chunk_ids = np.flatnonzero(store.sources == source_id)
+            chunk_scores = [round(score, 3) for score in scores[chunk_ids].tolist()]
             sources_data.append({
                 "url": url,
-                "content_preview": scraped_content_chunks[i][:500] if scraped_content_chunks else "No content scraped"
+                "content_preview": store[chunk_ids[0]][:500] if len(chunk_ids) else "No content scraped",
+                "relevance": max(chunk_scores, default=0.0),
+                "chunk_scores": chunk_scores,
             })
 
-        # Use topic-specific directory with consistent topic_id generation
-        topic_id = self._generate_topic_id(topic)
-        output_dir = f"artifacts/{topic_id}"
-        os.makedirs(output_dir, exist_ok=True)
         sources_output_path = os.path.join(output_dir, "sources.json")
-        chunks_output_path = os.path.join(output_dir, "research_chunks.json")
+        _write_artifact(sources_output_path, json.dumps(sources_data, indent=4))
 
-        with open(sources_output_path, "w") as f:
-            json.dump(sources_data, f, indent=4)
+        print(f"Research complete. {len(store)} chunks from {len(pages)} pages; sources saved to {sources_output_path}")
+        return store
 
-        with open(chunks_output_path, "w") as f:
-            json.dump(scraped_content_chunks, f, indent=4)
+class AnalysisAgent(BaseAgent):
+    llm_namespace = "analysis"
+    template = """You are an expert content analyst. Your task is to synthesize the provided research content into a coherent and engaging narrative. 
+        Focus on the core themes, key data points, and a logical flow that would be suitable for a video script and a web article.
 
-        print(f"Research complete. Sources saved to {sources_output_path}")
-        return scraped_content_chunks
+        Research Content:
+        {research_content}
 
-class AnalysisAgent(BaseAgent):
-    def __init__(self):
-        self.llm = self._get_llm()
-
-    def _get_llm(self):
-        llm_provider = os.getenv("LLM_PROVIDER")
-        if llm_provider == "GOOGLE":
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.7)
-        elif llm_provider == "OPENAI":
-            return ChatOpenAI(model="gpt-4", temperature=0.7)
-        elif llm_provider == "SARVAM":
-            return ChatOpenAI(
-                openai_api_base="https://api.sarvam.ai/v1/",
-                openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
-                model="sarvam-m", # You might need to specify the exact model name here
-                temperature=0.7
-            )
-        else:
-            raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
+        Please provide the narrative in Markdown format, outlining the story's core themes, acts, and key data points.
+        """
+    summary_template = """Please provide a concise summary of the following text in at most {max_words} words:
+
+{text}
+
+Summary:"""
+    # Merges a group of summaries into one when they are too long for the narrative prompt together
+    reduce_template = """The following are summaries of different parts of the same research. Combine them into one summary of at most {max_words} words, keeping the key facts, figures and themes:
+
+{text}
+
+Combined summary:"""
+
+    def fingerprint(self):
+        return dict(super().fingerprint(), summary_template=self.summary_template,
+                    reduce_template=self.reduce_template,
+                    dedup_threshold=os.getenv("DEDUP_THRESHOLD", "0.8"),
+                    top_k=os.getenv("SUMMARY_TOP_K", "12"), token_budget=os.getenv("SUMMARY_TOKEN_BUDGET", "4000"),
+                    chunk_max_tokens=os.getenv("CHUNK_MAX_TOKENS", "4000"),
+                    narrative_input_tokens=os.getenv("NARRATIVE_INPUT_TOKENS"),
+                    reduce_max_depth=os.getenv("REDUCE_MAX_DEPTH", "4"))
 
     def _generate_topic_id(self, topic: str) -> str:
         """Generate consistent topic_id from topic string."""
@@ -120,92 +393,160 @@ class AnalysisAgent(BaseAgent):
         topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
         return topic_id
 
-    def execute(self, research_content_chunks: list, topic: str):
+    async def aexecute(self, research_content_chunks: list, topic: str, description: str = None, plan=None):
+        """Summarize the research and write the narrative; ``plan`` (a BudgetPlan) sets the summarization limits."""
         print("Analyzing research content...")
-        template = """You are an expert content analyst. Your task is to synthesize the provided research content into a coherent and engaging narrative. 
-        Focus on the core themes, key data points, and a logical flow that would be suitable for a video script and a web article.
+        from langchain_core.prompts import ChatPromptTemplate
 
-        Research Content:
-        {research_content}
+        from src.budget import default_settings
+        from src.summary_tree import LevelCache
 
-        Please provide the narrative in Markdown format, outlining the story's core themes, acts, and key data points.
-        """
-        
-        prompt = ChatPromptTemplate.from_template(template)
+        prompt = ChatPromptTemplate.from_template(self.template)
         chain = prompt | self.llm
-
-        summarized_content = self._summarize_chunks(research_content_chunks)
-        
-        narrative_response = chain.invoke({"research_content": summarized_content})
-        narrative_content = narrative_response.content
-        token_usage = narrative_response.response_metadata.get("token_usage", {})
-
+        settings = plan.settings if plan is not None else default_settings()
+        output_tokens, model = settings["summary_output_tokens"], settings["summary_model"]
         # Use topic-specific directory with consistent topic_id generation
         topic_id = self._generate_topic_id(topic)
         output_dir = f"artifacts/{topic_id}"
         os.makedirs(output_dir, exist_ok=True)
+        tree = await asyncio.to_thread(LevelCache, os.path.join(output_dir, "summary_tree.json"))
+
+        async with pipeline_stage("summarize"):
+            # Dedup, ranking and packing are CPU-bound; run them off the event loop
+            windows, dedup_report, selected = await asyncio.to_thread(
+                self._select, research_content_chunks, topic, description, settings)
+            summaries, summary_usage = await self._summarize_chunks(windows, output_tokens, model, tree)
+            # However many summaries there are, the narrative prompt gets a bounded amount of text
+            summarized_content, reduce_usage, depth = await self._reduce(summaries, output_tokens, model, tree)
+        await asyncio.to_thread(tree.save)
+
+        async with pipeline_stage("narrate"):
+            narrative_response = await self._ainvoke(chain, {"research_content": summarized_content}, "narrative")
+        narrative_content = narrative_response.content
+        # The stage's cost includes the summarization calls, not just the narrative
+        token_usage = _add_usage(_add_usage(summary_usage, reduce_usage), _token_usage(narrative_response))
+
         output_path = os.path.join(output_dir, "narrative.md")
-        
-        with open(output_path, "w") as f:
-            f.write(narrative_content)
-        
-        print(f"Analysis complete. Narrative saved to {output_path}")
-        return {"content": narrative_content, "token_usage": token_usage}
+        await asyncio.to_thread(_write_artifact, output_path, narrative_content)
 
-    def _summarize_chunks(self, chunks: list):
+        print(f"Analysis complete. Narrative saved to {output_path}")
+        return {"content": narrative_content, "token_usage": token_usage, "dedup": dedup_report,
+                "selected_chunks": selected, "summaries": len(summaries), "reduce_levels": depth}
+
+    def _select(self, research_content_chunks, topic, description, settings):
+        """Dedup, rank and pack the research into summarization windows; returns (windows, dedup report, chunks selected)."""
+        from src.dedup import MinHashDeduplicator
+        from src.ranking import BM25Index, select_chunks, topic_query
+
+        # Syndicated copies of the same story would each cost a summarization call
+        unique_chunks, dedup_report = MinHashDeduplicator().deduplicate(list(research_content_chunks))
+        print(f"Removed {dedup_report['removed_chunks']} of {dedup_report['input_chunks']} chunks as near-duplicates "
+              f"(~{dedup_report['removed_tokens']} tokens)")
+
+        # Spend the summarization budget on the chunks most relevant to the topic
+        scores = BM25Index(unique_chunks).scores(topic_query(topic, description))
+        selected = [unique_chunks[i] for i in
+                    select_chunks(unique_chunks, scores, token_budget=settings["summary_token_budget"])]
+        print(f"Selected {len(selected)} of {len(unique_chunks)} chunks by relevance "
+              f"(~{sum(estimate_tokens(chunk) for chunk in selected)} tokens)")
+        return self._pack(selected, settings["summary_output_tokens"]), dedup_report, len(selected)
+
+    def _pack(self, chunks: list, output_tokens: int = 256):
+        """Merge chunks into as few summarization requests as the provider's context and quota allow."""
+        from src.chunking import TokenChunker, count_tokens, window_tokens
+
+        window = window_tokens(get_provider(), count_tokens(self.summary_template), output_tokens,
+                               int(os.getenv("SUMMARY_MAX_CONCURRENCY", 8)))
+        windows = TokenChunker(window).pack(chunks)
+        print(f"Packed {len(chunks)} chunks into {len(windows)} summarization requests of <= {window} tokens")
+        return windows
+
+    async def _summarize_chunks(self, chunks: list, output_tokens: int = 256, model: str = None, tree=None):
+        """Summarize ``chunks`` concurrently in about ``output_tokens`` each, on ``model`` if given.
+
+        Returns (summaries, summed token usage); a chunk that could not be
+        summarized gets a placeholder.
+        """
         print("Summarizing research chunks...")
-        summaries = []
-        summary_template = """Please provide a concise summary of the following text:
-
-{text}
-
-Summary:"""
-        summary_prompt = ChatPromptTemplate.from_template(summary_template)
-        summary_chain = summary_prompt | self.llm
-
-        # Limit the number of chunks to process to avoid rate limits
-        max_chunks_to_process = 5  # Reduced for testing rate limits
-        import time # Import time for sleep
-        for i, chunk in enumerate(chunks[:max_chunks_to_process]):
-            try:
-                summary = summary_chain.invoke({"text": chunk})
-                summaries.append(summary.content)
-                print(f"Summarized chunk {i+1}/{len(chunks)}")
-            except Exception as e:
-                print(f"Error summarizing chunk {i+1}: {e}")
-                summaries.append("Error summarizing chunk.") # Add a placeholder for failed summaries
-        
-        return "\n\n".join(summaries)
+        summaries, token_usage = await self._map_level(
+            self.summary_template, chunks, output_tokens, model, "summary", tree, 0,
+            lambda i, chunk: "Error summarizing chunk.")
+        print(f"Summarized {len(chunks)} chunks")
+        return summaries, token_usage
+
+    async def _reduce(self, summaries: list, output_tokens: int, model: str = None, tree=None):
+        """Tree-reduce ``summaries`` until they fit the narrative prompt; returns (text, token usage, levels).
+
+        Each level groups the current texts into requests that fit the
+        provider's window and merges every group in parallel, so the number
+        of levels grows only logarithmically with the number of summaries.
+        """
+        from src.chunking import TokenChunker, count_tokens, window_tokens
+        from src.budget import output_tokens as expected_output_tokens
+        from src.summary_tree import narrative_input_tokens, reduce_max_depth
+
+        target = narrative_input_tokens(get_provider(), count_tokens(self.template), expected_output_tokens("narrative"))
+        window = window_tokens(get_provider(), count_tokens(self.reduce_template), output_tokens,
+                               int(os.getenv("SUMMARY_MAX_CONCURRENCY", 8)))
+        texts, token_usage, depth = summaries, {}, 0
+        while len(texts) > 1 and sum(count_tokens(text) for text in texts) > target and depth < reduce_max_depth():
+            groups = TokenChunker(window).group(texts)
+            if len(groups) >= len(texts):
+                break  # no two texts fit in one request
+            depth += 1
+            # A group that could not be merged is passed up unchanged
+            texts, level_usage = await self._map_level(self.reduce_template, groups, output_tokens, model,
+                                                       "reduce", tree, depth, lambda i, group: group)
+            token_usage = _add_usage(token_usage, level_usage)
+            print(f"Reduced {len(groups)} groups of summaries at level {depth}")
+        return "\n\n".join(texts), token_usage, depth
+
+    async def _map_level(self, template, texts, output_tokens, model, purpose, tree, depth, on_error):
+        """Run ``template`` over every text concurrently; one level of the summary tree.
+
+        A level whose inputs are unchanged since an earlier run is read from
+        ``tree`` instead. Returns (outputs, summed token usage).
+        """
+        from langchain_core.prompts import ChatPromptTemplate
+
+        key = tree.key(template, model or self.fingerprint()["model"], output_tokens, texts) if tree else None
+        with span("summary.level", purpose=purpose, depth=depth, inputs=len(texts)) as level_span:
+            cached = tree.get(key) if tree else None
+            if cached is not None:
+                level_span.set(cached=True)
+                return cached, {}
+
+            chain = ChatPromptTemplate.from_template(template) | (self._get_llm(model) if model else self.llm)
+            running = asyncio.Semaphore(int(os.getenv("SUMMARY_MAX_CONCURRENCY", 8)))
+
+            async def run(text):
+                async with running:
+                    # Wait until the provider's RPM/TPM budget admits this request
+                    reserve = estimate_tokens(template + text) + output_tokens
+                    # ~0.75 words per token
+                    inputs = {"text": text, "max_words": output_tokens * 3 // 4}
+                    return await self._ainvoke(chain, inputs, purpose, reserve_tokens=reserve)
+
+            results = await asyncio.gather(*(run(text) for text in texts), return_exceptions=True)
+
+            outputs, token_usage, failed = [], {}, 0
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    print(f"Error in {purpose} request {i+1}: {result}")
+                    outputs.append(on_error(i, texts[i]))
+                    failed += 1
+                else:
+                    outputs.append(result.content)
+                    token_usage = _add_usage(token_usage, _token_usage(result))
+            level_span.set(failed=failed)
+            # Only complete levels are reused
+            if tree and not failed:
+                tree.put(key, depth, outputs)
+        return outputs, token_usage
 
 class ScriptwritingAgent(BaseAgent):
-    def __init__(self):
-        self.llm = self._get_llm()
-
-    def _get_llm(self):
-        llm_provider = os.getenv("LLM_PROVIDER")
-        if llm_provider == "GOOGLE":
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.7)
-        elif llm_provider == "OPENAI":
-            return ChatOpenAI(model="gpt-4", temperature=0.7)
-        elif llm_provider == "SARVAM":
-            return ChatOpenAI(
-                openai_api_base="https://api.sarvam.ai/v1/",
-                openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
-                model="sarvam-m", # You might need to specify the exact model name here
-                temperature=0.7
-            )
-        else:
-            raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
-
-    def _generate_topic_id(self, topic: str) -> str:
-        """Generate consistent topic_id from topic string."""
-        topic_id = re.sub(r'[^a-zA-Z0-9\s-]', '', topic.lower())
-        topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
-        return topic_id
-
-    def execute(self, narrative: str, topic: str):
-        print("Generating video script...")
-        template = """You are an expert video scriptwriter. Your task is to transform the provided narrative into a conversational and engaging video script.
+    llm_namespace = "scriptwriting"
+    template = """You are an expert video scriptwriter. Your task is to transform the provided narrative into a conversational and engaging video script.
         The script should be suitable for a 'tech voice' YouTube channel.
 
         Narrative:
@@ -213,100 +554,108 @@ class ScriptwritingAgent(BaseAgent):
 
         Please provide the video script in Markdown format, including sections for introduction, main points, and conclusion.
         """
-        
-        prompt = ChatPromptTemplate.from_template(template)
-        chain = prompt | self.llm
 
-        video_script_response = chain.invoke({"narrative": narrative})
-        video_script_content = video_script_response.content
-        token_usage = video_script_response.response_metadata.get("token_usage", {})
+    def _generate_topic_id(self, topic: str) -> str:
+        """Generate consistent topic_id from topic string."""
+        topic_id = re.sub(r'[^a-zA-Z0-9\s-]', '', topic.lower())
+        topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
+        return topic_id
 
+    def _output_path(self, topic: str) -> str:
         # Use topic-specific directory with consistent topic_id generation
         topic_id = self._generate_topic_id(topic)
         output_dir = f"artifacts/{topic_id}"
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "script.md")
-        
-        with open(output_path, "w") as f:
-            f.write(video_script_content)
+        return os.path.join(output_dir, "script.md")
+
+    def stream(self, narrative: str, topic: str):
+        """Yield the script as it is generated, appending each piece to script.md as it arrives."""
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompt = ChatPromptTemplate.from_template(self.template)
+        yield from self._stream(prompt, {"narrative": narrative}, self._output_path(topic), "script")
+
+    async def aexecute(self, narrative: str, topic: str, on_token=None):
+        """Generate the script; streams it (and feeds ``on_token``) when a callback is given or STREAM_OUTPUT is set."""
+        print("Generating video script...")
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompt = ChatPromptTemplate.from_template(self.template)
+        output_path = self._output_path(topic)
+
+        if on_token is not None or streaming_enabled():
+            video_script_content, token_usage = await self._acollect_stream(
+                self._astream_to_file(prompt, {"narrative": narrative}, output_path), on_token, "script")
+        else:
+            chain = prompt | self.llm
+            video_script_response = await self._ainvoke(chain, {"narrative": narrative}, "script")
+            video_script_content = video_script_response.content
+            token_usage = _token_usage(video_script_response)
+            await asyncio.to_thread(_write_artifact, output_path, video_script_content)
         
         print(f"Video script generated and saved to {output_path}")
         return {"content": video_script_content, "token_usage": token_usage}
 
 class ArticleWriterAgent(BaseAgent):
-    def __init__(self):
-        self.llm = self._get_llm()
-
-    def _get_llm(self):
-        llm_provider = os.getenv("LLM_PROVIDER")
-        if llm_provider == "GOOGLE":
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.7)
-        elif llm_provider == "OPENAI":
-            return ChatOpenAI(model="gpt-4", temperature=0.7)
-        elif llm_provider == "SARVAM":
-            return ChatOpenAI(
-                openai_api_base="https://api.sarvam.ai/v1/",
-                openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
-                model="sarvam-m", # You might need to specify the exact model name here
-                temperature=0.7
-            )
-        else:
-            raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
-
-    def _generate_topic_id(self, topic: str) -> str:
-        """Generate consistent topic_id from topic string."""
-        topic_id = re.sub(r'[^a-zA-Z0-9\s-]', '', topic.lower())
-        topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
-        return topic_id
-
-    def execute(self, narrative: str, topic: str):
-        print("Generating web article...")
-        template = """You are an expert article writer. Your task is to transform the provided narrative into a well-structured, long-form article suitable for a website or blog.
+    llm_namespace = "article_writing"
+    template = """You are an expert article writer. Your task is to transform the provided narrative into a well-structured, long-form article suitable for a website or blog.
 
         Narrative:
         {narrative}
 
         Please provide the article in Markdown format, including a clear title, headings, and subheadings.
         """
-        
-        prompt = ChatPromptTemplate.from_template(template)
-        chain = prompt | self.llm
 
-        web_article_response = chain.invoke({"narrative": narrative})
-        web_article_content = web_article_response.content
-        token_usage = web_article_response.response_metadata.get("token_usage", {})
+    def _generate_topic_id(self, topic: str) -> str:
+        """Generate consistent topic_id from topic string."""
+        topic_id = re.sub(r'[^a-zA-Z0-9\s-]', '', topic.lower())
+        topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
+        return topic_id
 
+    def _output_path(self, topic: str) -> str:
         # Use topic-specific directory with consistent topic_id generation
         topic_id = self._generate_topic_id(topic)
         output_dir = f"artifacts/{topic_id}"
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "article.md")
-        
-        with open(output_path, "w") as f:
-            f.write(web_article_content)
+        return os.path.join(output_dir, "article.md")
+
+    def stream(self, narrative: str, topic: str):
+        """Yield the article as it is generated, appending each piece to article.md as it arrives."""
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompt = ChatPromptTemplate.from_template(self.template)
+        yield from self._stream(prompt, {"narrative": narrative}, self._output_path(topic), "article")
+
+    async def aexecute(self, narrative: str, topic: str, on_token=None):
+        """Generate the article; streams it (and feeds ``on_token``) when a callback is given or STREAM_OUTPUT is set."""
+        print("Generating web article...")
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompt = ChatPromptTemplate.from_template(self.template)
+        output_path = self._output_path(topic)
+
+        if on_token is not None or streaming_enabled():
+            web_article_content, token_usage = await self._acollect_stream(
+                self._astream_to_file(prompt, {"narrative": narrative}, output_path), on_token, "article")
+        else:
+            chain = prompt | self.llm
+            web_article_response = await self._ainvoke(chain, {"narrative": narrative}, "article")
+            web_article_content = web_article_response.content
+            token_usage = _token_usage(web_article_response)
+            await asyncio.to_thread(_write_artifact, output_path, web_article_content)
         
         print(f"Web article generated and saved to {output_path}")
         return {"content": web_article_content, "token_usage": token_usage}
 
 class VisualAssetAgent(BaseAgent):
-    def __init__(self):
-        self.llm = self._get_llm()
-
-    def _get_llm(self):
-        llm_provider = os.getenv("LLM_PROVIDER")
-        if llm_provider == "GOOGLE":
-            return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.7)
-        elif llm_provider == "OPENAI":
-            return ChatOpenAI(model="gpt-4", temperature=0.7)
-        elif llm_provider == "SARVAM":
-            return ChatOpenAI(
-                openai_api_base="https://api.sarvam.ai/v1/",
-                openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
-                model="sarvam-m", # You might need to specify the exact model name here
-                temperature=0.7
-            )
-        else:
-            raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
+    llm_namespace = "visual_assets"
+    template = """You are an expert art director. Your task is to read the provided video script and suggest appropriate visual assets (e.g., diagrams, photos, stock footage) for each section.
+
+        Video Script:
+        {video_script}
+
+        Please provide the visual asset suggestions in JSON format, where each key is a section of the script and the value is a list of suggested visuals.
+        """
 
     def _generate_topic_id(self, topic: str) -> str:
         """Generate consistent topic_id from topic string."""
@@ -314,22 +663,16 @@ class VisualAssetAgent(BaseAgent):
         topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
         return topic_id
 
-    def execute(self, video_script: str, topic: str):
+    async def aexecute(self, video_script: str, topic: str):
         print("Suggesting visual assets...")
-        template = """You are an expert art director. Your task is to read the provided video script and suggest appropriate visual assets (e.g., diagrams, photos, stock footage) for each section.
+        from langchain_core.prompts import ChatPromptTemplate
 
-        Video Script:
-        {video_script}
-
-        Please provide the visual asset suggestions in JSON format, where each key is a section of the script and the value is a list of suggested visuals.
-        """
-        
-        prompt = ChatPromptTemplate.from_template(template)
+        prompt = ChatPromptTemplate.from_template(self.template)
         chain = prompt | self.llm
 
-        visual_assets_response = chain.invoke({"video_script": video_script})
+        visual_assets_response = await self._ainvoke(chain, {"video_script": video_script}, "visual_assets")
         visual_assets_content = visual_assets_response.content
-        token_usage = visual_assets_response.response_metadata.get("token_usage", {})
+        token_usage = _token_usage(visual_assets_response)
 
         # Use topic-specific directory with consistent topic_id generation
         topic_id = self._generate_topic_id(topic)
@@ -337,13 +680,12 @@ class VisualAssetAgent(BaseAgent):
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, "shotlist.json")
         
-        with open(output_path, "w") as f:
-            # Attempt to parse as JSON and re-dump for pretty printing
-            try:
-                json_content = json.loads(visual_assets_content)
-                json.dump(json_content, f, indent=4)
-            except json.JSONDecodeError:
-                f.write(visual_assets_content) # Write as plain text if not valid JSON
+        # Attempt to parse as JSON and re-dump for pretty printing
+        try:
+            content = json.dumps(json.loads(visual_assets_content), indent=4)
+        except json.JSONDecodeError:
+            content = visual_assets_content # Write as plain text if not valid JSON
+        await asyncio.to_thread(_write_artifact, output_path, content)
         
         print(f"Visual asset suggestions generated and saved to {output_path}")
         return {"content": visual_assets_content, "token_usage": token_usage}
@@ -355,6 +697,12 @@ class OrchestratorAgent(BaseAgent):
         self.scriptwriting_agent = ScriptwritingAgent()
         self.article_writer_agent = ArticleWriterAgent()
         self.visual_asset_agent = VisualAssetAgent()
+        # BatchBudget shared by every topic this orchestrator runs, if the batch has one
+        self.batch_budget = None
+
+    def close(self):
+        """Release the HTTP clients the agents opened on the pipeline loop; call when done with the orchestrator."""
+        run_sync(self.research_agent.aclose())
 
     def _generate_topic_id(self, topic: str) -> str:
         """Generate consistent topic_id from topic string."""
@@ -364,83 +712,221 @@ class OrchestratorAgent(BaseAgent):
         topic_id = re.sub(r'[\s-]+', '-', topic_id).strip('-')
         return topic_id
 
-    def execute(self, topic: str, simulate_llm_calls: bool = False):
+    def _simulate(self, agent_name: str, artifact: str, output_dir: str):
+        """Copy a canned artifact into the topic directory instead of calling the LLM."""
+        print(f"Simulating {agent_name} output...")
+        with open(f"simulated_artifacts/{artifact}", "r") as f:
+            content = f.read()
+        # Write simulated artifact to topic-specific directory for test verification
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, artifact), "w") as f:
+            f.write(content)
+        return {"content": content, "token_usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}} # Simulated token usage
+
+    # Files each stage writes into the topic directory
+    STAGE_OUTPUTS = {
+        "research": ["sources.json", "chunks.txt", "chunks.npy"],
+        "analysis": ["narrative.md"],
+        "scriptwriting": ["script.md"],
+        "article_writing": ["article.md"],
+        "visual_assets": ["shotlist.json"],
+    }
+
+    def _restore(self, name: str, manifest: dict, output_dir: str):
+        """Rebuild a skipped stage's return value from its checkpoint."""
+        if name == "research":
+            from src.chunk_store import ChunkStore
+            return ChunkStore(output_dir)
+        # Nothing was spent on this stage in this run
+        return dict(manifest["result"], token_usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0})
+
+    @staticmethod
+    def _max_age(name: str):
+        """Seconds a stage's checkpoint stays reusable; only research, which follows the web, expires."""
+        if name == "research":
+            return float(os.getenv("RESEARCH_CHECKPOINT_MAX_AGE", 24 * 3600))
+        return None
+
+    @staticmethod
+    def _reusable(name: str, result, output_dir: str) -> bool:
+        """Whether a stage's result is worth checkpointing.
+
+        Research with no chunks, or whose sources mostly failed to fetch
+        (more than RESEARCH_MAX_FAILED_SOURCES of them), was likely a search
+        or network outage rather than the topic's real material.
+        """
+        if name != "research":
+            return True
+        if not len(result):
+            return False
+        with open(os.path.join(output_dir, "sources.json"), "r") as f:
+            sources = json.load(f)
+        failed = sum(1 for source in sources if not source.get("chunk_scores"))
+        return failed <= float(os.getenv("RESEARCH_MAX_FAILED_SOURCES", 0.5)) * len(sources)
+
+    def _checkpointed(self, checkpoint, name, run, config, statuses, force):
+        """Wrap a stage so it is skipped when a checkpoint for the same inputs and config exists."""
+        async def stage(**inputs):
+            with span(f"stage.{name}") as stage_span:
+                def lookup():
+                    # Upstream results are hashed by content; token usage does not affect outputs
+                    digests = {key: value["content"] if isinstance(value, dict)
+                               else value.digest() if hasattr(value, "digest") else value
+                               for key, value in inputs.items()}
+                    input_hash = fingerprint(config(), digests)
+                    return input_hash, None if force else checkpoint.load(name, input_hash, self._max_age(name))
+
+                # Hashing reads the chunk store and the stage's output files; keep it off the event loop
+                input_hash, manifest = await asyncio.to_thread(lookup)
+                if manifest is not None:
+                    print(f"Skipping {name}: inputs unchanged since last run")
+                    statuses[name] = "skipped"
+                    stage_span.set(status="skipped")
+                    return await asyncio.to_thread(self._restore, name, manifest, checkpoint.output_dir)
+
+                await asyncio.to_thread(checkpoint.invalidate, name)
+                result = run(**inputs)
+                if inspect.isawaitable(result):
+                    result = await result
+                if await asyncio.to_thread(self._reusable, name, result, checkpoint.output_dir):
+                    await asyncio.to_thread(checkpoint.save, name, input_hash, self.STAGE_OUTPUTS[name],
+                                            None if name == "research" else result)
+                else:
+                    print(f"Not checkpointing {name}: too little came back to reuse on the next run")
+                statuses[name] = "ran"
+                stage_span.set(status="ran")
+                return result
+        return stage
+
+    def _plan(self, research):
+        """Budget the LLM stages against the research's chunk store before any of them runs."""
+        from src.budget import BudgetPlanner
+        from src.chunking import count_tokens
+
+        with span("plan") as plan_span:
+            prompt_tokens = {
+                "summary": count_tokens(self.analysis_agent.summary_template),
+                "reduce": count_tokens(self.analysis_agent.reduce_template),
+                "narrative": count_tokens(self.analysis_agent.template),
+                "scriptwriting": count_tokens(self.scriptwriting_agent.template),
+                "article_writing": count_tokens(self.article_writer_agent.template),
+                "visual_assets": count_tokens(self.visual_asset_agent.template),
+            }
+            planner = BudgetPlanner(prompt_tokens, get_provider(), self.analysis_agent.fingerprint().get("model"),
+                                    batch=self.batch_budget)
+            plan = planner.plan(research.tokens)
+            plan_span.set(estimated_tokens=plan.estimate["tokens"], estimated_seconds=plan.estimate["seconds"],
+                          estimated_cost=plan.estimate["cost"], decisions=len(plan.decisions),
+                          within_budget=plan.within_budget)
+            record("budget", plan.to_dict())
+        for decision in plan.decisions:
+            print(f"Budget: {decision['action']} (over {', '.join(decision['reason'])}), "
+                  f"~{decision['estimated_tokens']} tokens")
+        return plan
+
+    def _build_stages(self, output_dir: str, simulate_llm_calls: bool, force: bool, statuses: dict, on_token=None):
+        if simulate_llm_calls:
+            plan = lambda research: None
+            analysis = lambda research, topic, description, plan: self._simulate("AnalysisAgent", "narrative.md", output_dir)
+            scriptwriting = lambda analysis, topic: self._simulate("ScriptwritingAgent", "script.md", output_dir)
+            article_writing = lambda analysis, topic: self._simulate("ArticleWriterAgent", "article.md", output_dir)
+            visual_assets = lambda scriptwriting, topic: self._simulate("VisualAssetAgent", "shotlist.json", output_dir)
+        else:
+            plan = self._plan
+            analysis = lambda research, topic, description, plan: self.analysis_agent.aexecute(
+                research, topic, description, plan=plan)
+            # With a token callback the script and article stream; consumers get (stage, token) as text arrives
+            stream_to = lambda stage: (lambda token: on_token(stage, token)) if on_token else None
+            scriptwriting = lambda analysis, topic: _in_stage("write", self.scriptwriting_agent.aexecute(
+                analysis["content"], topic, on_token=stream_to("scriptwriting")))
+            article_writing = lambda analysis, topic: _in_stage("write", self.article_writer_agent.aexecute(
+                analysis["content"], topic, on_token=stream_to("article_writing")))
+            visual_assets = lambda scriptwriting, topic: _in_stage(
+                "visuals", self.visual_asset_agent.aexecute(scriptwriting["content"], topic))
+
+        def config(agent):
+            if simulate_llm_calls and agent is not self.research_agent:
+                return lambda: {"agent": type(agent).__name__, "simulated": True}
+            return agent.fingerprint
+
+        checkpoint = Checkpoint(output_dir)
+        wrap = lambda name, run, agent: self._checkpointed(checkpoint, name, run, config(agent), statuses, force)
+
+        # The plan is cheap and depends on the batch's remaining budget, so it is never checkpointed.
+        # Script and article only need the narrative, so they run side by side;
+        # visual assets start as soon as the script is done.
+        return [
+            Stage("research", wrap("research", self.research_agent.aexecute, self.research_agent),
+                  inputs=["topic", "description"]),
+            Stage("plan", plan, inputs=["research"]),
+            Stage("analysis", wrap("analysis", analysis, self.analysis_agent),
+                  inputs=["research", "topic", "description", "plan"]),
+            Stage("scriptwriting", wrap("scriptwriting", scriptwriting, self.scriptwriting_agent),
+                  inputs=["analysis", "topic"]),
+            Stage("article_writing", wrap("article_writing", article_writing, self.article_writer_agent),
+                  inputs=["analysis", "topic"]),
+            Stage("visual_assets", wrap("visual_assets", visual_assets, self.visual_asset_agent),
+                  inputs=["scriptwriting", "topic"]),
+        ]
+
+    async def aexecute(self, topic: str, simulate_llm_calls: bool = False, force: bool = False, on_token=None,
+                       description: str = None):
+        """Run the pipeline for ``topic``, reusing checkpointed stages unless ``force`` is set.
+
+        Many topics can be in flight on one event loop; ``execute`` runs this
+        on the shared pipeline loop for callers that are not async.
+
+        ``description`` (from topics.json) is added to the topic when ranking research chunks.
+
+        ``on_token(stage, text)`` receives the script and article while they are
+        being generated, before the stages complete.
+        """
         print(f"Orchestrating content creation for topic: {topic}")
         
         topic_id = self._generate_topic_id(topic)
         output_dir = f"artifacts/{topic_id}"
-        
-        # Step 1: Research
-        research_content = self.research_agent.execute(topic)
-        
-        # Step 2: Analysis
-        if simulate_llm_calls:
-            print("Simulating AnalysisAgent output...")
-            with open("simulated_artifacts/narrative.md", "r") as f:
-                narrative_content = f.read()
-            narrative_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0} # Simulated token usage
-            # Write simulated narrative to topic-specific directory for test verification
-            os.makedirs(output_dir, exist_ok=True)
-            narrative_output_path = os.path.join(output_dir, "narrative.md")
-            with open(narrative_output_path, "w") as f:
-                f.write(narrative_content)
-        else:
-            analysis_result = self.analysis_agent.execute(research_content, topic)
-            narrative_content = analysis_result["content"]
-            narrative_token_usage = analysis_result["token_usage"]
-
-        # Step 3: Scriptwriting and Article Writing (in parallel)
-        if simulate_llm_calls:
-            print("Simulating ScriptwritingAgent output...")
-            with open("simulated_artifacts/script.md", "r") as f:
-                video_script_content = f.read()
-            video_script_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0} # Simulated token usage
-            # Write simulated script to topic-specific directory for test verification
-            os.makedirs(output_dir, exist_ok=True)
-            script_output_path = os.path.join(output_dir, "script.md")
-            with open(script_output_path, "w") as f:
-                f.write(video_script_content)
-
-            print("Simulating ArticleWriterAgent output...")
-            with open("simulated_artifacts/article.md", "r") as f:
-                web_article_content = f.read()
-            web_article_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0} # Simulated token usage
-            # Write simulated article to topic-specific directory for test verification
-            os.makedirs(output_dir, exist_ok=True)
-            article_output_path = os.path.join(output_dir, "article.md")
-            with open(article_output_path, "w") as f:
-                f.write(web_article_content)
-        else:
-            script_result = self.scriptwriting_agent.execute(narrative_content, topic)
-            video_script_content = script_result["content"]
-            video_script_token_usage = script_result["token_usage"]
 
-            article_result = self.article_writer_agent.execute(narrative_content, topic)
-            web_article_content = article_result["content"]
-            web_article_token_usage = article_result["token_usage"]
+        statuses = {}
+        executor = DagExecutor(self._build_stages(output_dir, simulate_llm_calls, force, statuses, on_token))
+        # Every span recorded during the run (search, fetches, LLM calls, writes) ends up in
+        # run.json, which is written for failed runs too to show how far they got
+        try:
+            with trace_run("pipeline", topic=topic, topic_id=topic_id) as tracer:
+                results, stage_timings = await executor.arun(topic=topic, description=description)
+        finally:
+            tracer.root.set(**{f"stage.{name}": status for name, status in statuses.items()},
+                            concurrency_limit=get_call_executor(get_provider()).limit.limit)
+            if get_router() is not None:
+                # Process-wide, so it covers this run and every call before it
+                tracer.records["router"] = get_router().to_dict()
+            budget = tracer.records.get("budget")
+            if budget is not None and self.batch_budget is not None:
+                from src.budget import run_spend
+                self.batch_budget.settle(budget["estimate"]["tokens"], budget["estimate"]["cost"],
+                                         *run_spend(tracer, budget))
+            tracer.write(os.path.join(output_dir, "run.json"))
+            if os.getenv("TELEMETRY_EXPORTER", "").lower() == "otlp":
+                export_otel(tracer)
+        telemetry = tracer.totals()
 
-        # Step 4: Visual Asset Suggestion
-        if simulate_llm_calls:
-            print("Simulating VisualAssetAgent output...")
-            with open("simulated_artifacts/shotlist.json", "r") as f:
-                visual_assets_content = f.read()
-            visual_assets_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0} # Simulated token usage
-            # Write simulated shotlist to topic-specific directory for test verification
-            os.makedirs(output_dir, exist_ok=True)
-            shotlist_output_path = os.path.join(output_dir, "shotlist.json")
-            with open(shotlist_output_path, "w") as f:
-                f.write(visual_assets_content)
-        else:
-            visual_assets_result = self.visual_asset_agent.execute(video_script_content, topic)
-            visual_assets_content = visual_assets_result["content"]
-            visual_assets_token_usage = visual_assets_result["token_usage"]
-        
         total_token_usage = {
-            "analysis": narrative_token_usage,
-            "scriptwriting": video_script_token_usage,
-            "article_writing": web_article_token_usage,
-            "visual_assets": visual_assets_token_usage
+            name: results[name]["token_usage"]
+            for name in ("analysis", "scriptwriting", "article_writing", "visual_assets")
         }
 
+        for name, timing in sorted(stage_timings.items(), key=lambda item: item[1]["start"]):
+            print(f"  {name}: {timing['start']:.2f}s -> {timing['end']:.2f}s ({timing['duration']:.2f}s, {statuses.get(name)})")
+        print(f"  {telemetry['llm_calls']} LLM calls, {telemetry['prompt_tokens']} prompt + "
+              f"{telemetry['completion_tokens']} completion tokens, {telemetry['bytes_fetched'] / 1024:.0f} KiB fetched, "
+              f"{telemetry['cache_hits']} cache hits")
         print("Orchestration complete.")
-        return {"video_script": video_script_content, "web_article": web_article_content, "visual_assets": visual_assets_content, "token_usage": total_token_usage}
+        return {
+            "video_script": results["scriptwriting"]["content"],
+            "web_article": results["article_writing"]["content"],
+            "visual_assets": results["visual_assets"]["content"],
+            "token_usage": total_token_usage,
+            "stage_timings": stage_timings,
+            "stages": statuses,
+            "telemetry": telemetry,
+            "budget": tracer.records.get("budget"),
+        }
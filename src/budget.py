@@ -0,0 +1,291 @@
+import hashlib
+import json
+import math
+import os
+import threading
+
+from src.chunking import window_tokens
+from src.summary_tree import narrative_input_tokens, reduce_calls, reduce_max_depth
+
+# Expected reply length of each LLM step when nothing better is known;
+# override with the matching environment variable.
+OUTPUT_TOKENS = {
+    "summary": ("SUMMARY_OUTPUT_TOKENS", 256),
+    "narrative": ("NARRATIVE_OUTPUT_TOKENS", 1200),
+    "scriptwriting": ("SCRIPT_OUTPUT_TOKENS", 1500),
+    "article_writing": ("ARTICLE_OUTPUT_TOKENS", 2000),
+    "visual_assets": ("VISUAL_OUTPUT_TOKENS", 800),
+}
+
+# USD per million (prompt, completion) tokens; models not listed have no cost estimate
+PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gemini-pro": (0.5, 1.5),
+    "gemini-1.5-flash": (0.075, 0.3),
+}
+
+# Cheaper model of each provider for the summarization (map) calls; SUMMARY_CHEAP_MODEL overrides
+CHEAP_MAP_MODELS = {
+    "OPENAI": "gpt-4o-mini",
+    "GOOGLE": "gemini-1.5-flash",
+}
+
+# Degradation stops here: below these the narrative has too little to work with
+MIN_SUMMARY_TOKEN_BUDGET = 1000
+MIN_SUMMARY_OUTPUT_TOKENS = 96
+
+
+def _env_number(name, cast=float):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+def output_tokens(stage: str) -> int:
+    name, default = OUTPUT_TOKENS[stage]
+    return int(os.getenv(name, default))
+
+
+def default_settings() -> dict:
+    """Analysis settings when no plan is given: the configured ones, undegraded."""
+    return {
+        "summary_token_budget": int(os.getenv("SUMMARY_TOKEN_BUDGET", 4000)),
+        "summary_output_tokens": output_tokens("summary"),
+        "summary_model": None,
+    }
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """USD cost of the tokens on ``model``, or None if its price is unknown."""
+    price = PRICES.get(model)
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1e6
+
+
+def _min_limit(*limits):
+    limits = [limit for limit in limits if limit is not None]
+    return min(limits) if limits else None
+
+
+class BatchBudget:
+    """Token and cost allowance shared by the topics of one batch.
+
+    Each topic reserves its planned estimate when it is planned, so topics
+    running side by side do not all plan against the same remainder, and
+    settles the reservation with what it actually spent when it finishes.
+    """
+
+    def __init__(self, max_tokens=None, max_cost=None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.spent = {"tokens": 0, "cost": 0.0}
+        self._reserved = {"tokens": 0, "cost": 0.0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """BATCH_TOKEN_BUDGET / BATCH_COST_BUDGET, or None when neither is set."""
+        max_tokens = _env_number("BATCH_TOKEN_BUDGET", int)
+        max_cost = _env_number("BATCH_COST_BUDGET")
+        return cls(max_tokens, max_cost) if max_tokens is not None or max_cost is not None else None
+
+    def remaining(self) -> dict:
+        with self._lock:
+            return {key: None if limit is None else limit - self.spent[key] - self._reserved[key]
+                    for key, limit in (("tokens", self.max_tokens), ("cost", self.max_cost))}
+
+    def reserve(self, tokens, cost):
+        with self._lock:
+            self._reserved["tokens"] += tokens
+            self._reserved["cost"] += cost or 0.0
+
+    def settle(self, reserved_tokens, reserved_cost, tokens, cost):
+        """Replace a topic's reservation with what it actually spent."""
+        with self._lock:
+            self._reserved["tokens"] -= reserved_tokens
+            self._reserved["cost"] -= reserved_cost or 0.0
+            self.spent["tokens"] += tokens
+            self.spent["cost"] += cost or 0.0
+
+    def summary(self):
+        parts = [f"{self.spent['tokens']} tokens"
+                 + (f" of {self.max_tokens}" if self.max_tokens is not None else "")]
+        if self.max_cost is not None:
+            parts.append(f"${self.spent['cost']:.2f} of ${self.max_cost:.2f}")
+        return ", ".join(parts)
+
+
+class BudgetPlan:
+    """Settings the analysis stage runs with, and why."""
+
+    def __init__(self, settings, limits, estimate, decisions, model):
+        self.settings = settings
+        self.limits = limits
+        self.estimate = estimate
+        self.decisions = decisions
+        self.model = model
+
+    @property
+    def within_budget(self) -> bool:
+        return not _over(self.estimate, self.limits)
+
+    def digest(self) -> str:
+        """Hash of the settings only, so the analysis checkpoint survives a changed limit that changes nothing."""
+        return hashlib.sha256(json.dumps(self.settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def to_dict(self) -> dict:
+        return {"model": self.model, "settings": self.settings, "limits": self.limits,
+                "estimate": self.estimate, "decisions": self.decisions, "within_budget": self.within_budget}
+
+
+def _over(estimate, limits):
+    """Names of the limits the estimate exceeds."""
+    return [key for key, limit in limits.items()
+            if limit is not None and estimate[key] is not None and estimate[key] > limit]
+
+
+class BudgetPlanner:
+    """Pre-flight estimate of one topic's LLM tokens, cost and latency after research.
+
+    The estimate covers the summarization (map) calls over the selected
+    chunks, the levels of reducing their summaries, the narrative, script, article and visual-asset calls, from the
+    chunk store's token counts, the prompt templates and the expected reply
+    lengths. When it exceeds the topic's budget (TOPIC_TOKEN_BUDGET,
+    TOPIC_COST_BUDGET in USD, TOPIC_SECONDS_BUDGET) or what is left of the
+    batch's, the plan degrades step by step, each step recorded as a
+    decision: a cheaper map model (cost only), shorter summaries, then
+    fewer chunks.
+
+    Latency assumes ``LLM_FIRST_TOKEN_SECONDS`` per call plus
+    ``LLM_TOKENS_PER_SECOND`` decoding, with map calls in waves of
+    SUMMARY_MAX_CONCURRENCY.
+    """
+
+    def __init__(self, prompt_tokens: dict, provider: str, model: str, max_tokens=None, max_cost=None,
+                 max_seconds=None, batch: BatchBudget = None):
+        self.prompt_tokens = prompt_tokens
+        self.provider = provider
+        self.model = model
+        self.max_tokens = max_tokens if max_tokens is not None else _env_number("TOPIC_TOKEN_BUDGET", int)
+        self.max_cost = max_cost if max_cost is not None else _env_number("TOPIC_COST_BUDGET")
+        self.max_seconds = max_seconds if max_seconds is not None else _env_number("TOPIC_SECONDS_BUDGET")
+        self.batch = batch
+        self.concurrency = int(os.getenv("SUMMARY_MAX_CONCURRENCY", 8))
+        self.top_k = int(os.getenv("SUMMARY_TOP_K", 12))
+        self.first_token_seconds = float(os.getenv("LLM_FIRST_TOKEN_SECONDS", 1.0))
+        self.tokens_per_second = float(os.getenv("LLM_TOKENS_PER_SECOND", 40))
+
+    def _selected_tokens(self, chunk_tokens, token_budget):
+        """Upper bound on the tokens select_chunks can pick: the largest chunks that fit."""
+        selected, spent = 0, 0
+        for tokens in sorted((int(t) for t in chunk_tokens), reverse=True):
+            if self.top_k and selected == self.top_k:
+                break
+            if not token_budget or spent + tokens <= token_budget:
+                selected += 1
+                spent += tokens
+        return spent
+
+    def _stage(self, calls, prompt_tokens, completion_tokens, model, waves=None):
+        waves = calls if waves is None else waves
+        per_call = completion_tokens / calls if calls else 0
+        return {"calls": calls, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "cost": estimate_cost(model, prompt_tokens, completion_tokens),
+                "seconds": round(waves * (self.first_token_seconds + per_call / self.tokens_per_second), 2)}
+
+    def estimate(self, chunk_tokens, settings) -> dict:
+        """Per-stage and total tokens, cost and seconds of a run with ``settings``."""
+        selected = self._selected_tokens(chunk_tokens, settings["summary_token_budget"])
+        summary_output = settings["summary_output_tokens"]
+        window = window_tokens(self.provider, self.prompt_tokens["summary"], summary_output, self.concurrency)
+        calls = math.ceil(selected / window)
+        narrative, script = output_tokens("narrative"), output_tokens("scriptwriting")
+        map_model = settings["summary_model"] or self.model
+
+        # Summaries that do not fit the narrative prompt together are tree-reduced first
+        reduce_window = window_tokens(self.provider, self.prompt_tokens["reduce"], summary_output, self.concurrency)
+        levels = reduce_calls(calls, summary_output, reduce_window,
+                              narrative_input_tokens(self.provider, self.prompt_tokens["narrative"], narrative),
+                              reduce_max_depth())
+        reduce_prompt = sum(inputs * summary_output + level * self.prompt_tokens["reduce"]
+                            for inputs, level in zip([calls] + levels, levels))
+        remaining = levels[-1] if levels else calls
+
+        stages = {
+            "summary": self._stage(calls, selected + calls * self.prompt_tokens["summary"], calls * summary_output,
+                                   map_model, math.ceil(calls / self.concurrency)),
+            "reduce": self._stage(sum(levels), reduce_prompt, sum(levels) * summary_output, map_model,
+                                  sum(math.ceil(level / self.concurrency) for level in levels)),
+            "narrative": self._stage(1, self.prompt_tokens["narrative"] + remaining * summary_output, narrative,
+                                     self.model),
+            "scriptwriting": self._stage(1, self.prompt_tokens["scriptwriting"] + narrative, script, self.model),
+            "article_writing": self._stage(1, self.prompt_tokens["article_writing"] + narrative,
+                                           output_tokens("article_writing"), self.model),
+            "visual_assets": self._stage(1, self.prompt_tokens["visual_assets"] + script,
+                                         output_tokens("visual_assets"), self.model),
+        }
+        costs = [stage["cost"] for stage in stages.values()]
+        seconds = (stages["summary"]["seconds"] + stages["reduce"]["seconds"] + stages["narrative"]["seconds"]
+                   + max(stages["scriptwriting"]["seconds"] + stages["visual_assets"]["seconds"],
+                         stages["article_writing"]["seconds"]))
+        return {"stages": stages, "selected_tokens": selected, "reduce_levels": len(levels),
+                "tokens": sum(stage["prompt_tokens"] + stage["completion_tokens"] for stage in stages.values()),
+                "cost": round(sum(costs), 6) if None not in costs else None,
+                "seconds": round(seconds, 2)}
+
+    def _limits(self):
+        remaining = self.batch.remaining() if self.batch is not None else {"tokens": None, "cost": None}
+        return {"tokens": _min_limit(self.max_tokens, remaining["tokens"]),
+                "cost": _min_limit(self.max_cost, remaining["cost"]),
+                "seconds": self.max_seconds}
+
+    def _next_step(self, settings, estimate, over):
+        """Next degradation step for the exceeded limits as (action, setting, value), or None."""
+        cheap_model = os.getenv("SUMMARY_CHEAP_MODEL") or CHEAP_MAP_MODELS.get(self.provider)
+        if "cost" in over and settings["summary_model"] is None and cheap_model and cheap_model != self.model:
+            return "cheaper_map_model", "summary_model", cheap_model
+        if settings["summary_output_tokens"] > MIN_SUMMARY_OUTPUT_TOKENS:
+            return ("shorter_summaries", "summary_output_tokens",
+                    max(settings["summary_output_tokens"] // 2, MIN_SUMMARY_OUTPUT_TOKENS))
+        # An uncapped selection (0) is halved from what it would select
+        token_budget = settings["summary_token_budget"] or estimate["selected_tokens"]
+        if token_budget > MIN_SUMMARY_TOKEN_BUDGET:
+            return "fewer_chunks", "summary_token_budget", max(token_budget // 2, MIN_SUMMARY_TOKEN_BUDGET)
+        return None
+
+    def plan(self, chunk_tokens) -> BudgetPlan:
+        """Degrade the default settings until the estimate fits the limits (or nothing is left to give)."""
+        settings = default_settings()
+        limits = self._limits()
+        estimate = self.estimate(chunk_tokens, settings)
+        decisions = []
+        while over := _over(estimate, limits):
+            step = self._next_step(settings, estimate, over)
+            if step is None:
+                print(f"Estimated {estimate['tokens']} tokens still exceed the budget ({', '.join(over)}); "
+                      f"running with the smallest plan")
+                break
+            action, setting, value = step
+            decisions.append({"action": action, "reason": over, setting: [settings[setting], value]})
+            settings = dict(settings, **{setting: value})
+            estimate = self.estimate(chunk_tokens, settings)
+            decisions[-1]["estimated_tokens"] = estimate["tokens"]
+
+        if self.batch is not None:
+            self.batch.reserve(estimate["tokens"], estimate["cost"])
+        return BudgetPlan(settings, limits, estimate, decisions, self.model)
+
+
+def run_spend(tracer, plan: dict):
+    """Tokens and cost a traced run actually spent, pricing each call on the model the plan gave it."""
+    tokens, cost = 0, 0.0
+    summary_model = plan["settings"]["summary_model"] or plan["model"]
+    for recorded in tracer.spans:
+        if not recorded.name.startswith("llm."):
+            continue
+        prompt, completion = recorded.attributes.get("prompt_tokens", 0), recorded.attributes.get("completion_tokens", 0)
+        tokens += prompt + completion
+        cost += estimate_cost(summary_model if recorded.name == "llm.summary" else plan["model"], prompt, completion) or 0.0
+    return tokens, cost
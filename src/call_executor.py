@@ -0,0 +1,226 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+
+from src.llm import Slots
+from src.telemetry import current_span
+
+# Cap on how long a single backoff or Retry-After wait may be
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def classify_error(error):
+    """Why an LLM call failed: "throttled" (429), "timeout", "server" (5xx/connection), or None if retrying is pointless."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    code = getattr(error, "code", None)
+    if status is None and isinstance(code, int):
+        status = code
+    name = type(error).__name__
+    text = str(error).lower()
+    if status == 429 or "RateLimit" in name or "ResourceExhausted" in name or "rate limit" in text:
+        return "throttled"
+    if "Timeout" in name:
+        return "timeout"
+    if (isinstance(status, int) and status >= 500) or name in ("APIConnectionError", "ServiceUnavailable",
+                                                                "InternalServerError", "ConnectError"):
+        return "server"
+    return None
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms), if it said."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class AimdLimit:
+    """Concurrency limit for one provider, tuned by additive increase / multiplicative decrease.
+
+    Every successful call adds ``1 / limit`` (so about one slot per limit's
+    worth of successes); a 429 or timeout halves it. Calls that were already
+    running when the limit was cut do not cut it again, so one burst of
+    rejections counts as one congestion signal.
+    """
+
+    def __init__(self, initial, maximum, minimum=1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = float(min(max(initial, minimum), maximum))
+        self.slots = Slots(int(self.window))
+        self.epoch = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return self.slots.limit
+
+    def increase(self):
+        with self._lock:
+            self.window = min(self.window + 1 / self.window, self.maximum)
+            if int(self.window) != self.slots.limit:
+                self.slots.resize(int(self.window))
+
+    def decrease(self, epoch) -> bool:
+        """Halve the limit unless it was already cut since the failed call started."""
+        with self._lock:
+            if epoch != self.epoch:
+                return False
+            self.epoch += 1
+            self.window = max(self.window / 2, self.minimum)
+            self.slots.resize(int(self.window))
+            return True
+
+
+class CallExecutor:
+    """Runs a provider's LLM calls: AIMD concurrency, per-call timeout, retries with backoff.
+
+    Throttling (429), timeouts and server errors are retried up to
+    ``LLM_MAX_RETRIES`` times, waiting as long as the provider's Retry-After
+    asks or else a fully jittered exponential backoff from
+    ``LLM_RETRY_BASE_SECONDS``. Concurrency starts at
+    ``<PROVIDER>_INITIAL_CONCURRENCY`` and moves between 1 and
+    ``<PROVIDER>_MAX_CONCURRENCY``. Retries and the limit each call ran
+    under are recorded on the current span.
+    """
+
+    def __init__(self, provider: str, initial=None, maximum=None, max_retries=None, base_delay=None,
+                 timeout=None):
+        prefix = provider.upper()
+        maximum = maximum or int(os.getenv(f"{prefix}_MAX_CONCURRENCY", 32))
+        initial = initial or int(os.getenv(f"{prefix}_INITIAL_CONCURRENCY", 8))
+        self.provider = provider
+        self.limit = AimdLimit(initial, maximum)
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", 4))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("LLM_RETRY_BASE_SECONDS", 1.0))
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", 120))
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "timeouts": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt, error):
+        requested = retry_after(error)
+        if requested is not None:
+            # A little jitter so callers told the same time do not all return at once
+            return min(requested * random.uniform(1.0, 1.1), MAX_BACKOFF_SECONDS)
+        return random.uniform(0, min(self.base_delay * 2 ** attempt, MAX_BACKOFF_SECONDS))
+
+    async def _failed(self, error, attempt, epoch, call_span) -> bool:
+        """Record a failed attempt; returns True after waiting if it should be retried."""
+        kind = classify_error(error)
+        if kind in ("throttled", "timeout"):
+            self._count("throttled" if kind == "throttled" else "timeouts")
+            if self.limit.decrease(epoch):
+                print(f"{self.provider}: {kind}, concurrency limit cut to {self.limit.limit}")
+        if kind is None or attempt >= self.max_retries:
+            self._count("failed")
+            return False
+        self._count("retries")
+        call_span.add("retries")
+        await asyncio.sleep(self._backoff(attempt, error))
+        return True
+
+    async def call(self, fn, before=None):
+        """Await ``fn()`` under the provider's concurrency limit, retrying transient failures.
+
+        ``before`` is awaited ahead of every attempt, before a slot is taken
+        (e.g. to wait for the rate limiter).
+        """
+        call_span = current_span()
+        self._count("calls")
+        attempt = 0
+        while True:
+            if before is not None:
+                await before()
+            await self.limit.slots.aacquire()
+            epoch = self.limit.epoch
+            call_span.set(concurrency_limit=self.limit.limit)
+            try:
+                result = await asyncio.wait_for(fn(), self.timeout)
+            except Exception as e:
+                error = e
+            else:
+                self.limit.increase()
+                return result
+            finally:
+                self.limit.slots.release()
+            if not await self._failed(error, attempt, epoch, call_span):
+                raise error
+            attempt += 1
+
+    async def stream(self, open_stream):
+        """Yield from ``open_stream()`` under the concurrency limit.
+
+        A failure before the first chunk is retried like ``call``; once
+        chunks have been passed on, errors are raised as they are.
+        """
+        call_span = current_span()
+        self._count("calls")
+        attempt = 0
+        while True:
+            await self.limit.slots.aacquire()
+            epoch = self.limit.epoch
+            call_span.set(concurrency_limit=self.limit.limit)
+            started = False
+            try:
+                async for chunk in open_stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                error = e
+            else:
+                self.limit.increase()
+                return
+            finally:
+                self.limit.slots.release()
+            if started or not await self._failed(error, attempt, epoch, call_span):
+                raise error
+            attempt += 1
+
+    def summary(self):
+        s = self.stats
+        return (f"{self.provider}: concurrency limit {self.limit.limit}, {s['calls']} calls, {s['retries']} retries, "
+                f"{s['throttled']} throttled, {s['timeouts']} timeouts, {s['failed']} failed")
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_call_executor(provider: str) -> CallExecutor:
+    """Return the process-wide executor for ``provider`` so all agents and topics share one limit."""
+    provider = (provider or "").upper()
+    with _executors_lock:
+        if provider not in _executors:
+            _executors[provider] = CallExecutor(provider)
+        return _executors[provider]
+
+
+def call_executors():
+    """Every executor created so far, for end-of-batch reporting."""
+    with _executors_lock:
+        return list(_executors.values())
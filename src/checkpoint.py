@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import time
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of JSON-serializable values."""
+    data = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Make-style stage manifests for one topic directory.
+
+    After a stage succeeds it records, in ``.manifests/<stage>.json``, the
+    hash of everything it was computed from (its inputs, prompt template and
+    model config), the hashes of the files it wrote and its return value. A
+    later run can reuse that result as long as the input hash is unchanged
+    and the output files are still exactly as the stage left them. Because a
+    stage's input hash covers its upstream stages' outputs, a stage that
+    produces something new invalidates everything downstream of it.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.manifest_dir = os.path.join(output_dir, ".manifests")
+
+    def _manifest_path(self, stage):
+        return os.path.join(self.manifest_dir, f"{stage}.json")
+
+    def load(self, stage: str, input_hash: str, max_age=None):
+        """Return the stored manifest if ``stage`` is up to date for ``input_hash``, else None.
+
+        With ``max_age`` (seconds) a manifest saved longer ago than that is out of date too.
+        """
+        try:
+            with open(self._manifest_path(stage), "r") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if manifest.get("input_hash") != input_hash:
+            return None
+        if max_age is not None and time.time() - manifest.get("saved_at", 0) > max_age:
+            return None
+        for name, expected in manifest.get("outputs", {}).items():
+            path = os.path.join(self.output_dir, name)
+            if not os.path.exists(path) or _file_hash(path) != expected:
+                return None
+        return manifest
+
+    def save(self, stage: str, input_hash: str, outputs, result=None):
+        """Record a completed stage; call only after all of its ``outputs`` are written."""
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        manifest = {
+            "stage": stage,
+            "input_hash": input_hash,
+            "saved_at": time.time(),
+            "outputs": {name: _file_hash(os.path.join(self.output_dir, name)) for name in outputs},
+            "result": result,
+        }
+        path = self._manifest_path(stage)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, stage: str):
+        try:
+            os.remove(self._manifest_path(stage))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,86 @@
+import hashlib
+import mmap
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.chunking import count_tokens
+
+TEXT_FILE = "chunks.txt"
+INDEX_FILE = "chunks.npy"
+INDEX_DTYPE = np.dtype([("source", "<u4"), ("start", "<u8"), ("end", "<u8"), ("tokens", "<u4")])
+
+
+def _replace(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class ChunkStore(Sequence):
+    """Research chunks of one topic: a UTF-8 text blob plus a fixed-width index.
+
+    ``chunks.txt`` holds every chunk back to back; ``chunks.npy`` has one
+    ``(source, start, end, tokens)`` row per chunk, where ``source`` is the
+    position of the chunk's URL in ``sources.json`` and ``start``/``end`` are
+    byte offsets into the blob. Both files are memory-mapped, so opening a
+    store reads nothing and a chunk is only decoded when it is accessed.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        with open(os.path.join(output_dir, TEXT_FILE), "rb") as f:
+            # mmap cannot map an empty file
+            self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self.index = np.load(os.path.join(output_dir, INDEX_FILE), mmap_mode="r")
+
+    @classmethod
+    def write(cls, output_dir: str, sources):
+        """Write ``[(source_id, chunks), ...]`` as the topic's chunk store and open it."""
+        os.makedirs(output_dir, exist_ok=True)
+        rows, offset = [], 0
+        encoded = []
+        for source_id, chunks in sources:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                rows.append((source_id, offset, offset + len(data), count_tokens(chunk)))
+                encoded.append(data)
+                offset += len(data)
+
+        _replace(os.path.join(output_dir, TEXT_FILE), lambda f: f.writelines(encoded))
+        _replace(os.path.join(output_dir, INDEX_FILE), lambda f: np.save(f, np.array(rows, dtype=INDEX_DTYPE)))
+        return cls(output_dir)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        row = self.index[i]
+        return bytes(self._text[int(row["start"]):int(row["end"])]).decode("utf-8")
+
+    @property
+    def sources(self):
+        """Source id of every chunk."""
+        return self.index["source"]
+
+    @property
+    def tokens(self):
+        """Token count of every chunk."""
+        return self.index["tokens"]
+
+    def digest(self) -> str:
+        """Content hash of the store, used to key downstream checkpoints."""
+        digest = hashlib.sha256()
+        for name in (INDEX_FILE, TEXT_FILE):
+            with open(os.path.join(self.output_dir, name), "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
@@ -0,0 +1,128 @@
+import os
+import re
+import threading
+
+from src.rate_limit import estimate_tokens, get_rate_limiter
+
+# Input context of the default model of each provider (gemini-pro, gpt-4, sarvam-m);
+# override with <PROVIDER>_CONTEXT_TOKENS when configuring a different model.
+CONTEXT_TOKENS = {
+    "GOOGLE": 30_720,
+    "OPENAI": 8_192,
+    "SARVAM": 8_192,
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken's cl100k_base, or the ~4 characters/token estimate if it is unavailable.
+
+    cl100k_base is exact for OpenAI and close enough for sizing requests to
+    the other providers.
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base").encode
+                except Exception as e:  # not installed, or the BPE file cannot be downloaded
+                    print(f"tiktoken unavailable ({type(e).__name__}); estimating tokens from length")
+                    _encoding = estimate_tokens
+    counted = _encoding(text)
+    return counted if isinstance(counted, int) else len(counted)
+
+
+def window_tokens(provider: str, prompt_tokens: int, output_tokens: int, concurrency: int) -> int:
+    """Largest input window for one map request to ``provider``.
+
+    The window must fit the model's context next to the prompt and the
+    expected output, and ``concurrency`` requests of that size must fit in
+    one minute of the provider's token quota so a full batch is not
+    throttled. CHUNK_MAX_TOKENS caps it so each summary still has room for
+    detail.
+    """
+    provider = (provider or "").upper()
+    context = int(os.getenv(f"{provider}_CONTEXT_TOKENS", CONTEXT_TOKENS.get(provider, 8_192)))
+    per_request = get_rate_limiter(provider).tokens.capacity / max(concurrency, 1)
+    overhead = prompt_tokens + output_tokens
+    # 10% headroom on the context for tokenizer differences between providers
+    window = min(int(context * 0.9) - overhead, int(per_request) - overhead,
+                 int(os.getenv("CHUNK_MAX_TOKENS", 4000)))
+    return max(window, 256)
+
+
+class TokenChunker:
+    """Packs text into windows of at most ``max_tokens`` tokens.
+
+    Text is broken at paragraph, then sentence, then word boundaries only as
+    far as needed, and the pieces are packed greedily so every window except
+    the last is close to full. There is no overlap between windows.
+    """
+
+    def __init__(self, max_tokens: int, count=count_tokens):
+        self.max_tokens = max_tokens
+        self.count = count
+
+    def _pieces(self, text):
+        """Yield ``(piece, tokens)`` pieces of ``text`` that each fit in one window."""
+        for paragraph in text.split("\n"):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = self.count(paragraph)
+            if tokens <= self.max_tokens:
+                yield paragraph, tokens
+                continue
+            for sentence in _SENTENCE_END.split(paragraph):
+                tokens = self.count(sentence)
+                if tokens <= self.max_tokens:
+                    yield sentence, tokens
+                    continue
+                # A run-on "sentence" (tables, code, scraped lists): cut it at word boundaries
+                words = sentence.split()
+                per_word = tokens / len(words)
+                step = max(1, int(self.max_tokens / per_word * 0.9))
+                for start in range(0, len(words), step):
+                    piece = " ".join(words[start:start + step])
+                    yield piece, self.count(piece)
+
+    def pack(self, texts):
+        """Pack ``texts`` (in order) into as few windows as possible."""
+        windows, current, used = [], [], 0
+        for text in texts:
+            for piece, tokens in self._pieces(text):
+                # +1 for the newline joining pieces
+                if current and used + tokens + 1 > self.max_tokens:
+                    windows.append("\n".join(current))
+                    current, used = [], 0
+                current.append(piece)
+                used += tokens + 1
+        if current:
+            windows.append("\n".join(current))
+        return windows
+
+    def split(self, text: str):
+        return self.pack([text])
+
+    def group(self, texts):
+        """Group whole ``texts`` (in order) into windows; only a text too big for a window of its own is split."""
+        windows, current, used = [], [], 0
+        for text in texts:
+            tokens = self.count(text)
+            # +2 for the blank line joining texts
+            if current and (tokens > self.max_tokens or used + tokens + 2 > self.max_tokens):
+                windows.append("\n\n".join(current))
+                current, used = [], 0
+            if tokens > self.max_tokens:
+                windows.extend(self.split(text))
+                continue
+            current.append(text)
+            used += tokens + 2
+        if current:
+            windows.append("\n\n".join(current))
+        return windows
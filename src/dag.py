@@ -0,0 +1,100 @@
+import asyncio
+import inspect
+import time
+
+
+class Stage:
+    """A unit of work in a DagExecutor run.
+
+    ``inputs`` names the values ``fn`` needs; each name is either an initial
+    value passed to ``DagExecutor.arun`` or the name of another stage, whose
+    return value is passed in as that keyword argument.
+    """
+
+    def __init__(self, name, fn, inputs=()):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+
+
+class DagExecutor:
+    """Runs stages as soon as their inputs are available, independent stages concurrently."""
+
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done or name not in self.stages:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _check_inputs(self, initial):
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in self.stages and name not in initial]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' has unknown inputs: {missing}")
+
+    @staticmethod
+    def _time(timings, name, run_start, start):
+        end = time.monotonic()
+        timings[name] = {"start": round(start - run_start, 3), "end": round(end - run_start, 3),
+                         "duration": round(end - start, 3)}
+
+    async def arun(self, **initial):
+        """Execute every stage on the running event loop and return ``(results, timings)``.
+
+        Each stage is a task, awaited if its function is async; synchronous
+        stage functions are called directly on the loop, so they should be
+        quick. ``timings`` maps stage names to start/end offsets (seconds since
+        the run started) and durations. The first stage failure is re-raised
+        once the stages already running have finished.
+        """
+        self._check_inputs(initial)
+        values = dict(initial)
+        results, timings = {}, {}
+        pending = dict(self.stages)
+        running = {}
+        run_start = time.monotonic()
+
+        async def call(stage, kwargs):
+            start = time.monotonic()
+            try:
+                result = stage.fn(**kwargs)
+                return await result if inspect.isawaitable(result) else result
+            finally:
+                self._time(timings, stage.name, run_start, start)
+
+        error = None
+        while pending or running:
+            if error is None:
+                for name, stage in list(pending.items()):
+                    if all(dep in values for dep in stage.inputs):
+                        kwargs = {dep: values[dep] for dep in stage.inputs}
+                        # Tasks start in a copy of the current context, so telemetry carries over
+                        running[asyncio.create_task(call(stage, kwargs))] = name
+                        del pending[name]
+            if not running:
+                break
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                try:
+                    values[name] = results[name] = task.result()
+                except Exception as e:
+                    error = error or e
+        if error is not None:
+            raise error
+        return results, timings
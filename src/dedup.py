@@ -0,0 +1,69 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+from src.rate_limit import estimate_tokens
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+def _shingle_hashes(text: str, size: int):
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.array([int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                     for s in shingles], dtype=np.uint64)
+
+
+def _lsh_shape(num_perm: int, threshold: float):
+    """Pick bands x rows so the LSH candidate curve turns up near ``threshold``."""
+    shapes = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(shapes, key=lambda shape: abs((1 / shape[0]) ** (1 / shape[1]) - threshold))
+
+
+class MinHashDeduplicator:
+    """Drops chunks whose word-shingle Jaccard similarity to an earlier chunk reaches ``threshold``.
+
+    Each chunk gets a MinHash signature; LSH banding limits the exact
+    signature comparison to chunks that share at least one band, so the pass
+    stays roughly linear in the number of chunks.
+    """
+
+    def __init__(self, threshold=None, num_perm=128, shingle_size=5, seed=1):
+        self.threshold = threshold if threshold is not None else float(os.getenv("DEDUP_THRESHOLD", 0.8))
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_shape(num_perm, self.threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str):
+        hashes = _shingle_hashes(text, self.shingle_size) % _MERSENNE_PRIME
+        # (a * x + b) mod p for every permutation/shingle pair, minimised over shingles
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def deduplicate(self, chunks):
+        """Return ``(kept_chunks, report)``; chunk order is preserved and first occurrences win."""
+        kept, signatures = [], []
+        buckets = [{} for _ in range(self.bands)]
+        removed_tokens = 0
+
+        for chunk in chunks:
+            signature = self.signature(chunk)
+            keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+            candidates = {index for band, key in enumerate(keys) for index in buckets[band].get(key, ())}
+            if any(np.mean(signatures[index] == signature) >= self.threshold for index in candidates):
+                removed_tokens += estimate_tokens(chunk)
+                continue
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(len(kept))
+            kept.append(chunk)
+            signatures.append(signature)
+
+        report = {"input_chunks": len(chunks), "removed_chunks": len(chunks) - len(kept),
+                  "removed_tokens": removed_tokens, "threshold": self.threshold}
+        return kept, report
@@ -0,0 +1,81 @@
+import asyncio
+import queue
+import threading
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def pipeline_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop that the blocking ``execute`` wrappers run agents on.
+
+    It runs forever in a daemon thread, so every topic started from any
+    thread shares one loop, and the async HTTP clients bound to it stay
+    usable between calls.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="pipeline-loop", daemon=True).start()
+        return _loop
+
+
+def _submit(coro):
+    loop = pipeline_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("execute() called from the pipeline loop; await aexecute() instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def run_sync(coro):
+    """Run ``coro`` on the pipeline loop and block until it finishes.
+
+    The coroutine runs in a copy of the caller's context, so telemetry
+    started by the caller carries over.
+    """
+    return _submit(coro).result()
+
+
+def iterate_sync(run):
+    """Yield whatever ``run(emit)`` awaits ``emit`` with while it runs on the pipeline loop.
+
+    ``run`` is a coroutine function. Each ``await emit(item)`` returns only
+    once the caller has handled the item and asked for the next one, so
+    ``run`` never gets ahead of the caller. Its exception, if any, is raised
+    after the items it emitted; a caller that stops iterating early cancels it.
+    """
+    loop = pipeline_loop()
+    items = queue.Queue(maxsize=1)
+    done = object()
+    wanted = None
+
+    async def emit(item):
+        wanted.clear()
+        items.put_nowait(item)
+        await wanted.wait()
+
+    async def main():
+        nonlocal wanted
+        wanted = asyncio.Event()
+        try:
+            await run(emit)
+        finally:
+            items.put_nowait(done)
+
+    future = _submit(main())
+    finished = False
+    try:
+        while (item := items.get()) is not done:
+            yield item
+            loop.call_soon_threadsafe(wanted.set)
+        finished = True
+    finally:
+        if not finished:
+            future.cancel()
+    future.result()
@@ -0,0 +1,203 @@
+import re
+from html.parser import HTMLParser
+
+# Subtrees that never hold article text (<header> only outside an <article>/<main>, where it holds the title)
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+                       "nav", "footer", "aside", "button", "select", "textarea", "head"})
+CONTENT_TAGS = frozenset({"article", "main"})
+# Tags that end the current text block
+BLOCK_TAGS = frozenset({"p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+                        "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "table", "tr", "td", "th",
+                        "figcaption", "br", "hr", "body"})
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                       "param", "source", "track", "wbr"})
+# Words in class/id values of cookie banners, menus, share bars and the like; matched against whole words
+# of the value (split on spaces, dashes, underscores and camelCase), so "commentary" is not a "comment"
+BOILERPLATE_WORDS = frozenset({
+    "cookie", "consent", "gdpr", "banner", "navbar", "nav", "menu", "breadcrumb", "sidebar", "footer", "masthead",
+    "subscribe", "newsletter", "signup", "social", "share", "sharing", "advert", "advertisement", "ad", "sponsor",
+    "sponsored", "promo", "popup", "modal", "related", "recommend", "recommended", "recommendation", "comment",
+    "widget"})
+_ATTR_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+BOILERPLATE_ROLES = frozenset({"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog",
+                               "menu", "menubar", "search"})
+_SPACE = re.compile(r"\s+")
+
+
+def _boilerplate_attr(value: str) -> bool:
+    for word in _ATTR_WORD.findall(value):
+        word = word.lower()
+        if word in BOILERPLATE_WORDS or (word.endswith("s") and word[:-1] in BOILERPLATE_WORDS):
+            return True
+    return False
+
+
+class _Block:
+    __slots__ = ("parts", "link_chars", "heading", "text")
+
+    def __init__(self, heading=False):
+        self.parts = []
+        self.link_chars = 0
+        self.heading = heading
+        self.text = ""
+
+
+class _BlockParser(HTMLParser):
+    """Single pass over the markup that splits visible text into blocks.
+
+    Unlike BeautifulSoup no tree is built: skipped subtrees are tracked with a
+    depth counter and text is appended straight to the current block. An
+    ``<article>`` or ``<main>`` inside a subtree skipped only for its
+    class/id/role (a ``class="has-sidebar"`` wrapper, say) is read again.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._block = _Block()
+        self._stack = []  # (tag, skipped, hard, outer skip depth) for every open non-void element
+        self._skip_depth = 0
+        self._hard_depth = 0
+        self._content_depth = 0
+        self._link_depth = 0
+
+    def _flush(self, heading=False):
+        text = _SPACE.sub(" ", "".join(self._block.parts)).strip()
+        if text:
+            self._block.text = text
+            self.blocks.append(self._block)
+        self._block = _Block(heading)
+
+    def _skip_kind(self, tag, attrs):
+        """"hard" for subtrees that are never article text, "soft" for ones that look like boilerplate, else None."""
+        if tag in SKIP_TAGS or (tag == "header" and not self._content_depth):
+            return "hard"
+        kind = None
+        for name, value in attrs:
+            # A bare boolean attribute like <div hidden> comes through with value None
+            if name == "hidden" or (name == "aria-hidden" and value == "true"):
+                return "hard"
+            # Page-level classes (<body class="has-sidebar">) describe the layout, not the element
+            if not value or tag in ("html", "body"):
+                continue
+            if name in ("class", "id") and _boilerplate_attr(value):
+                kind = "soft"
+            if name == "role" and value.lower() in BOILERPLATE_ROLES:
+                kind = "soft"
+        return kind
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS and not self._skip_depth:
+                self._flush()
+            return
+        kind = self._skip_kind(tag, attrs)
+        # <article>/<main> are content containers even when their class looks like a widget
+        content = tag in CONTENT_TAGS and kind != "hard"
+        outer = None
+        if content and self._skip_depth and not self._hard_depth:
+            outer, self._skip_depth = self._skip_depth, 0
+        skipped = self._skip_depth > 0 or kind == "hard" or (kind == "soft" and not content)
+        hard = self._hard_depth > 0 or (skipped and kind == "hard")
+        self._stack.append((tag, skipped, hard, outer))
+        if skipped:
+            self._skip_depth += 1
+            self._hard_depth += hard
+            return
+        if content:
+            self._content_depth += 1
+        if tag in BLOCK_TAGS:
+            self._flush(heading=tag in HEADING_TAGS)
+        elif tag == "a":
+            self._link_depth += 1
+
+    def handle_endtag(self, tag):
+        # Pop up to the matching open tag so unclosed <p>/<li> elements don't unbalance the stack
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        visible = not self._stack[index][1]
+        for open_tag, skipped, hard, outer in reversed(self._stack[index:]):
+            if skipped:
+                self._skip_depth -= 1
+                self._hard_depth -= hard
+                continue
+            if open_tag in CONTENT_TAGS:
+                self._content_depth -= 1
+            elif open_tag == "a":
+                self._link_depth -= 1
+            if outer is not None:
+                self._skip_depth = outer
+        del self._stack[index:]
+        if visible and tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._block.parts.append(data)
+        if self._link_depth:
+            self._block.link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+class TextExtractor:
+    """Main-content text extraction for scraped pages.
+
+    Non-content elements (scripts, styles, navigation, cookie banners and
+    other class/role-marked boilerplate) are dropped while parsing. The
+    remaining text blocks are then classified by text density: a block is
+    content if it is long enough and mostly not link text; short blocks and
+    headings are kept only when they sit next to content, which keeps
+    paragraph captions and section titles but drops menus and link lists.
+    """
+
+    name = "density-v2"
+
+    def __init__(self, min_words=10, max_link_density=0.33):
+        self.min_words = min_words
+        self.max_link_density = max_link_density
+
+    def _classify(self, blocks):
+        labels = []
+        for block in blocks:
+            text = block.text
+            words = len(text.split())
+            link_density = block.link_chars / max(len(text), 1)
+            if link_density > self.max_link_density or not words:
+                labels.append("bad")
+            elif words >= self.min_words:
+                labels.append("good")
+            else:
+                labels.append("short")
+        # A short block or heading survives if the nearest classified neighbours are content
+        classified = list(labels)
+        for index, label in enumerate(classified):
+            if label != "short":
+                continue
+            after = next((classified[j] for j in range(index + 1, len(classified)) if classified[j] != "short"), "bad")
+            before = next((classified[j] for j in range(index - 1, -1, -1) if classified[j] != "short"), "bad")
+            keep = after == "good" if blocks[index].heading else "good" in (before, after)
+            labels[index] = "near-good" if keep else "bad"
+        return labels
+
+    def blocks(self, html):
+        """Visible text blocks of ``html`` in document order, before density filtering."""
+        if isinstance(html, bytes):
+            html = html.decode("utf-8", errors="replace")
+        parser = _BlockParser()
+        parser.feed(html)
+        parser.close()
+        return parser.blocks
+
+    def extract(self, html) -> str:
+        """Main-content text of ``html`` with one block per line."""
+        blocks = self.blocks(html)
+        labels = self._classify(blocks)
+        return "\n".join(block.text for block, label in zip(blocks, labels) if label != "bad")
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from src.telemetry import span
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+USER_AGENT = "ContentWeaver/1.0 (+research agent)"
+MISSING_BODY = "cached body missing for 304 response"
+
+
+def _result(url, **fields):
+    return dict({"url": url, "status": None, "content_type": None, "body": b"", "error": None,
+                 "from_cache": False}, **fields)
+
+
+def _start(url, cache):
+    """Serve ``url`` from the cache if it is fresh; returns (result, cache entry, request headers).
+
+    The result has a status when nothing needs to be downloaded.
+    """
+    result = _result(url)
+    entry = cache.lookup(url) if cache else None
+    if entry and entry["fresh"]:
+        body = cache.read(entry)
+        if body is not None:
+            result.update(status=200, body=body, from_cache=True)
+            return result, entry, {}
+        # The body vanished after the lookup; read() dropped the entry, so fetch the page afresh
+        entry = None
+    return result, entry, cache.conditional_headers(entry) if entry else {}
+
+
+def _accept(result, status, headers, entry, cache) -> bool:
+    """Record the response status; False when the body is not worth downloading (or is already cached)."""
+    result["status"] = status
+    if status == 304 and entry:
+        body = cache.read(entry, revalidated=True)
+        if body is not None:
+            result.update(body=body, from_cache=True)
+        else:
+            result["error"] = MISSING_BODY
+        return False
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    result["content_type"] = content_type
+    if status >= 400:
+        result["error"] = f"HTTP {status}"
+        return False
+    if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+        result["error"] = f"skipped content type {content_type}"
+        return False
+    return True
+
+
+def _finish(result, body, headers, cache, elapsed):
+    result["body"] = bytes(body)
+    if cache and not result["error"]:
+        cache.record_miss()
+        cache.store(result["url"], result["body"], etag=headers.get("ETag"),
+                    last_modified=headers.get("Last-Modified"), elapsed=elapsed)
+
+
+class AsyncPageFetcher:
+    """Concurrent page downloader on an httpx.AsyncClient.
+
+    Limits the number of in-flight requests globally and per host, enforces a
+    total deadline for a batch of URLs and streams bodies so oversized or
+    non-HTML responses are abandoned early. When a ``PageCache`` is given,
+    fresh entries are served without touching the network and stale ones are
+    revalidated with a conditional GET. A batch of URLs is fetched by tasks
+    on the caller's event loop; each loop gets its own client and semaphores.
+    """
+
+    def __init__(self, max_concurrency=None, per_host_limit=None, timeout=None,
+                 deadline=None, max_bytes=None, cache=None):
+        self.max_concurrency = max_concurrency or int(os.getenv("FETCH_MAX_CONCURRENCY", 16))
+        self.per_host_limit = per_host_limit or int(os.getenv("FETCH_PER_HOST_LIMIT", 4))
+        self.timeout = timeout or float(os.getenv("FETCH_TIMEOUT", 10))
+        self.deadline = deadline or float(os.getenv("FETCH_DEADLINE", 30))
+        self.max_bytes = max_bytes or int(os.getenv("FETCH_MAX_BYTES", 2 * 1024 * 1024))
+        self.cache = cache
+        self._loops = weakref.WeakKeyDictionary()
+
+    def _record(self, fetch_span, result):
+        fetch_span.set(status=result["status"], bytes=len(result["body"]), error=result["error"])
+        if result["from_cache"]:
+            fetch_span.add("cache_hits")
+
+    async def _with_cache(self, fn, *args):
+        """Call a cache helper; the cache's SQLite and blob I/O runs in a worker thread, off the event loop."""
+        if self.cache is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            import httpx
+
+            client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT}, timeout=self.timeout, follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency))
+            state = self._loops[loop] = {"client": client, "slots": asyncio.Semaphore(self.max_concurrency),
+                                         "hosts": {}}
+        return state
+
+    def _host_slot(self, state, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in state["hosts"]:
+            state["hosts"][host] = asyncio.Semaphore(self.per_host_limit)
+        return state["hosts"][host]
+
+    async def _fetch_one(self, url):
+        with span("fetch", url=url) as fetch_span:
+            try:
+                result = await self._fetch(url)
+            except asyncio.CancelledError:
+                fetch_span.set(error="deadline exceeded")
+                raise
+            self._record(fetch_span, result)
+        return result
+
+    async def _fetch(self, url):
+        result, entry, headers = await self._with_cache(_start, url, self.cache)
+        if result["status"] is not None:
+            return result
+
+        state = self._state()
+        async with state["slots"], self._host_slot(state, url):
+            try:
+                started = time.monotonic()
+                async with state["client"].stream("GET", url, headers=headers) as response:
+                    if await self._with_cache(_accept, result, response.status_code, response.headers,
+                                              entry, self.cache):
+                        body = bytearray()
+                        async for block in response.aiter_bytes(64 * 1024):
+                            body.extend(block)
+                            if len(body) >= self.max_bytes:
+                                del body[self.max_bytes:]
+                                break
+                        await self._with_cache(_finish, result, body, response.headers, self.cache,
+                                               time.monotonic() - started)
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+        if result["error"] == MISSING_BODY:
+            # The blob went missing between the lookup and the 304; its entry is gone now, so ask unconditionally
+            return await self._fetch(url)
+        return result
+
+    async def fetch_all(self, urls):
+        """Fetch all URLs concurrently; results are returned in input order.
+
+        Fetches still running at the deadline are cancelled and come back
+        with an error.
+        """
+        tasks = [asyncio.create_task(self._fetch_one(url)) for url in urls]
+        if not tasks:
+            return []
+        done, not_done = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            await asyncio.wait(not_done)
+        return [task.result() if task in done else _result(url, error="deadline exceeded")
+                for url, task in zip(urls, tasks)]
+
+    async def aclose(self):
+        """Close the client of the running event loop."""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state["client"].aclose()
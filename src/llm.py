@@ -0,0 +1,165 @@
+import asyncio
+import collections
+import os
+import threading
+from contextlib import asynccontextmanager
+
+DEFAULT_TEMPERATURE = 0.7
+
+_env_loaded = False
+
+
+def load_env():
+    """Load .env once, the first time a provider or tool actually needs credentials."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _build_google():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # Retries are left to the call executor, which also adapts concurrency to 429s
+    return ChatGoogleGenerativeAI(model="gemini-pro", temperature=DEFAULT_TEMPERATURE, max_retries=0)
+
+
+def _build_openai():
+    from langchain_openai import ChatOpenAI
+    # stream_usage reports token counts on streamed replies too; retries are left to the call executor
+    return ChatOpenAI(model="gpt-4", temperature=DEFAULT_TEMPERATURE, stream_usage=True, max_retries=0)
+
+
+def _build_sarvam():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        openai_api_base="https://api.sarvam.ai/v1/",
+        openai_api_key=os.getenv("api_subscription_key"), # Sarvam uses OpenAI-compatible API key
+        model="sarvam-m", # You might need to specify the exact model name here
+        temperature=DEFAULT_TEMPERATURE,
+        max_retries=0,
+    )
+
+
+# provider name -> (client builder, name of the model field on that client class)
+PROVIDERS = {
+    "GOOGLE": (_build_google, "model"),
+    "OPENAI": (_build_openai, "model_name"),
+    "SARVAM": (_build_sarvam, "model_name"),
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+class Slots:
+    """Counting semaphore that coroutines on any event loop (in any thread) can wait on together.
+
+    Waiters are served in arrival order; a released slot is handed straight
+    to the oldest waiter. ``resize`` changes the limit while slots are held:
+    shrinking it lets in-flight calls finish and holds back new ones until
+    the count is under the new limit.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._free = limit
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            if future.cancelled():
+                self.release()  # the waiter gave up before its turn came
+            else:
+                future.set_result(None)
+
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            self._waiters.append(lambda: loop.call_soon_threadsafe(grant))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                self.release()  # cancelled after the slot was handed over
+            raise
+
+    def release(self):
+        with self._lock:
+            # While over a reduced limit, released slots are retired instead of handed on
+            if self._free < 0 or not self._waiters:
+                self._free += 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+    def resize(self, limit):
+        with self._lock:
+            self._free += limit - self.limit
+            self.limit = limit
+            woken = []
+            while self._free > 0 and self._waiters:
+                self._free -= 1
+                woken.append(self._waiters.popleft())
+        for wake in woken:
+            wake()
+
+
+# Process-wide cap on in-flight LLM calls; None means unlimited.
+_llm_slots = None
+
+
+def set_llm_concurrency(limit):
+    """Cap the number of LLM calls in flight across all agents and topics (0/None: no cap)."""
+    global _llm_slots
+    _llm_slots = Slots(limit) if limit else None
+
+
+@asynccontextmanager
+async def allm_slot():
+    """Hold one of the global LLM call slots for the duration of the block, waiting without blocking the loop."""
+    slots = _llm_slots
+    if slots is None:
+        yield
+        return
+    await slots.aacquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def get_provider() -> str:
+    load_env()
+    provider = os.getenv("LLM_PROVIDER")
+    if provider not in PROVIDERS:
+        raise ValueError("LLM_PROVIDER must be 'GOOGLE', 'OPENAI', or 'SARVAM'")
+    return provider
+
+
+def get_llm(model=None, temperature=None, provider=None):
+    """Return a chat model for ``provider`` (default: LLM_PROVIDER).
+
+    Each provider's client is built once, on first use, and shared by every
+    caller in the process so they reuse one HTTP connection pool. Model and
+    temperature overrides are applied to a shallow copy that still points at
+    the shared client.
+    """
+    load_env()
+    provider = provider or get_provider()
+    build, model_field = PROVIDERS[provider]
+    with _clients_lock:
+        if provider not in _clients:
+            _clients[provider] = build()
+        llm = _clients[provider]
+
+    overrides = {}
+    if model:
+        overrides[model_field] = model
+    if temperature is not None:
+        overrides["temperature"] = temperature
+    return llm.model_copy(update=overrides) if overrides else llm
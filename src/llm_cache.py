@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from src.telemetry import current_span
+
+
+def cache_mode() -> str:
+    """LLM_CACHE=on (default) reads and writes, refresh only writes, off disables caching."""
+    mode = os.getenv("LLM_CACHE", "on").lower()
+    return mode if mode in ("on", "off", "refresh") else "on"
+
+
+class LLMCache(BaseCache):
+    """SQLite-backed LangChain cache for chat completions.
+
+    Entries are keyed on the model's ``llm_string`` (provider class, model
+    name, temperature and the other call parameters) plus a hash of the
+    rendered prompt, and grouped into namespaces (one per agent) so a single
+    stage's outputs can be invalidated without discarding the rest. The
+    database is shared by all agents and trimmed to ``max_bytes`` by evicting
+    the least recently used rows.
+    """
+
+    def __init__(self, namespace: str, path=None, max_bytes=None, mode=None):
+        self.namespace = namespace
+        self.path = path or os.getenv("LLM_CACHE_PATH", "artifacts/.llm_cache.sqlite3")
+        self.max_bytes = max_bytes or int(os.getenv("LLM_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+        self.mode = mode or cache_mode()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        llm_hash = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{llm_hash}:{prompt_hash}"
+
+    def lookup(self, prompt: str, llm_string: str):
+        if self.mode != "on":
+            return None
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE namespace = ? AND key = ?",
+                                   (self.namespace, key)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE namespace = ? AND key = ?",
+                             (time.time(), self.namespace, key))
+            self._db.commit()
+            self.stats["hits"] += 1
+        current_span().add("cache_hits")
+        return [loads(generation, allowed_objects="core") for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        if self.mode == "off":
+            return
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (namespace, key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, self._key(prompt, llm_string), value, len(value), now, now))
+            self.stats["writes"] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used rows, across all namespaces, until under budget. Caller holds the lock."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT namespace, key, size FROM responses ORDER BY last_access").fetchall()
+        for namespace, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE namespace = ? AND key = ?", (namespace, key))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self, namespace=None, **kwargs):
+        """Invalidate this cache's namespace, another namespace, or everything with namespace="*"."""
+        namespace = namespace or self.namespace
+        with self._lock:
+            if namespace == "*":
+                self._db.execute("DELETE FROM responses")
+            else:
+                self._db.execute("DELETE FROM responses WHERE namespace = ?", (namespace,))
+            self._db.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(namespace: str) -> LLMCache:
+    """Return the process-wide cache for ``namespace``; like the LLM clients, each is opened once and shared."""
+    key = (namespace, os.getenv("LLM_CACHE_PATH", "artifacts/.llm_cache.sqlite3"), cache_mode())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = LLMCache(namespace, path=key[1], mode=key[2])
+        return _caches[key]
+
+
+def with_llm_cache(llm, namespace: str):
+    """Return ``llm`` wired to the shared response cache under ``namespace``, unless LLM_CACHE=off."""
+    if cache_mode() == "off":
+        return llm
+    return llm.model_copy(update={"cache": get_llm_cache(namespace)})
+
+
+if __name__ == "__main__":
+    # python -m src.llm_cache clear <namespace|*>
+    if len(sys.argv) == 3 and sys.argv[1] == "clear":
+        LLMCache(sys.argv[2]).clear()
+        print(f"Cleared LLM cache namespace '{sys.argv[2]}'")
+    else:
+        print("usage: python -m src.llm_cache clear <namespace|*>")
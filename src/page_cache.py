@@ -0,0 +1,223 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL used as the cache key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class PageCache:
+    """Persistent, content-addressed cache of fetched research pages.
+
+    Bodies and extracted texts are stored once per content hash under
+    ``blobs/``; a SQLite index maps normalized URLs to those blobs together
+    with the validators (ETag / Last-Modified) needed for conditional GETs.
+    Entries older than ``ttl`` seconds are revalidated before reuse and the
+    least recently used entries are evicted once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, directory=None, ttl=None, max_bytes=None):
+        self.directory = directory or os.getenv("PAGE_CACHE_DIR", "artifacts/.page_cache")
+        self.ttl = ttl if ttl is not None else float(os.getenv("PAGE_CACHE_TTL", 24 * 3600))
+        self.max_bytes = max_bytes or int(os.getenv("PAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        os.makedirs(os.path.join(self.directory, "blobs"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"),
+                                   timeout=30, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            body_hash TEXT NOT NULL,
+            text_hash TEXT,
+            extractor TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            elapsed REAL NOT NULL DEFAULT 0,
+            size INTEGER NOT NULL
+        )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._db.commit()
+
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0,
+                      "bytes_saved": 0, "seconds_saved": 0.0}
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "blobs", digest[:2], digest)
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _read_blob(self, digest):
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def lookup(self, url):
+        """Return the cached entry for ``url`` or None.
+
+        The entry's ``fresh`` flag tells the caller whether it can be served
+        directly or must be revalidated first.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, etag, last_modified, fetched_at, elapsed, size FROM pages WHERE key = ?",
+                (key,)).fetchone()
+        if row is None:
+            return None
+        body_hash, etag, last_modified, fetched_at, elapsed, size = row
+        if not os.path.exists(self._blob_path(body_hash)):
+            # Without its body the entry can't be served or revalidated (a 304 would have nothing to return)
+            self._forget(key)
+            return None
+        return {"key": key, "body_hash": body_hash, "etag": etag, "last_modified": last_modified,
+                "fetched_at": fetched_at, "elapsed": elapsed, "size": size,
+                "fresh": time.time() - fetched_at < self.ttl}
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, entry, revalidated=False):
+        """Load a cached body and record the hit; returns None (and drops the entry) if the blob is gone."""
+        body = self._read_blob(entry["body_hash"])
+        if body is None:
+            self._forget(entry["key"])
+            return None
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?",
+                                 (now, now, entry["key"]))
+                self.stats["revalidated"] += 1
+            else:
+                self._db.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, entry["key"]))
+                self.stats["hits"] += 1
+                self.stats["seconds_saved"] += entry["elapsed"]
+            self.stats["bytes_saved"] += len(body)
+            self._db.commit()
+        return body
+
+    def _forget(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._db.commit()
+
+    def record_miss(self):
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def store(self, url, body: bytes, etag=None, last_modified=None, elapsed=0.0):
+        key = normalize_url(url)
+        now = time.time()
+        # Blobs are written under the lock so a concurrent _drop_unreferenced can't unlink one before its row exists
+        with self._lock:
+            body_hash = self._write_blob(body)
+            old = self._db.execute("SELECT body_hash, text_hash FROM pages WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                """INSERT OR REPLACE INTO pages
+                   (key, url, body_hash, text_hash, extractor, etag, last_modified, fetched_at, last_access, elapsed, size)
+                   VALUES (?, ?, ?, NULL, NULL, ?, ?, ?, ?, ?, ?)""",
+                (key, url, body_hash, etag, last_modified, now, now, elapsed, len(body)))
+            self.stats["stores"] += 1
+            if old:
+                self._drop_unreferenced(old)
+            self._db.commit()
+            self._evict()
+
+    def get_text(self, url, extractor: str):
+        """Return previously extracted text for ``url`` if it was produced by ``extractor``."""
+        with self._lock:
+            row = self._db.execute("SELECT text_hash, extractor FROM pages WHERE key = ?",
+                                   (normalize_url(url),)).fetchone()
+        if row is None or row[0] is None or row[1] != extractor:
+            return None
+        data = self._read_blob(row[0])
+        return data.decode("utf-8") if data is not None else None
+
+    def put_text(self, url, text: str, extractor: str):
+        data = text.encode("utf-8")
+        key = normalize_url(url)
+        with self._lock:
+            text_hash = self._write_blob(data)
+            row = self._db.execute("SELECT body_hash, text_hash FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._drop_unreferenced([text_hash])
+                self._db.commit()
+                return
+            body_hash, old_text_hash = row
+            try:
+                body_size = os.path.getsize(self._blob_path(body_hash))
+            except FileNotFoundError:
+                body_size = 0
+            # The entry holds one body and one text; size is theirs, however often the text is replaced
+            self._db.execute("UPDATE pages SET text_hash = ?, extractor = ?, size = ? WHERE key = ?",
+                             (text_hash, extractor, body_size + len(data), key))
+            if old_text_hash != text_hash:
+                self._drop_unreferenced([old_text_hash])
+            self._db.commit()
+            self._evict()
+
+    def _drop_unreferenced(self, digests):
+        """Delete the blobs among ``digests`` that no entry points to any more. Caller holds the lock."""
+        for digest in digests:
+            if digest is None:
+                continue
+            in_use = self._db.execute(
+                "SELECT 1 FROM pages WHERE body_hash = ? OR text_hash = ? LIMIT 1", (digest, digest)).fetchone()
+            if not in_use:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget. Caller holds the lock."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, body_hash, text_hash, size FROM pages ORDER BY last_access").fetchall()
+        for key, body_hash, text_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+            self._drop_unreferenced((body_hash, text_hash))
+        self._db.commit()
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['hits']} hits, {s['revalidated']} revalidated, {s['misses']} misses, "
+                f"{s['bytes_saved'] / 1024:.0f} KiB and {s['seconds_saved']:.1f}s saved")
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+# The steps of one topic's run, in order; agents mark where each one starts and ends with pipeline_stage
+STAGES = ("search", "fetch", "extract", "summarize", "narrate", "write", "visuals")
+DEFAULT_WORKERS = {"search": 2, "fetch": 4, "extract": 2, "summarize": 4, "narrate": 4, "write": 4, "visuals": 4}
+
+_current = ContextVar("pipeline_topic", default=None)
+
+
+@asynccontextmanager
+async def pipeline_stage(name: str):
+    """Run the block as stage ``name`` of the current topic; a no-op outside ``StagedPipeline.run``."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    pipeline, topic = current
+    async with pipeline._stage(topic, name):
+        yield
+
+
+class _Topic:
+    """Where one topic is in the pipeline."""
+
+    __slots__ = ("position", "queued", "queued_at", "active", "locks", "started", "failed")
+
+    def __init__(self):
+        self.position = -1
+        self.queued = None
+        self.queued_at = 0.0
+        self.active = dict.fromkeys(STAGES, 0)
+        self.locks = {}
+        self.started = {}
+        self.failed = False
+
+
+class StagedPipeline:
+    """Runs many topics at once, each step of the pipeline with its own workers and bounded queue.
+
+    A stage's workers are the topics that may be in it at the same time
+    (``PIPELINE_<STAGE>_WORKERS``), so topic N+1 can be searched and
+    fetched while topic N is being written. A topic that finishes a stage
+    waits in the next stage's queue, which holds at most
+    ``PIPELINE_QUEUE_SIZE`` topics; when it is full the finished topic
+    keeps its worker until there is room. That backpressure stops research
+    from running ahead of the LLM stages, and new topics are only taken
+    from ``topics`` when the search queue has room.
+
+    The script and the article share their topic's "write" worker. Stages
+    a topic skips (checkpointed, or nothing to fetch) are passed through.
+    """
+
+    def __init__(self, workers=None, queue_size=None):
+        workers = workers or {}
+        self.workers = {stage: workers.get(stage) or int(os.getenv(f"PIPELINE_{stage.upper()}_WORKERS",
+                                                                   DEFAULT_WORKERS[stage]))
+                        for stage in STAGES}
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+        self.stats = {stage: {"topics": 0, "busy_seconds": 0.0, "blocked_seconds": 0.0, "queue_seconds": 0.0,
+                              "queued": 0, "max_queued": 0} for stage in STAGES}
+        self.wall_seconds = 0.0
+
+    async def run(self, topics, process):
+        """Await ``process(topic)`` for every topic ``topics`` yields; returns the results in order.
+
+        ``topics`` is iterated lazily (in a worker thread, so it may block,
+        e.g. to claim topics from the store). An exception from ``process``
+        is returned in place of its result.
+        """
+        self._workers = {stage: asyncio.Semaphore(self.workers[stage]) for stage in STAGES}
+        self._queues = {stage: asyncio.Semaphore(self.queue_size) for stage in STAGES}
+        start = time.perf_counter()
+        iterator = iter(topics)
+        tasks = []
+        while True:
+            topic = _Topic()
+            await self._enqueue(topic, STAGES[0])
+            item = await asyncio.to_thread(next, iterator, None)
+            if item is None:
+                self._leave_queue(topic)
+                break
+            tasks.append(asyncio.create_task(self._run_topic(topic, process, item)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.wall_seconds = time.perf_counter() - start
+        return results
+
+    async def _run_topic(self, topic, process, item):
+        _current.set((self, topic))
+        try:
+            return await process(item)
+        finally:
+            self._leave_queue(topic)
+
+    async def _enqueue(self, topic, stage):
+        await self._queues[stage].acquire()
+        topic.queued, topic.queued_at = stage, time.perf_counter()
+        stats = self.stats[stage]
+        stats["queued"] += 1
+        stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+
+    def _leave_queue(self, topic):
+        if topic.queued is not None:
+            self.stats[topic.queued]["queued"] -= 1
+            self._queues[topic.queued].release()
+            topic.queued = None
+
+    @asynccontextmanager
+    async def _stage(self, topic, name):
+        topic.active[name] += 1
+        try:
+            # The first of a topic's concurrent entrants (script and article) takes the worker; the others wait for it
+            async with topic.locks.setdefault(name, asyncio.Lock()):
+                if name not in topic.started:
+                    await self._workers[name].acquire()
+                    started = topic.started[name] = time.perf_counter()
+                    stats = self.stats[name]
+                    stats["topics"] += 1
+                    if topic.queued is not None:
+                        stats["queue_seconds"] += started - topic.queued_at
+                    self._leave_queue(topic)
+                    topic.position = max(topic.position, STAGES.index(name))
+            yield
+        except BaseException:
+            topic.failed = True
+            raise
+        finally:
+            topic.active[name] -= 1
+            if not topic.active[name] and name in topic.started:
+                await self._finish(topic, name)
+
+    async def _finish(self, topic, name):
+        """Hand the topic on to the next stage's queue, then free its worker."""
+        stats = self.stats[name]
+        done = time.perf_counter()
+        stats["busy_seconds"] += done - topic.started.pop(name)
+        i = STAGES.index(name)
+        try:
+            # A later stage may already have started (visuals only need the script)
+            if not topic.failed and topic.position == i and i + 1 < len(STAGES):
+                await self._enqueue(topic, STAGES[i + 1])
+                stats["blocked_seconds"] += time.perf_counter() - done
+        finally:
+            self._workers[name].release()
+
+    def report(self):
+        """Per-stage utilization: the share of the stage's worker time spent working, waiting on a full queue, idle."""
+        wall = self.wall_seconds or 1e-9
+        report = {}
+        for stage in STAGES:
+            stats = self.stats[stage]
+            capacity = self.workers[stage] * wall
+            report[stage] = {
+                "workers": self.workers[stage],
+                "topics": stats["topics"],
+                "utilization": round(stats["busy_seconds"] / capacity, 3),
+                "blocked": round(stats["blocked_seconds"] / capacity, 3),
+                "mean_queue_seconds": round(stats["queue_seconds"] / stats["topics"], 3) if stats["topics"] else 0.0,
+                "max_queued": stats["max_queued"],
+            }
+        return report
+
+    def summary(self):
+        lines = [f"{'stage':10} {'workers':>7} {'topics':>6} {'busy':>6} {'blocked':>7} {'queue s':>7} {'max q':>5}"]
+        for stage, row in self.report().items():
+            lines.append(f"{stage:10} {row['workers']:7} {row['topics']:6} {row['utilization']:6.0%} "
+                         f"{row['blocked']:7.0%} {row['mean_queue_seconds']:7.2f} {row['max_queued']:5}")
+        return "\n".join(lines)
@@ -0,0 +1,69 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from src.rate_limit import estimate_tokens
+
+_WORD = re.compile(r"\w+")
+STOPWORDS = frozenset("""a an and are as at be but by can do for from has have how in is it its of on or that
+the their this to was were what when where which who why will with you your""".split())
+
+
+def tokenize(text: str):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks.
+
+    Term frequencies are stored per chunk once; ``scores`` builds a
+    chunks x query-terms frequency matrix and scores every chunk in a single
+    vectorized expression.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.term_counts = [Counter(tokenize(chunk)) for chunk in chunks]
+        self.lengths = np.array([sum(counts.values()) for counts in self.term_counts], dtype=float)
+        self.avg_length = self.lengths.mean() if len(self.lengths) and self.lengths.mean() else 1.0
+        self.doc_freq = Counter(term for counts in self.term_counts for term in counts)
+
+    def scores(self, query: str):
+        """BM25 score of every chunk for ``query``, in chunk order."""
+        terms = sorted(set(tokenize(query)))
+        if not terms or not self.term_counts:
+            return np.zeros(len(self.term_counts))
+        n = len(self.term_counts)
+        df = np.array([self.doc_freq.get(term, 0) for term in terms], dtype=float)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        tf = np.array([[counts.get(term, 0) for term in terms] for counts in self.term_counts], dtype=float)
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / self.avg_length)
+        return (idf * tf * (self.k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def topic_query(topic: str, description=None) -> str:
+    return f"{topic} {description}" if description else topic
+
+
+def select_chunks(chunks, scores, top_k=None, token_budget=None):
+    """Indexes of the best-scoring chunks that fit ``top_k`` and ``token_budget``, in document order.
+
+    Chunks are taken by descending score; one that would overflow the token
+    budget is skipped so a smaller, lower-ranked chunk can still fit. A
+    ``top_k`` or ``token_budget`` of 0 lifts that cap.
+    """
+    top_k = top_k if top_k is not None else int(os.getenv("SUMMARY_TOP_K", 12))
+    token_budget = token_budget if token_budget is not None else int(os.getenv("SUMMARY_TOKEN_BUDGET", 4000))
+    selected, spent = [], 0
+    # Stable sort keeps document order among equal scores
+    for index in np.argsort(-np.asarray(scores), kind="stable"):
+        if top_k and len(selected) == top_k:
+            break
+        cost = estimate_tokens(chunks[index])
+        if token_budget and spent + cost > token_budget:
+            continue
+        selected.append(int(index))
+        spent += cost
+    return sorted(selected)
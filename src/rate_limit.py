@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+import time
+
+# Conservative per-provider quotas; override with <PROVIDER>_RPM / <PROVIDER>_TPM.
+DEFAULT_LIMITS = {
+    "GOOGLE": {"rpm": 60, "tpm": 1_000_000},
+    "OPENAI": {"rpm": 500, "tpm": 30_000},
+    "SARVAM": {"rpm": 20, "tpm": 40_000},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for rate limiting."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` tokens a minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount) -> float:
+        """Take ``amount`` tokens and return how long the caller must wait before using them.
+
+        The bucket may go into debt so that concurrent callers queue up in
+        arrival order instead of all retrying at once.
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def reserve(self, tokens) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    async def aacquire(self, tokens):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Return the process-wide limiter for ``provider`` so all agents share one quota."""
+    provider = (provider or "").upper()
+    with _limiters_lock:
+        if provider not in _limiters:
+            defaults = DEFAULT_LIMITS.get(provider, {"rpm": 60, "tpm": 100_000})
+            rpm = int(os.getenv(f"{provider}_RPM", defaults["rpm"]))
+            tpm = int(os.getenv(f"{provider}_TPM", defaults["tpm"]))
+            _limiters[provider] = RateLimiter(rpm, tpm)
+        return _limiters[provider]
@@ -0,0 +1,202 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+
+from src.telemetry import current_span
+
+# Upper bounds (seconds) of the latency histogram buckets: 50ms doubling up to ~7 minutes
+LATENCY_BUCKETS = [0.05 * 2 ** i for i in range(14)]
+
+
+class LatencyHistogram:
+    """Counts of call latencies in fixed, doubling buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the ``q`` quantile; None before any calls."""
+        if not self.count:
+            return None
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+
+    def to_dict(self):
+        return {"count": self.count, "p50": self.quantile(0.5), "p95": self.quantile(0.95),
+                "buckets": {f"le_{bound:g}": n for bound, n in zip(LATENCY_BUCKETS + [float("inf")], self.counts) if n}}
+
+
+class ProviderRouter:
+    """Sends each LLM call to the first healthy provider, hedging slow calls and failing over on errors.
+
+    ``providers`` are in preference order. When the first attempt has not
+    answered within the hedge deadline (the provider's observed p95 once
+    it has ``LLM_HEDGE_MIN_SAMPLES`` calls, else ``LLM_HEDGE_SECONDS``), a
+    duplicate goes to the next provider and the first answer wins. A failed
+    attempt is retried on the next provider, and a provider that fails
+    ``LLM_FAILOVER_ERRORS`` calls in a row is skipped for
+    ``LLM_FAILOVER_SECONDS``.
+    """
+
+    def __init__(self, providers, hedge_quantile=None, hedge_seconds=None, min_samples=None,
+                 failover_errors=None, failover_seconds=None):
+        self.providers = list(providers)
+        self.hedge_quantile = hedge_quantile or float(os.getenv("LLM_HEDGE_QUANTILE", 0.95))
+        self.hedge_seconds = hedge_seconds or float(os.getenv("LLM_HEDGE_SECONDS", 30))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+        self.failover_errors = failover_errors or int(os.getenv("LLM_FAILOVER_ERRORS", 3))
+        self.failover_seconds = failover_seconds or float(os.getenv("LLM_FAILOVER_SECONDS", 60))
+        self.latency = {provider: LatencyHistogram() for provider in self.providers}
+        self.stats = {provider: {"calls": 0, "wins": 0, "errors": 0, "hedges": 0} for provider in self.providers}
+        self._consecutive_errors = dict.fromkeys(self.providers, 0)
+        self._down_until = dict.fromkeys(self.providers, 0.0)
+        self._lock = threading.Lock()
+
+    def order(self):
+        """Providers to try, healthy ones first; ones that are down stay as a last resort."""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.providers, key=lambda provider: self._down_until[provider] > now)
+
+    def hedge_delay(self, provider) -> float:
+        histogram = self.latency[provider]
+        if histogram.count < self.min_samples:
+            return self.hedge_seconds
+        return histogram.quantile(self.hedge_quantile)
+
+    def _succeeded(self, provider, seconds):
+        with self._lock:
+            self.latency[provider].observe(seconds)
+            self.stats[provider]["wins"] += 1
+            self._consecutive_errors[provider] = 0
+            self._down_until[provider] = 0.0
+
+    def _lost(self, provider, seconds):
+        """A hedged-against attempt was cancelled after ``seconds``; it would have taken at least that long."""
+        with self._lock:
+            self.latency[provider].observe(seconds)
+
+    def _failed(self, provider, error):
+        with self._lock:
+            self.stats[provider]["errors"] += 1
+            self._consecutive_errors[provider] += 1
+            if self._consecutive_errors[provider] < self.failover_errors:
+                return
+            self._consecutive_errors[provider] = 0
+            self._down_until[provider] = time.monotonic() + self.failover_seconds
+        print(f"{provider} failed {self.failover_errors} calls in a row ({error}); "
+              f"routing around it for {self.failover_seconds:g}s")
+
+    async def call(self, attempt):
+        """Await ``attempt(provider)`` on the best provider, hedged and failed over as described above."""
+        call_span = current_span()
+        order = self.order()
+        queue = order[1:]
+        pending = {}
+        error = None
+
+        def launch(provider):
+            with self._lock:
+                self.stats[provider]["calls"] += 1
+            pending[asyncio.ensure_future(attempt(provider))] = (provider, time.perf_counter())
+
+        launch(order[0])
+        deadline = time.perf_counter() + self.hedge_delay(order[0])
+        hedged = False
+        try:
+            while pending:
+                timeout = max(deadline - time.perf_counter(), 0) if queue and not hedged else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # No answer by the deadline: race a duplicate on the next provider
+                    hedged = True
+                    provider = queue.pop(0)
+                    with self._lock:
+                        self.stats[provider]["hedges"] += 1
+                    call_span.add("hedges")
+                    launch(provider)
+                    continue
+                for task in done:
+                    provider, started = pending.pop(task)
+                    if task.exception() is None:
+                        self._succeeded(provider, time.perf_counter() - started)
+                        call_span.set(provider=provider)
+                        return task.result()
+                    error = task.exception()
+                    self._failed(provider, error)
+                if not pending and queue:
+                    call_span.add("failovers")
+                    launch(queue.pop(0))
+            raise error
+        finally:
+            # Keep the slow attempts in the histogram, or the p95 deadline drifts down and hedges grow
+            now = time.perf_counter()
+            for task, (provider, started) in pending.items():
+                task.cancel()
+                self._lost(provider, now - started)
+
+    async def stream(self, open_stream):
+        """Yield from ``open_stream(provider)``, failing over to the next provider until the first chunk.
+
+        Streams are not hedged: two providers would be writing the same reply.
+        """
+        call_span = current_span()
+        order = self.order()
+        for i, provider in enumerate(order):
+            with self._lock:
+                self.stats[provider]["calls"] += 1
+            started = time.perf_counter()
+            first = True
+            try:
+                async for chunk in open_stream(provider):
+                    if first:
+                        first = False
+                        call_span.set(provider=provider)
+                    yield chunk
+            except Exception as e:
+                self._failed(provider, e)
+                if not first or i == len(order) - 1:
+                    raise
+                call_span.add("failovers")
+                continue
+            self._succeeded(provider, time.perf_counter() - started)
+            return
+
+    def to_dict(self):
+        with self._lock:
+            return {provider: {**self.stats[provider], "latency": self.latency[provider].to_dict()}
+                    for provider in self.providers}
+
+    def summary(self):
+        parts = []
+        for provider, info in self.to_dict().items():
+            p95 = info["latency"]["p95"]
+            parts.append(f"{provider} {info['wins']}/{info['calls']} won, {info['hedges']} hedges, "
+                         f"{info['errors']} errors, p95 {f'{p95:g}s' if p95 is not None else '-'}")
+        return "; ".join(parts)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """The process-wide router over LLM_ROUTER_PROVIDERS (e.g. "OPENAI,GOOGLE"), or None when not configured."""
+    global _router
+    providers = [p.strip().upper() for p in os.getenv("LLM_ROUTER_PROVIDERS", "").split(",") if p.strip()]
+    if len(providers) < 2:
+        return None
+    with _router_lock:
+        if _router is None or _router.providers != providers:
+            _router = ProviderRouter(providers)
+        return _router
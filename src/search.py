@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from src.llm import load_env
+from src.telemetry import span
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _slug(query: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+
+
+class TavilyBackend:
+    """Web search through Tavily; results are reduced to url, title and content."""
+
+    name = "tavily"
+
+    def __init__(self):
+        self._tool = None
+
+    def _get_tool(self, max_results):
+        if self._tool is None:
+            from langchain_tavily import TavilySearch
+            load_env()
+            self._tool = TavilySearch(max_results=max_results)
+        return self._tool
+
+    @staticmethod
+    def _results(response):
+        # The tool reports failures (quota, network) as {"error": ...} instead of raising
+        if "error" in response:
+            raise RuntimeError(f"Tavily search failed: {response['error']}")
+        return [{"url": result["url"], "title": result.get("title", ""), "content": result.get("content", "")}
+                for result in response.get("results", [])]
+
+    async def asearch(self, query: str, max_results: int):
+        return self._results(await self._get_tool(max_results).ainvoke(query))
+
+
+class FixtureBackend:
+    """Serves canned results from ``<directory>/<query-slug>.json``, falling back to ``default.json``.
+
+    Each file holds ``{"results": [{"url": ..., "title": ..., "content": ...}]}``
+    in the shape Tavily returns, so the research stage can run offline and
+    deterministically.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # Part of the cache key, so different fixture sets never share entries
+        self.name = f"fixture:{os.path.abspath(directory)}"
+
+    def search(self, query: str, max_results: int):
+        for name in (f"{_slug(query)}.json", "default.json"):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    return json.load(f).get("results", [])[:max_results]
+        return []
+
+    async def asearch(self, query: str, max_results: int):
+        return self.search(query, max_results)
+
+
+class SearchCache:
+    """Persistent query -> results cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.getenv("SEARCH_CACHE_PATH", "artifacts/.search_cache.sqlite3")
+        self.ttl = ttl if ttl is not None else float(os.getenv("SEARCH_CACHE_TTL", 6 * 3600))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )""")
+        self._db.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, query: str, results):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO results (key, query, value, created_at) VALUES (?, ?, ?, ?)",
+                             (key, query, json.dumps(results), now))
+            self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            self._db.commit()
+
+
+class CachedSearch:
+    """Search front end shared by all research runs in the process.
+
+    A query is answered from the cache while its entry is fresh; empty
+    results are not cached, and backend errors propagate. Concurrent
+    misses for the same query are coalesced: the first caller queries the
+    backend and the others wait for its result instead of issuing their own
+    request.
+    """
+
+    def __init__(self, backend, cache=None, max_results=5):
+        self.backend = backend
+        self.cache = cache
+        self.max_results = max_results
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _key(self, query: str) -> str:
+        data = f"{self.backend.name}\0{self.max_results}\0{_normalize_query(query)}"
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _cached(self, key):
+        # Empty entries written before they were refused count as misses
+        return (self.cache.get(key) or None) if self.cache is not None else None
+
+    async def asearch(self, query: str):
+        """Return ``[{"url", "title", "content"}, ...]`` for ``query``."""
+        with span("search", query=query, backend=self.backend.name) as search_span:
+            key = self._key(query)
+            role, found = self._begin(key, search_span)
+            if role == "hit":
+                results = found
+            elif role == "follow":
+                results = await asyncio.wrap_future(found)
+            else:
+                results = await self._lead(key, query, found)
+            search_span.set(results=len(results))
+        return results
+
+    def _begin(self, key, search_span):
+        """Classify a lookup as ("hit", results), ("follow", leader's future) or ("lead", our future)."""
+        results = self._cached(key)
+        if results is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            search_span.add("cache_hits")
+            return "hit", results
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                return "lead", future
+            self.stats["coalesced"] += 1
+        search_span.set(coalesced=True)
+        return "follow", future
+
+    async def _lead(self, key, query, future):
+        try:
+            # Another leader may have finished between our cache miss and taking the lead
+            results = self._cached(key)
+            if results is None:
+                with self._lock:
+                    self.stats["misses"] += 1
+                results = await self.backend.asearch(query, self.max_results)
+                # An empty answer is as likely a hiccup as a fact; don't pin it for the whole TTL
+                if self.cache is not None and results:
+                    self.cache.put(key, query, results)
+            future.set_result(results)
+            return results
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def summary(self):
+        s = self.stats
+        return f"{s['hits']} hits, {s['misses']} misses, {s['coalesced']} coalesced"
+
+
+_searches = {}
+_searches_lock = threading.Lock()
+
+
+def get_search(max_results=5) -> CachedSearch:
+    """Return the process-wide search for SEARCH_BACKEND (tavily or fixture) so concurrent topics share it.
+
+    The fixture backend reads SEARCH_FIXTURE_DIR; SEARCH_CACHE=off disables the result cache.
+    """
+    load_env()
+    backend_name = os.getenv("SEARCH_BACKEND", "tavily").lower()
+    fixture_dir = os.getenv("SEARCH_FIXTURE_DIR")
+    use_cache = os.getenv("SEARCH_CACHE", "on").lower() != "off"
+    config = (backend_name, fixture_dir, use_cache, max_results)
+    with _searches_lock:
+        if config not in _searches:
+            if backend_name == "tavily":
+                backend = TavilyBackend()
+            elif backend_name == "fixture" and fixture_dir:
+                backend = FixtureBackend(fixture_dir)
+            elif backend_name == "fixture":
+                raise ValueError("SEARCH_BACKEND=fixture needs SEARCH_FIXTURE_DIR")
+            else:
+                raise ValueError("SEARCH_BACKEND must be 'tavily' or 'fixture'")
+            _searches[config] = CachedSearch(backend, SearchCache() if use_cache else None, max_results)
+        return _searches[config]
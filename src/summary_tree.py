@@ -0,0 +1,76 @@
+import hashlib
+import json
+import math
+import os
+
+from src.chunking import window_tokens
+
+
+class LevelCache:
+    """Outputs of each level of a topic's summary tree, kept in ``summary_tree.json``.
+
+    A level is keyed by everything that determines its outputs (prompt,
+    model, reply length and its input texts), so a rerun over the same
+    research reuses every level whose inputs did not change, even with
+    the LLM response cache off. Levels not used by the latest run are
+    dropped when it saves.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._levels = {}
+        self._used = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._levels = {level["key"]: level for level in json.load(f)}
+
+    @staticmethod
+    def key(template: str, model, output_tokens: int, texts) -> str:
+        digest = hashlib.sha256(json.dumps([template, model, output_tokens]).encode("utf-8"))
+        for text in texts:
+            digest.update(b"\0" + text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        level = self._levels.get(key)
+        if level is None:
+            return None
+        self._used[key] = level
+        return level["outputs"]
+
+    def put(self, key: str, depth: int, outputs):
+        self._used[key] = {"key": key, "depth": depth, "outputs": outputs}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(sorted(self._used.values(), key=lambda level: level["depth"]), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def reduce_calls(count: int, tokens: int, window: int, target: int, max_depth: int):
+    """Calls per reduce level for ``count`` texts of ``tokens`` tokens each, by the same rule AnalysisAgent uses.
+
+    Texts are grouped into windows of ``window`` tokens and each group is
+    reduced to one text of ``tokens`` tokens, until everything fits in
+    ``target`` tokens, one text remains, or ``max_depth`` levels were used.
+    """
+    levels = []
+    per_call = window // (tokens + 2)
+    # With room for only one text per call a level would not shrink anything
+    while count > 1 and count * tokens > target and len(levels) < max_depth and per_call > 1:
+        count = math.ceil(count / per_call)
+        levels.append(count)
+    return levels
+
+
+def reduce_max_depth() -> int:
+    return int(os.getenv("REDUCE_MAX_DEPTH", 4))
+
+
+def narrative_input_tokens(provider: str, template_tokens: int, output_tokens: int) -> int:
+    """How much summary text the narrative prompt takes before it is reduced further (NARRATIVE_INPUT_TOKENS)."""
+    if os.getenv("NARRATIVE_INPUT_TOKENS"):
+        return int(os.getenv("NARRATIVE_INPUT_TOKENS"))
+    return window_tokens(provider, template_tokens, output_tokens, 1)
@@ -0,0 +1,196 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# (tracer, span) that new spans in this context are children of
+_current = ContextVar("telemetry_current", default=None)
+
+
+class Span:
+    """One timed operation with free-form numeric/string attributes."""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "duration", "attributes", "error", "_t0")
+
+    def __init__(self, name, span_id, parent_id, attributes):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self, run_start):
+        span = {"id": self.span_id, "parent": self.parent_id, "name": self.name,
+                "start": round(self.start - run_start, 4),
+                "duration": round(self.duration, 4) if self.duration is not None else None,
+                "attributes": self.attributes}
+        if self.error:
+            span["error"] = self.error
+        return span
+
+
+class _NullSpan:
+    """Stands in for a span when no run is being traced."""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects the spans of one pipeline run; safe to use from the run's worker threads."""
+
+    def __init__(self, name, /, **attributes):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.spans = []
+        # Structured results of the run kept next to the spans in run.json (e.g. the budget plan)
+        self.records = {}
+        self.root = self._start(name, None, attributes)
+
+    def _start(self, name, parent, attributes):
+        with self._lock:
+            span = Span(name, next(self._ids), parent.span_id if parent else None, attributes)
+            self.spans.append(span)
+        return span
+
+    @staticmethod
+    def _finish(span):
+        span.duration = time.perf_counter() - span._t0
+
+    def totals(self):
+        """Run-wide sums of the counters recorded on spans."""
+        totals = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "bytes_fetched": 0,
+                  "bytes_written": 0, "cache_hits": 0, "retries": 0}
+        for span in self.spans:
+            attributes = span.attributes
+            if span.name.startswith("llm."):
+                totals["llm_calls"] += 1
+            totals["prompt_tokens"] += attributes.get("prompt_tokens", 0)
+            totals["completion_tokens"] += attributes.get("completion_tokens", 0)
+            totals["cache_hits"] += attributes.get("cache_hits", 0)
+            totals["retries"] += attributes.get("retries", 0)
+            if span.name == "fetch":
+                totals["bytes_fetched"] += attributes.get("bytes", 0)
+            elif span.name == "write":
+                totals["bytes_written"] += attributes.get("bytes", 0)
+        return totals
+
+    def to_dict(self):
+        run_start = self.root.start
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {"name": self.root.name, "started_at": run_start, "duration": self.root.duration,
+                "attributes": self.root.attributes, "totals": self.totals(), **self.records,
+                "spans": [span.to_dict(run_start) for span in spans[1:]]}
+
+    def write(self, path):
+        """Write the run as JSON (``run.json``) next to the run's artifacts."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+@contextmanager
+def trace_run(name, /, **attributes):
+    """Trace everything started from this context (including copied contexts in worker threads)."""
+    tracer = Tracer(name, **attributes)
+    token = _current.set((tracer, tracer.root))
+    try:
+        yield tracer
+    except BaseException as e:
+        tracer.root.error = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        tracer._finish(tracer.root)
+
+
+@contextmanager
+def span(name, /, **attributes):
+    """Record a child span of the current span; a no-op outside ``trace_run``."""
+    current = _current.get()
+    if current is None:
+        yield NULL_SPAN
+        return
+    tracer, parent = current
+    child = tracer._start(name, parent, attributes)
+    token = _current.set((tracer, child))
+    try:
+        yield child
+    except BaseException as e:
+        child.error = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        tracer._finish(child)
+
+
+def current_span():
+    current = _current.get()
+    return current[1] if current else NULL_SPAN
+
+
+def record(key, value):
+    """Keep ``value`` under ``key`` in the current run's run.json; a no-op outside ``trace_run``."""
+    current = _current.get()
+    if current is not None:
+        current[0].records[key] = value
+
+
+_otel_tracer = None
+
+
+def export_otel(tracer):
+    """Replay a finished run's spans through OpenTelemetry (TELEMETRY_EXPORTER=otlp).
+
+    Uses the OTLP exporter, configured by the standard OTEL_EXPORTER_OTLP_*
+    variables; needs opentelemetry-sdk and opentelemetry-exporter-otlp.
+    """
+    global _otel_tracer
+    try:
+        from opentelemetry import trace
+        from opentelemetry.trace import Status, StatusCode
+    except ImportError:
+        print("TELEMETRY_EXPORTER=otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp installed")
+        return
+    if _otel_tracer is None:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": "content-weaver"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        _otel_tracer = provider.get_tracer("content-weaver")
+
+    otel_spans = {}
+    for recorded in sorted(tracer.spans, key=lambda s: s.start):
+        parent = otel_spans.get(recorded.parent_id)
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        start_ns = int(recorded.start * 1e9)
+        otel_span = _otel_tracer.start_span(recorded.name, context=context, start_time=start_ns,
+                                            attributes=recorded.attributes)
+        if recorded.error:
+            otel_span.set_status(Status(StatusCode.ERROR, recorded.error))
+        otel_span.end(end_time=start_ns + int((recorded.duration or 0) * 1e9))
+        otel_spans[recorded.span_id] = otel_span
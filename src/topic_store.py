@@ -0,0 +1,233 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+
+# Fields of a topic as they appear in topics.json
+TOPIC_FIELDS = ("id", "title", "description", "status", "created_at", "completed_at")
+
+
+def _snapshot(topic) -> str:
+    """The fields a person may change in topics.json, to tell when the file was edited."""
+    return json.dumps([topic.get("title"), topic.get("description"), topic.get("status", "new")])
+
+
+class TopicStore:
+    """SQLite-backed topic queue shared by every worker process.
+
+    Workers claim topics with a time-limited lease and extend it with
+    heartbeats while they run. A topic whose lease expires (because its
+    worker crashed) goes back to ``new``, or to ``failed`` once it has been
+    attempted ``max_attempts`` times. ``topics.json`` remains the
+    human-editable view: ``import_json`` adds topics that are not in the store
+    yet and applies edits made to the file since it was last written, and
+    ``export_json`` merges the file in that way before rewriting it from the
+    store, so topics added or changed during a run are kept.
+    """
+
+    def __init__(self, path=None, lease_seconds=None, max_attempts=None):
+        self.path = path or os.getenv("TOPIC_DB_PATH", "artifacts/topics.sqlite3")
+        self.lease_seconds = lease_seconds or float(os.getenv("TOPIC_LEASE_SECONDS", 15 * 60))
+        self.max_attempts = max_attempts or int(os.getenv("TOPIC_MAX_ATTEMPTS", 3))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS topics (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT,
+            completed_at TEXT,
+            position INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            heartbeat_at REAL,
+            exported TEXT
+        )""")
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(topics)")}
+        if "exported" not in columns:
+            # Stores created before edits to topics.json were tracked
+            self._db.execute("ALTER TABLE topics ADD COLUMN exported TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS topics_status_position ON topics (status, position)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS topics_status_lease ON topics (status, lease_expires)")
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent claims serialize
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def import_json(self, path="topics.json") -> int:
+        """Merge ``path`` into the store; returns how many topics were added.
+
+        A topic whose title, description or status differ from what was last
+        written to the file was edited by hand, and the edit is applied (a
+        status change only while no worker holds the topic; setting it back to
+        ``new`` also resets its attempts).
+        """
+        try:
+            with open(path, "r") as f:
+                topics = json.load(f).get("topics", [])
+        except FileNotFoundError:
+            return 0
+        added = 0
+        with self._transaction() as db:
+            position = db.execute("SELECT COALESCE(MAX(position), -1) FROM topics").fetchone()[0]
+            for topic in topics:
+                snapshot = _snapshot(topic)
+                row = db.execute("SELECT exported, lease_owner FROM topics WHERE id = ?", (topic["id"],)).fetchone()
+                if row is None:
+                    position += 1
+                    # Topics left in_progress by an older, lease-less run are immediately reclaimable
+                    lease_expires = 0 if topic.get("status") == "in_progress" else None
+                    db.execute(
+                        """INSERT INTO topics
+                           (id, title, description, status, created_at, completed_at, position, lease_expires,
+                            exported)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (topic["id"], topic["title"], topic.get("description"), topic.get("status", "new"),
+                         topic.get("created_at"), topic.get("completed_at"), position, lease_expires, snapshot))
+                    added += 1
+                elif row["exported"] is not None and row["exported"] != snapshot:
+                    db.execute("UPDATE topics SET title = ?, description = ?, exported = ? WHERE id = ?",
+                               (topic["title"], topic.get("description"), snapshot, topic["id"]))
+                    if row["lease_owner"] is None:
+                        db.execute("""UPDATE topics SET status = ?,
+                                      attempts = CASE WHEN ? = 'new' THEN 0 ELSE attempts END,
+                                      completed_at = CASE WHEN ? = 'completed' THEN completed_at ELSE NULL END
+                                      WHERE id = ?""",
+                                   (topic.get("status", "new"), topic.get("status", "new"),
+                                    topic.get("status", "new"), topic["id"]))
+        return added
+
+    def export_json(self, path="topics.json"):
+        """Merge ``path`` into the store (see ``import_json``), then atomically rewrite it from the store."""
+        self.import_json(path)
+        with self._transaction() as db:
+            rows = db.execute(f"SELECT {', '.join(TOPIC_FIELDS)} FROM topics ORDER BY position").fetchall()
+            db.executemany("UPDATE topics SET exported = ? WHERE id = ?",
+                           [(_snapshot(dict(row)), row["id"]) for row in rows])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"topics": [dict(row) for row in rows]}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _reclaim_expired(self, db, now):
+        db.execute("""UPDATE topics SET status = 'failed', lease_owner = NULL, lease_expires = NULL
+                      WHERE status = 'in_progress' AND lease_expires < ? AND attempts >= ?""",
+                   (now, self.max_attempts))
+        db.execute("""UPDATE topics SET status = 'new', lease_owner = NULL, lease_expires = NULL
+                      WHERE status = 'in_progress' AND lease_expires < ?""", (now,))
+
+    def claim(self, owner, limit=1):
+        """Atomically lease up to ``limit`` new topics to ``owner`` and return them."""
+        now = time.time()
+        with self._transaction() as db:
+            self._reclaim_expired(db, now)
+            rows = db.execute(
+                f"SELECT {', '.join(TOPIC_FIELDS)} FROM topics WHERE status = 'new' ORDER BY position LIMIT ?",
+                (limit,)).fetchall()
+            for row in rows:
+                db.execute("""UPDATE topics SET status = 'in_progress', attempts = attempts + 1,
+                              lease_owner = ?, lease_expires = ?, heartbeat_at = ? WHERE id = ?""",
+                           (owner, now + self.lease_seconds, now, row["id"]))
+        return [dict(row, status="in_progress") for row in rows]
+
+    def heartbeat(self, topic_id, owner) -> bool:
+        """Extend ``owner``'s lease on a topic; False means the lease was lost."""
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute("""UPDATE topics SET lease_expires = ?, heartbeat_at = ?
+                                   WHERE id = ? AND lease_owner = ? AND status = 'in_progress'""",
+                                (now + self.lease_seconds, now, topic_id, owner))
+        return cursor.rowcount == 1
+
+    def complete(self, topic_id, owner) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute("""UPDATE topics SET status = 'completed', completed_at = ?,
+                                   lease_owner = NULL, lease_expires = NULL
+                                   WHERE id = ? AND lease_owner = ?""",
+                                (datetime.now().isoformat()[:10], topic_id, owner))
+        return cursor.rowcount == 1
+
+    def fail(self, topic_id, owner) -> bool:
+        """Give a topic back: to ``new`` for another attempt, or ``failed`` once attempts run out."""
+        with self._transaction() as db:
+            cursor = db.execute("""UPDATE topics
+                                   SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'new' END,
+                                       lease_owner = NULL, lease_expires = NULL
+                                   WHERE id = ? AND lease_owner = ?""",
+                                (self.max_attempts, topic_id, owner))
+        return cursor.rowcount == 1
+
+    def get(self, topic_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM topics WHERE id = ?", (topic_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self, status) -> int:
+        if status == "new":
+            # Count what claim would hand out, including topics whose lease has expired
+            with self._transaction() as db:
+                self._reclaim_expired(db, time.time())
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM topics WHERE status = ?", (status,)).fetchone()[0]
+
+
+def worker_id() -> str:
+    """Lease owner name for the current process and thread."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+@contextmanager
+def keep_alive(store, topic_id, owner):
+    """Heartbeat ``owner``'s lease in the background while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(store.lease_seconds / 3):
+            if not store.heartbeat(topic_id, owner):
+                print(f"Lost lease on topic {topic_id}")
+                return
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{topic_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+@asynccontextmanager
+async def akeep_alive(store, topic_id, owner):
+    """``keep_alive`` for coroutines: the heartbeat is a task on the running loop, not a thread to join."""
+    async def beat():
+        while True:
+            await asyncio.sleep(store.lease_seconds / 3)
+            # The heartbeat is a SQLite write; keep it off the event loop
+            if not await asyncio.to_thread(store.heartbeat, topic_id, owner):
+                print(f"Lost lease on topic {topic_id}")
+                return
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
@@ -2,13 +2,13 @@
 
 import os
 import sys
-import json
 import pytest
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.agents import AnalysisAgent, ResearchAgent
+from src.chunk_store import ChunkStore
 
 @pytest.fixture
 def analysis_agent():
@@ -21,14 +21,13 @@ def research_chunks_fixture():
     Provides research chunks for the analysis agent, either by running the
     ResearchAgent or by loading from a cached file.
     """
-    output_dir = "artifacts"
-    chunks_path = os.path.join(output_dir, "research_chunks.json")
+    output_dir = os.path.join("artifacts", "the-future-of-ai")
+    chunks_path = os.path.join(output_dir, "chunks.npy")
 
     # If cached chunks exist, load them to save time and tokens
     if os.path.exists(chunks_path):
         print("\nLoading cached research chunks...")
-        with open(chunks_path, 'r') as f:
-            return json.load(f)
+        return ChunkStore(output_dir)
     else:
         # If no cache, run the ResearchAgent to generate them
         print("\nNo cached chunks found. Running ResearchAgent to generate them...")
@@ -41,7 +40,7 @@ def test_analysis_agent_execution(analysis_agent, research_chunks_fixture):
     This test uses cached research data if available.
     """
     # 1. Setup
-    output_dir = "artifacts"
+    output_dir = os.path.join("artifacts", "the-future-of-ai")
     narrative_path = os.path.join(output_dir, "narrative.md")
 
     # Clean up previous run artifact
@@ -49,7 +48,7 @@ def test_analysis_agent_execution(analysis_agent, research_chunks_fixture):
         os.remove(narrative_path)
 
     # 2. Execution
-    analysis_agent.execute(research_chunks_fixture)
+    analysis_agent.execute(research_chunks_fixture, "The future of AI")
 
     # 3. Verification
     assert os.path.exists(narrative_path), "Analysis artifact (narrative.md) was not created."
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import offline_pipeline
+from src.agents import OrchestratorAgent
+from src.budget import BatchBudget, BudgetPlanner
+
+PROMPT_TOKENS = {"summary": 20, "reduce": 30, "narrative": 100, "scriptwriting": 150, "article_writing": 150,
+                 "visual_assets": 120}
+CHUNK_TOKENS = [300] * 40
+
+
+def _planner(**limits):
+    return BudgetPlanner(PROMPT_TOKENS, "OPENAI", "gpt-4", **limits)
+
+
+def test_estimate_covers_every_llm_stage():
+    plan = _planner().plan(CHUNK_TOKENS)
+
+    stages = plan.estimate["stages"]
+    assert set(stages) == {"summary", "reduce", "narrative", "scriptwriting", "article_writing", "visual_assets"}
+    # 12 chunks of 300 tokens fit the default 4000-token selection budget
+    assert stages["summary"]["prompt_tokens"] >= 12 * 300
+    assert plan.estimate["tokens"] == sum(s["prompt_tokens"] + s["completion_tokens"] for s in stages.values())
+    assert plan.estimate["cost"] > 0 and plan.estimate["seconds"] > 0
+    assert plan.decisions == [] and plan.within_budget
+    assert stages["reduce"]["calls"] == 0  # the summaries of 12 chunks fit the narrative prompt
+
+
+def test_uncapped_selection_is_estimated_with_reduce_levels(monkeypatch):
+    monkeypatch.setenv("SUMMARY_TOP_K", "0")
+    monkeypatch.setenv("SUMMARY_TOKEN_BUDGET", "0")
+    plan = _planner().plan([300] * 500)
+
+    assert plan.estimate["selected_tokens"] == 500 * 300
+    assert plan.estimate["reduce_levels"] >= 1
+    assert plan.estimate["stages"]["reduce"]["calls"] > 0
+    # the narrative prompt stays bounded however many summaries there are
+    assert plan.estimate["stages"]["narrative"]["prompt_tokens"] <= 8192
+
+
+def test_over_token_budget_shortens_summaries_then_drops_chunks():
+    unlimited = _planner().plan(CHUNK_TOKENS)
+    plan = _planner(max_tokens=unlimited.estimate["tokens"] - 2000).plan(CHUNK_TOKENS)
+
+    actions = [decision["action"] for decision in plan.decisions]
+    assert actions[0] == "shorter_summaries"
+    assert "fewer_chunks" in actions
+    assert plan.settings["summary_token_budget"] < unlimited.settings["summary_token_budget"]
+    assert plan.settings["summary_model"] is None  # a cheaper model saves money, not tokens
+    assert plan.within_budget
+
+
+def test_over_cost_budget_moves_summaries_to_a_cheaper_model_first():
+    unlimited = _planner().plan(CHUNK_TOKENS)
+    plan = _planner(max_cost=unlimited.estimate["cost"] * 0.9).plan(CHUNK_TOKENS)
+
+    assert plan.decisions[0]["action"] == "cheaper_map_model"
+    assert plan.settings["summary_model"] == "gpt-4o-mini"
+    assert plan.estimate["stages"]["summary"]["cost"] < unlimited.estimate["stages"]["summary"]["cost"]
+
+
+def test_unreachable_budget_runs_with_the_smallest_plan():
+    plan = _planner(max_tokens=10).plan(CHUNK_TOKENS)
+
+    assert not plan.within_budget
+    assert plan.settings["summary_token_budget"] == 1000
+    assert plan.settings["summary_output_tokens"] == 96
+
+
+def test_digest_depends_on_settings_only():
+    assert _planner().plan(CHUNK_TOKENS).digest() == _planner(max_tokens=10 ** 9).plan(CHUNK_TOKENS).digest()
+    assert _planner().plan(CHUNK_TOKENS).digest() != _planner(max_tokens=10).plan(CHUNK_TOKENS).digest()
+
+
+def test_batch_reservations_shrink_what_later_topics_can_plan_for():
+    unlimited = _planner().plan(CHUNK_TOKENS)
+    batch = BatchBudget(max_tokens=unlimited.estimate["tokens"] + 1000)
+
+    first = _planner(batch=batch).plan(CHUNK_TOKENS)
+    second = _planner(batch=batch).plan(CHUNK_TOKENS)
+    assert first.decisions == []
+    assert second.limits["tokens"] == 1000 and second.decisions
+
+    batch.settle(first.estimate["tokens"], first.estimate["cost"], 500, 0.01)
+    assert batch.spent["tokens"] == 500
+    assert batch.remaining()["tokens"] == unlimited.estimate["tokens"] + 500 - second.estimate["tokens"]
+
+
+def test_pipeline_applies_and_records_the_plan(tmp_path, monkeypatch):
+    monkeypatch.setenv("TOPIC_TOKEN_BUDGET", "3000")
+    with offline_pipeline(str(tmp_path), output_tokens=50):
+        orchestrator = OrchestratorAgent()
+        orchestrator.batch_budget = BatchBudget(max_tokens=10 ** 6)
+        result = orchestrator.execute("Budget Topic")
+
+    budget = result["budget"]
+    assert budget["limits"]["tokens"] == 3000
+    assert budget["decisions"]
+    with open(tmp_path / "artifacts" / "budget-topic" / "run.json") as f:
+        run = json.load(f)
+    assert run["budget"] == budget
+    assert any(span["name"] == "plan" for span in run["spans"])
+    # the reservation was replaced by what the run spent
+    assert orchestrator.batch_budget.spent["tokens"] == (result["telemetry"]["prompt_tokens"]
+                                                        + result["telemetry"]["completion_tokens"])
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.call_executor import CallExecutor, classify_error, retry_after
+from src.telemetry import span, trace_run
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+def test_errors_are_classified_by_status_and_retry_after_is_read():
+    assert classify_error(ProviderError(429)) == "throttled"
+    assert classify_error(ProviderError(503)) == "server"
+    assert classify_error(asyncio.TimeoutError()) == "timeout"
+    assert classify_error(ProviderError(400)) is None
+    assert retry_after(ProviderError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(ProviderError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(ProviderError(429)) is None
+
+
+def test_throttled_calls_halve_the_limit_once_and_are_retried():
+    executor = CallExecutor("TEST", initial=8, maximum=16, base_delay=0.001)
+    throttled = set()
+
+    async def run(i):
+        async def attempt():
+            await asyncio.sleep(0.01)
+            if i not in throttled:
+                throttled.add(i)
+                raise ProviderError(429, {"retry-after": "0.01"})
+            return i
+
+        return await executor.call(attempt)
+
+    async def main():
+        with trace_run("test") as tracer:
+            with span("llm.test"):
+                results = await asyncio.gather(*(run(i) for i in range(8)))
+        return results, tracer
+
+    results, tracer = asyncio.run(main())
+    assert results == list(range(8))
+    # all eight were in flight together, so their 429s count as one signal
+    assert executor.stats["throttled"] == 8 and executor.stats["retries"] == 8
+    # halved to 4 once, then grown back a little by the eight successful retries
+    assert executor.limit.epoch == 1 and 4 <= executor.limit.limit < 8
+    assert tracer.totals()["retries"] == 8
+
+
+def test_successes_grow_the_limit_up_to_the_maximum():
+    executor = CallExecutor("TEST", initial=2, maximum=3)
+
+    async def ok():
+        return "ok"
+
+    async def main():
+        for _ in range(20):
+            await executor.call(ok)
+
+    asyncio.run(main())
+    assert executor.limit.limit == 3
+
+
+def test_permanent_errors_and_exhausted_retries_are_raised():
+    executor = CallExecutor("TEST", max_retries=2, base_delay=0.001)
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise ProviderError(400)
+
+    async def overloaded():
+        attempts.append(1)
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(executor.call(bad_request))
+    assert len(attempts) == 1
+    with pytest.raises(ProviderError):
+        asyncio.run(executor.call(overloaded))
+    assert len(attempts) == 1 + 3
+    assert executor.stats["failed"] == 2
+
+
+def test_streams_are_retried_only_before_the_first_chunk():
+    executor = CallExecutor("TEST", base_delay=0.001)
+    opened = []
+
+    async def flaky_open():
+        opened.append(1)
+        if len(opened) == 1:
+            raise ProviderError(429)
+        yield "a"
+        yield "b"
+
+    async def broken_midway():
+        yield "a"
+        raise ProviderError(503)
+
+    async def collect(open_stream):
+        return [chunk async for chunk in executor.stream(open_stream)]
+
+    assert asyncio.run(collect(flaky_open)) == ["a", "b"]
+    assert len(opened) == 2
+    with pytest.raises(ProviderError):
+        asyncio.run(collect(broken_midway))
+
+
+def test_cached_replies_skip_the_rate_limiter_and_the_limit(tmp_path, monkeypatch):
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from langchain_core.prompts import ChatPromptTemplate
+
+    from src import agents
+    from src.agents import ScriptwritingAgent
+    from src.llm_cache import LLMCache
+
+    monkeypatch.setenv("LLM_PROVIDER", "OPENAI")
+    executor = CallExecutor("OPENAI", initial=4, maximum=16)
+    reservations = []
+
+    class Limiter:
+        async def aacquire(self, tokens):
+            reservations.append(tokens)
+
+    monkeypatch.setattr(agents, "get_call_executor", lambda provider: executor)
+    monkeypatch.setattr(agents, "get_rate_limiter", lambda provider: Limiter())
+    cache = LLMCache("scriptwriting", path=str(tmp_path / "llm.sqlite3"))
+    agent = ScriptwritingAgent()
+    chain = ChatPromptTemplate.from_template("write about {topic}") | FakeListChatModel(
+        responses=["first", "second"], cache=cache)
+
+    async def invoke():
+        return await agent._ainvoke(chain, {"topic": "caching"}, "script", reserve_tokens=100)
+
+    with trace_run("run") as tracer:
+        first = asyncio.run(invoke())
+        window = executor.limit.window
+        second = asyncio.run(invoke())
+
+    assert first.content == second.content == "first"
+    assert reservations == [100]
+    assert executor.stats["calls"] == 1 and executor.limit.window == window
+    assert cache.stats == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+    assert tracer.totals()["cache_hits"] == 1
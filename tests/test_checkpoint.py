@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents import OrchestratorAgent
+from src.checkpoint import Checkpoint
+from src.chunk_store import ChunkStore
+
+
+class FakeAgent:
+    """Stands in for a pipeline agent: writes its artifact and counts calls."""
+
+    summary_template = "Summarize: {text}"
+    reduce_template = "Combine: {text}"
+
+    def __init__(self, artifact, template="v1"):
+        self.artifact = artifact
+        self.template = template
+        self.calls = 0
+
+    def fingerprint(self):
+        return {"agent": self.artifact, "template": self.template}
+
+    def execute(self, upstream, topic, description=None, on_token=None, plan=None):
+        self.calls += 1
+        content = f"{self.artifact}<-{str(upstream)[:40]}|{self.template}"
+        output_dir = f"artifacts/{topic.lower().replace(' ', '-')}"
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, self.artifact), "w") as f:
+            f.write(content)
+        return {"content": content, "token_usage": {"total_tokens": 10}}
+
+    async def aexecute(self, *args, **kwargs):
+        return self.execute(*args, **kwargs)
+
+
+class FakeResearchAgent(FakeAgent):
+    chunks = 1
+    sources = []
+
+    def execute(self, topic, description=None):
+        self.calls += 1
+        output_dir = f"artifacts/{topic.lower().replace(' ', '-')}"
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "sources.json"), "w") as f:
+            json.dump(self.sources, f)
+        return ChunkStore.write(output_dir, [(0, [f"chunk about {topic}"] * self.chunks)])
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_PROVIDER", "OPENAI")
+    orchestrator = OrchestratorAgent()
+    orchestrator.research_agent = FakeResearchAgent("research")
+    orchestrator.analysis_agent = FakeAgent("narrative.md")
+    orchestrator.scriptwriting_agent = FakeAgent("script.md")
+    orchestrator.article_writer_agent = FakeAgent("article.md")
+    orchestrator.visual_asset_agent = FakeAgent("shotlist.json")
+    return orchestrator
+
+
+def _calls(orchestrator):
+    return [agent.calls for agent in (orchestrator.research_agent, orchestrator.analysis_agent,
+                                      orchestrator.scriptwriting_agent, orchestrator.article_writer_agent,
+                                      orchestrator.visual_asset_agent)]
+
+
+def test_rerun_skips_up_to_date_stages(orchestrator):
+    first = orchestrator.execute("Test Topic")
+    second = orchestrator.execute("Test Topic")
+
+    assert _calls(orchestrator) == [1, 1, 1, 1, 1]
+    assert set(second["stages"].values()) == {"skipped"}
+    assert second["video_script"] == first["video_script"]
+    assert second["token_usage"]["scriptwriting"]["total_tokens"] == 0
+
+
+def test_changed_stage_invalidates_only_downstream(orchestrator):
+    orchestrator.execute("Test Topic")
+    orchestrator.scriptwriting_agent.template = "v2"
+    result = orchestrator.execute("Test Topic")
+
+    assert _calls(orchestrator) == [1, 1, 2, 1, 2]
+    assert result["stages"]["article_writing"] == "skipped"
+    assert result["stages"]["visual_assets"] == "ran"
+
+
+def test_edited_or_missing_outputs_are_rebuilt(orchestrator):
+    orchestrator.execute("Test Topic")
+    os.remove("artifacts/test-topic/article.md")
+    orchestrator.execute("Test Topic")
+    assert _calls(orchestrator) == [1, 1, 1, 2, 1]
+
+    orchestrator.execute("Test Topic", force=True)
+    assert _calls(orchestrator) == [2, 2, 2, 3, 2]
+
+
+def test_crashed_run_resumes_after_last_completed_stage(orchestrator):
+    def crash(narrative, topic, description=None, on_token=None):
+        raise RuntimeError("provider down")
+
+    execute = orchestrator.scriptwriting_agent.execute
+    orchestrator.scriptwriting_agent.execute = crash
+    with pytest.raises(RuntimeError):
+        orchestrator.execute("Test Topic")
+
+    orchestrator.scriptwriting_agent.execute = execute
+    orchestrator.execute("Test Topic")
+    assert orchestrator.research_agent.calls == 1
+    assert orchestrator.analysis_agent.calls == 1
+
+
+def test_manifest_requires_matching_input_hash(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path))
+    (tmp_path / "narrative.md").write_text("story")
+    checkpoint.save("analysis", "abc", ["narrative.md"], {"content": "story"})
+
+    assert checkpoint.load("analysis", "abc")["result"] == {"content": "story"}
+    assert checkpoint.load("analysis", "def") is None
+
+
+def test_empty_research_is_not_checkpointed(orchestrator):
+    orchestrator.research_agent.chunks = 0
+    orchestrator.execute("Test Topic")
+    orchestrator.execute("Test Topic")
+    assert orchestrator.research_agent.calls == 2
+
+    orchestrator.research_agent.chunks = 1
+    orchestrator.execute("Test Topic")
+    orchestrator.execute("Test Topic")
+    assert orchestrator.research_agent.calls == 3
+
+
+def test_research_with_mostly_failed_fetches_is_not_checkpointed(orchestrator):
+    orchestrator.research_agent.sources = [{"url": "a", "chunk_scores": [0.9]},
+                                           {"url": "b", "chunk_scores": []}, {"url": "c", "chunk_scores": []}]
+    orchestrator.execute("Test Topic")
+    orchestrator.execute("Test Topic")
+    assert orchestrator.research_agent.calls == 2
+
+
+def test_research_checkpoints_expire(orchestrator, monkeypatch):
+    orchestrator.execute("Test Topic")
+    monkeypatch.setenv("RESEARCH_CHECKPOINT_MAX_AGE", "0")
+    orchestrator.execute("Test Topic")
+    assert orchestrator.research_agent.calls == 2
+
+
+def test_manifest_max_age(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path))
+    (tmp_path / "sources.json").write_text("[]")
+    checkpoint.save("research", "abc", ["sources.json"])
+
+    assert checkpoint.load("research", "abc", max_age=60) is not None
+    assert checkpoint.load("research", "abc", max_age=-1) is None
@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chunk_store import ChunkStore
+
+
+def test_chunks_round_trip_with_their_sources(tmp_path):
+    ChunkStore.write(str(tmp_path), [(0, ["first page, chunk one", "first page, chunk two"]),
+                                     (1, []),
+                                     (2, ["third page — ünïcode chunk"])])
+
+    store = ChunkStore(str(tmp_path))
+    assert len(store) == 3
+    assert store[2] == "third page — ünïcode chunk"
+    assert store[-1] == store[2]
+    assert store[0:2] == ["first page, chunk one", "first page, chunk two"]
+    assert list(store.sources) == [0, 0, 2]
+    assert all(tokens > 0 for tokens in store.tokens)
+
+
+def test_store_is_memory_mapped(tmp_path):
+    store = ChunkStore.write(str(tmp_path), [(0, ["alpha", "beta"])])
+
+    assert store.index.base is not None  # np.memmap view rather than an in-memory copy
+    assert (tmp_path / "chunks.txt").read_bytes() == b"alphabeta"
+
+
+def test_empty_store(tmp_path):
+    store = ChunkStore.write(str(tmp_path), [(0, [])])
+    assert len(store) == 0
+    assert list(store) == []
+
+
+def test_digest_tracks_content(tmp_path):
+    first = ChunkStore.write(str(tmp_path / "a"), [(0, ["same"])]).digest()
+    assert ChunkStore.write(str(tmp_path / "b"), [(0, ["same"])]).digest() == first
+    assert ChunkStore.write(str(tmp_path / "c"), [(1, ["same"])]).digest() != first
@@ -0,0 +1,53 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chunking import TokenChunker, window_tokens
+
+# One token per word keeps the arithmetic in these tests obvious
+words = lambda text: len(text.split())
+
+
+def test_paragraphs_are_packed_into_full_windows_without_overlap():
+    paragraphs = [" ".join(f"p{i}w{j}" for j in range(30)) for i in range(10)]
+    windows = TokenChunker(100, count=words).split("\n\n".join(paragraphs))
+
+    assert len(windows) == 4  # three paragraphs (93 tokens with separators) per window
+    assert all(words(window) <= 100 for window in windows)
+    assert " ".join(windows).split() == " ".join(paragraphs).split()
+
+
+def test_oversized_paragraphs_are_split_at_sentences_then_words():
+    sentence = " ".join(["word"] * 40) + "."
+    run_on = " ".join(["cell"] * 250)
+    windows = TokenChunker(100, count=words).split(" ".join([sentence] * 3) + "\n" + run_on)
+
+    assert all(words(window) <= 100 for window in windows)
+    assert sum(words(window) for window in windows) == 3 * 40 + 250
+
+
+def test_pack_merges_small_chunks_into_fewer_requests():
+    chunks = [" ".join(["token"] * 20)] * 12
+    assert len(TokenChunker(250, count=words).pack(chunks)) == 2
+
+
+def test_window_fits_context_and_per_request_quota(monkeypatch):
+    monkeypatch.setenv("CHUNK_MAX_TOKENS", "100000")
+    # 8192 * 0.9 context minus prompt and output
+    assert window_tokens("OPENAI", 100, 256, concurrency=1) == 7372 - 356
+    # 30k TPM shared by 8 concurrent requests
+    assert window_tokens("OPENAI", 100, 256, concurrency=8) == 3750 - 356
+
+    monkeypatch.setenv("CHUNK_MAX_TOKENS", "2000")
+    assert window_tokens("GOOGLE", 100, 256, concurrency=8) == 2000
+
+
+def test_group_keeps_texts_whole_and_splits_only_oversized_ones():
+    texts = [" ".join(f"t{i}w{j}" for j in range(30)) for i in range(5)] + [" ".join(["big"] * 150)]
+    windows = TokenChunker(100, count=words).group(texts)
+
+    assert windows[:2] == ["\n\n".join(texts[0:3]), "\n\n".join(texts[3:5])]
+    assert all(words(window) <= 100 for window in windows)
+    assert sum(words(window) for window in windows[2:]) == 150
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag import DagExecutor, Stage
+
+
+def _sleepy(value, delay):
+    async def fn(**kwargs):
+        await asyncio.sleep(delay)
+        return value
+    return fn
+
+
+def test_independent_stages_overlap():
+    stages = [
+        Stage("narrative", _sleepy("n", 0.1), inputs=["topic"]),
+        Stage("script", _sleepy("s", 0.3), inputs=["narrative"]),
+        Stage("article", _sleepy("a", 0.6), inputs=["narrative"]),
+        Stage("visuals", _sleepy("v", 0.3), inputs=["script"]),
+    ]
+    results, timings = asyncio.run(DagExecutor(stages).arun(topic="AI"))
+
+    assert results == {"narrative": "n", "script": "s", "article": "a", "visuals": "v"}
+    # Visuals start once the script is done, while the article is still running
+    assert timings["visuals"]["start"] >= timings["script"]["end"]
+    assert timings["visuals"]["start"] < timings["article"]["end"]
+    assert max(t["end"] for t in timings.values()) < 0.9
+
+
+def test_stage_receives_its_declared_inputs():
+    stages = [
+        Stage("upper", lambda topic: topic.upper(), inputs=["topic"]),
+        Stage("joined", lambda upper, topic: f"{upper}/{topic}", inputs=["upper", "topic"]),
+    ]
+    results, _ = asyncio.run(DagExecutor(stages).arun(topic="ai"))
+
+    assert results["joined"] == "AI/ai"
+
+
+def test_failure_propagates_and_blocks_dependents():
+    calls = []
+
+    def boom(topic):
+        raise RuntimeError("stage failed")
+
+    stages = [
+        Stage("first", boom, inputs=["topic"]),
+        Stage("second", lambda first: calls.append(first), inputs=["first"]),
+    ]
+    with pytest.raises(RuntimeError, match="stage failed"):
+        asyncio.run(DagExecutor(stages).arun(topic="ai"))
+    assert calls == []
+
+
+def test_cycles_and_unknown_inputs_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        DagExecutor([Stage("a", len, inputs=["b"]), Stage("b", len, inputs=["a"])])
+    with pytest.raises(ValueError, match="unknown inputs"):
+        asyncio.run(DagExecutor([Stage("a", len, inputs=["missing"])]).arun())
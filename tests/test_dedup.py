@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dedup import MinHashDeduplicator
+
+STORY = ("NVIDIA has retained its position as the world's most valuable semiconductor brand, according to a "
+         "new report from Brand Finance. With a 98% increase in brand value to USD87.9 billion, NVIDIA's brand "
+         "value is now more than two and a half times that of TSMC, the second-most valuable brand in the sector.")
+OTHER = ("Quantum computers use qubits that can exist in superpositions of states, which lets certain algorithms "
+         "such as Shor's factoring algorithm outperform their classical counterparts on specific problems.")
+
+
+def test_syndicated_copies_are_removed():
+    syndicated = "Press release: " + STORY + " Read more on our site."
+    kept, report = MinHashDeduplicator(threshold=0.7).deduplicate([STORY, OTHER, syndicated, STORY])
+
+    assert kept == [STORY, OTHER]
+    assert report["removed_chunks"] == 2
+    assert report["removed_tokens"] > 0
+
+
+def test_distinct_chunks_are_kept():
+    chunks = [STORY, OTHER, "Climate tech spans carbon capture, grid storage and alternative proteins."]
+    kept, report = MinHashDeduplicator().deduplicate(chunks)
+
+    assert kept == chunks
+    assert report["removed_chunks"] == 0
+
+
+def test_threshold_controls_what_counts_as_duplicate():
+    edited = STORY.replace("second-most valuable brand", "runner-up").replace("98% increase", "big jump")
+    strict, _ = MinHashDeduplicator(threshold=0.95).deduplicate([STORY, edited])
+    loose, _ = MinHashDeduplicator(threshold=0.5).deduplicate([STORY, edited])
+
+    assert len(strict) == 2
+    assert len(loose) == 1
@@ -0,0 +1,91 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.extract import TextExtractor
+
+CORPUS = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'corpus')
+
+
+def _page(name):
+    with open(os.path.join(CORPUS, name), 'rb') as f:
+        return f.read()
+
+
+def test_article_text_is_kept_and_boilerplate_dropped():
+    text = TextExtractor().extract(_page('news-article.html'))
+
+    assert "98% increase in brand value" in text
+    assert "TSMC and Samsung trail" in text  # heading followed by content
+    assert "NVIDIA's software ecosystem" in text
+    for boilerplate in ("We use cookies", "Podcasts", "dataLayer", "Related stories",
+                        "Subscribe", "All rights reserved", "Share on X", "best laptops"):
+        assert boilerplate not in text
+
+
+def test_link_heavy_blocks_and_role_marked_regions_are_dropped():
+    html = """<html><body>
+      <div role="navigation">Home Energy Transport</div>
+      <p>Carbon capture separates carbon dioxide from exhaust gases and stores it deep underground for centuries.</p>
+      <div><a href="/1">Green hydrogen explained in depth</a> <a href="/2">Grid storage and the future of batteries</a></div>
+      <p>Point-source capture is <a href="/pt">fitted</a> to cement kilns, steel plants and gas-fired power stations.</p>
+    </body></html>"""
+    text = TextExtractor().extract(html)
+
+    assert text.splitlines() == [
+        "Carbon capture separates carbon dioxide from exhaust gases and stores it deep underground for centuries.",
+        "Point-source capture is fitted to cement kilns, steel plants and gas-fired power stations.",
+    ]
+
+
+def test_unclosed_tags_do_not_hide_later_content():
+    html = ("<html><body><ul><li>Menu <li>Items</ul><script>var x = '<p>';</script>"
+            "<p>First paragraph is long enough to count as real article content here.<p>"
+            "Second paragraph is also long enough to count as real article content.</body></html>")
+    text = TextExtractor().extract(html)
+
+    assert "Second paragraph" in text
+    assert "var x" not in text
+
+
+def test_hidden_elements_are_dropped():
+    html = """<html><body>
+      <div hidden><p>This paragraph is hidden from readers and should never reach the summary prompt.</p></div>
+      <p aria-hidden="true">Screen-reader-hidden decoration text that is long enough to count as content.</p>
+      <p>Direct air capture pulls carbon dioxide out of ambient air using large fans and sorbents.</p>
+    </body></html>"""
+    text = TextExtractor().extract(html)
+
+    assert text.splitlines() == [
+        "Direct air capture pulls carbon dioxide out of ambient air using large fans and sorbents.",
+    ]
+
+
+PARAGRAPH = "Carbon capture separates carbon dioxide from exhaust gases and stores it deep underground for centuries."
+
+
+def test_content_inside_boilerplate_looking_wrappers_is_kept():
+    pages = [
+        f'<html><body class="has-sidebar"><main><p>{PARAGRAPH}</p></main></body></html>',
+        f'<html><body><div class="site-wrapper with-social-links"><article><p>{PARAGRAPH}</p></article></div>'
+        f'<p class="share">Share on X</p></body></html>',
+        f'<html><body><div class="commentary"><p>{PARAGRAPH}</p></div></body></html>',
+        f'<html><body><form id="aspnetForm"><main><p>{PARAGRAPH}</p></main></form></body></html>',
+    ]
+    for html in pages:
+        assert TextExtractor().extract(html) == PARAGRAPH, html
+
+
+def test_article_headers_keep_the_title_but_page_headers_are_dropped():
+    html = f"""<html><body>
+      <header><h1>Site name</h1><p>{PARAGRAPH} Masthead.</p></header>
+      <article><header><h1>How carbon capture works</h1></header><p>{PARAGRAPH}</p></article>
+      <div class="comments"><p>{PARAGRAPH} Comment.</p><article><p>{PARAGRAPH} Reply.</p></article></div>
+      <div hidden><article><p>{PARAGRAPH} Hidden.</p></article></div>
+    </body></html>"""
+    lines = TextExtractor().extract(html).splitlines()
+
+    assert lines[:2] == ["How carbon capture works", PARAGRAPH]
+    assert not any(line.endswith(("Masthead.", "Comment.", "Hidden.")) for line in lines)
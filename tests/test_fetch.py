@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.fetch import AsyncPageFetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        if self.path == "/pdf":
+            body, content_type = b"%PDF-1.4", "application/pdf"
+        elif self.path == "/big":
+            body, content_type = b"x" * 50000, "text/html"
+        else:
+            body, content_type = f"<html><body>{self.path}</body></html>".encode(), "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_fetch_all_runs_concurrently_skips_non_html_and_caps_bytes(base_url):
+    async def fetch():
+        fetcher = AsyncPageFetcher(max_concurrency=8, per_host_limit=8, max_bytes=1000)
+        try:
+            return await fetcher.fetch_all([f"{base_url}/slow/{i}" for i in range(6)]
+                                           + [f"{base_url}/pdf", f"{base_url}/big"])
+        finally:
+            await fetcher.aclose()
+
+    start = time.monotonic()
+    *slow, pdf, big = asyncio.run(fetch())
+    elapsed = time.monotonic() - start
+
+    assert all(r["error"] is None and r["status"] == 200 for r in slow)
+    assert elapsed < 1.5, f"fetches did not overlap ({elapsed:.2f}s)"
+    assert pdf["error"].startswith("skipped content type")
+    assert big["error"] is None and len(big["body"]) == 1000
+
+
+def test_fetch_all_honours_deadline(base_url):
+    fetcher = AsyncPageFetcher(per_host_limit=1, deadline=0.7)
+    results = asyncio.run(fetcher.fetch_all([f"{base_url}/slow/{i}" for i in range(4)]))
+
+    assert results[0]["error"] is None
+    assert any(r["error"] == "deadline exceeded" for r in results[1:])
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+import threading
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.llm as llm_registry
+from src.agents import AnalysisAgent, ScriptwritingAgent
+
+
+def test_clients_are_built_once_and_shared(monkeypatch):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return FakeListChatModel(responses=["ok"])
+
+    monkeypatch.setenv("LLM_PROVIDER", "OPENAI")
+    monkeypatch.setenv("LLM_CACHE", "off")
+    monkeypatch.setitem(llm_registry.PROVIDERS, "OPENAI", (build, "responses"))
+    monkeypatch.setattr(llm_registry, "_clients", {})
+
+    analysis, script = AnalysisAgent(), ScriptwritingAgent()
+    assert builds == []  # nothing is built until an agent needs its model
+
+    assert analysis.llm is script.llm
+    assert analysis.llm is llm_registry.get_llm()
+    assert builds == [1]
+
+
+def test_per_agent_overrides_keep_the_shared_client(monkeypatch):
+    base = FakeListChatModel(responses=["base"])
+    monkeypatch.setenv("LLM_PROVIDER", "OPENAI")
+    monkeypatch.setenv("LLM_CACHE", "off")
+    monkeypatch.setenv("SCRIPTWRITING_MODEL", "override")
+    monkeypatch.setitem(llm_registry.PROVIDERS, "OPENAI", (lambda: base, "responses"))
+    monkeypatch.setattr(llm_registry, "_clients", {})
+
+    script = ScriptwritingAgent()
+
+    assert script.llm is not base
+    assert script.llm.responses == "override"
+    assert AnalysisAgent().llm is base
+
+
+def test_llm_slot_caps_calls_in_flight():
+    in_flight, peak = [0], [0]
+
+    async def call():
+        async with llm_registry.allm_slot():
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.05)
+            in_flight[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    llm_registry.set_llm_concurrency(2)
+    try:
+        asyncio.run(main())
+    finally:
+        llm_registry.set_llm_concurrency(None)
+
+    assert peak[0] == 2
+
+
+def test_llm_slots_are_shared_across_event_loops():
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    async def call():
+        async with llm_registry.allm_slot():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+
+    async def coroutines():
+        await asyncio.gather(*(call() for _ in range(4)))
+
+    llm_registry.set_llm_concurrency(2)
+    try:
+        threads = [threading.Thread(target=asyncio.run, args=(coroutines(),)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        llm_registry.set_llm_concurrency(None)
+
+    assert peak[0] == 2 and in_flight[0] == 0
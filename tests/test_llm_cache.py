@@ -0,0 +1,71 @@
+import os
+import sys
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_cache import LLMCache, get_llm_cache, with_llm_cache
+
+
+def _model(cache):
+    return FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+
+def test_repeated_prompts_are_served_from_cache(tmp_path):
+    cache = LLMCache("analysis", path=str(tmp_path / "llm.sqlite3"))
+    llm = _model(cache)
+
+    assert llm.invoke("summarize this").content == "first"
+    assert llm.invoke("summarize this").content == "first"
+    assert llm.invoke("something else").content == "second"
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_namespaces_are_isolated_and_clearable(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    analysis, script = LLMCache("analysis", path=path), LLMCache("scriptwriting", path=path)
+    _model(analysis).invoke("prompt")
+    _model(script).invoke("prompt")
+
+    analysis.clear()
+
+    assert _model(analysis).invoke("prompt").content == "first"
+    assert analysis.stats["hits"] == 0
+    _model(script).invoke("prompt")
+    assert script.stats["hits"] == 1
+
+
+def test_refresh_mode_skips_reads_but_writes(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    _model(LLMCache("analysis", path=path)).invoke("prompt")
+
+    refreshed = _model(LLMCache("analysis", path=path, mode="refresh"))
+    assert refreshed.invoke("prompt").content == "first"
+    assert refreshed.cache.stats["writes"] == 1
+
+
+def test_eviction_keeps_cache_under_budget(tmp_path):
+    cache = LLMCache("analysis", path=str(tmp_path / "llm.sqlite3"), max_bytes=1)
+    llm = _model(cache)
+    llm.invoke("a")
+    llm.invoke("b")
+
+    assert cache.stats["evictions"] == 2
+
+
+def test_cache_can_be_bypassed(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "off")
+    llm = with_llm_cache(FakeListChatModel(responses=["x"]), "analysis")
+
+    assert llm.cache is None
+
+
+def test_models_share_one_cache_per_namespace(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    cheap = with_llm_cache(FakeListChatModel(responses=["cheap"]), "analysis")
+    main = with_llm_cache(FakeListChatModel(responses=["main"]), "analysis")
+
+    assert cheap.cache is main.cache is get_llm_cache("analysis")
+    assert with_llm_cache(FakeListChatModel(responses=["x"]), "scriptwriting").cache is not main.cache
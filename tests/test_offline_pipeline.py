@@ -0,0 +1,49 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import llm_stats, offline_pipeline, reset_llm_stats
+from src.agents import OrchestratorAgent
+
+
+def test_full_pipeline_runs_offline(tmp_path):
+    with offline_pipeline(str(tmp_path), output_tokens=50) as server:
+        reset_llm_stats()
+        result = OrchestratorAgent().execute("Offline Topic", description="semiconductors and qubits")
+
+    topic_dir = tmp_path / "artifacts" / "offline-topic"
+    with open(topic_dir / "sources.json") as f:
+        sources = json.load(f)
+    assert [source["url"] for source in sources] == server.urls()
+    assert server.requests == len(server.urls())
+    # one packed summarization request, then narrative, script, article and shot list
+    assert llm_stats["calls"] == 5
+    assert result["token_usage"]["scriptwriting"]["completion_tokens"] == 50
+    assert json.loads((topic_dir / "shotlist.json").read_text())
+    assert set(result["stages"].values()) == {"ran"}
+
+
+def test_many_topics_share_one_event_loop(tmp_path):
+    titles = [f"Async topic {i}" for i in range(8)]
+
+    async def run_all(orchestrator):
+        return await asyncio.gather(*(orchestrator.aexecute(title, force=True) for title in titles))
+
+    with offline_pipeline(str(tmp_path), latency=0.2, output_tokens=20):
+        orchestrator = OrchestratorAgent()
+        threads_before = threading.active_count()
+        start = time.monotonic()
+        results = asyncio.run(run_all(orchestrator))
+        elapsed = time.monotonic() - start
+
+    assert all(set(result["stages"].values()) == {"ran"} for result in results)
+    # Each topic makes four LLM calls of 0.2s in sequence; one topic after another would take over 6s
+    assert elapsed < 4, f"topics did not overlap ({elapsed:.2f}s)"
+    # CPU-bound steps borrow the default executor's threads, but nothing is started per topic
+    assert threading.active_count() - threads_before <= (os.cpu_count() or 1) + 4
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.fetch import AsyncPageFetcher
+from src.page_cache import PageCache, normalize_url
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"<html><body>cached page</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    _Handler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def _fetch(fetcher, url):
+    result, = asyncio.run(fetcher.fetch_all([url]))
+    return result
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/a?b=2&a=1#frag") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+
+
+def test_fresh_entries_skip_the_network(base_url, tmp_path):
+    cache = PageCache(directory=str(tmp_path))
+    fetcher = AsyncPageFetcher(cache=cache)
+
+    first = _fetch(fetcher, f"{base_url}/page")
+    second = _fetch(fetcher, f"{base_url}/page")
+
+    assert not first["from_cache"] and second["from_cache"]
+    assert second["body"] == first["body"]
+    assert len(_Handler.requests_seen) == 1
+    assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+
+
+def test_stale_entries_are_revalidated(base_url, tmp_path):
+    cache = PageCache(directory=str(tmp_path), ttl=0)
+    fetcher = AsyncPageFetcher(cache=cache)
+
+    _fetch(fetcher, f"{base_url}/page")
+    page = _fetch(fetcher, f"{base_url}/page")
+
+    assert page["status"] == 304 and page["error"] is None
+    assert page["from_cache"] and b"cached page" in page["body"]
+    assert _Handler.requests_seen[-1] == ("/page", '"v1"')
+    assert cache.stats["revalidated"] == 1
+
+
+def test_extracted_text_and_lru_eviction(tmp_path):
+    cache = PageCache(directory=str(tmp_path), max_bytes=250)
+    cache.store("http://a.test/", b"a" * 100)
+    cache.put_text("http://a.test/", "text of a", "bs4")
+    assert cache.get_text("http://a.test/", "bs4") == "text of a"
+    assert cache.get_text("http://a.test/", "other") is None
+
+    cache.store("http://b.test/", b"b" * 100)
+    cache.read(cache.lookup("http://a.test/"))
+    cache.store("http://c.test/", b"c" * 100)
+
+    assert cache.lookup("http://b.test/") is None
+    assert cache.lookup("http://a.test/") is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_rewrites_replace_blobs_and_size(tmp_path):
+    cache = PageCache(directory=str(tmp_path), max_bytes=10 * 1024)
+    for i in range(50):
+        cache.store("http://a.test/", f"body {i} ".encode() * 100)
+        cache.put_text("http://a.test/", f"text {i}", "bs4")
+        cache.put_text("http://a.test/", f"other text {i}", "trafilatura")
+
+    blobs = [name for _, _, files in os.walk(tmp_path / "blobs") for name in files]
+    assert len(blobs) == 2
+    body, text = "body 49 ".encode() * 100, "other text 49".encode()
+    assert cache.lookup("http://a.test/")["size"] == len(body) + len(text)
+
+
+def test_entries_whose_body_is_missing_are_fetched_again(base_url, tmp_path):
+    for ttl in (3600, 0):
+        cache = PageCache(directory=str(tmp_path / str(ttl)), ttl=ttl)
+        fetcher = AsyncPageFetcher(cache=cache)
+        _fetch(fetcher, f"{base_url}/page")
+        for directory, _, files in os.walk(os.path.join(cache.directory, "blobs")):
+            for name in files:
+                os.remove(os.path.join(directory, name))
+
+        page = _fetch(fetcher, f"{base_url}/page")
+        again = _fetch(fetcher, f"{base_url}/page")
+
+        assert page["error"] is None and b"cached page" in page["body"]
+        assert _Handler.requests_seen[-2] == ("/page", None)
+        assert again["error"] is None
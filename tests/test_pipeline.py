@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import offline_pipeline
+from src.agents import OrchestratorAgent
+from src.event_loop import run_sync
+from src.pipeline import StagedPipeline, pipeline_stage
+
+
+def test_stages_overlap_across_topics():
+    async def process(topic):
+        async with pipeline_stage("search"):
+            await asyncio.sleep(0.1)
+        async with pipeline_stage("write"):
+            await asyncio.sleep(0.1)
+        return topic
+
+    pipeline = StagedPipeline(workers={"search": 1, "write": 1}, queue_size=1)
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run(range(1, 6), process))
+    elapsed = time.perf_counter() - start
+
+    assert results == [1, 2, 3, 4, 5]
+    # one topic after another would take 1.0s; overlapped, about 0.6s
+    assert elapsed < 0.85
+    report = pipeline.report()
+    assert report["search"]["topics"] == report["write"]["topics"] == 5
+    assert 0.6 < report["write"]["utilization"] <= 1.0
+    assert report["fetch"]["topics"] == 0
+
+
+def test_full_queues_hold_back_research():
+    searched, writing = [], []
+    ahead = []
+
+    async def process(topic):
+        async with pipeline_stage("search"):
+            await asyncio.sleep(0.001)
+        searched.append(topic)
+        ahead.append(len(searched) - len(writing))
+        async with pipeline_stage("write"):
+            writing.append(topic)
+            await asyncio.sleep(0.05)
+
+    pipeline = StagedPipeline(workers={"search": 4, "write": 1}, queue_size=1)
+    asyncio.run(pipeline.run(range(10), process))
+
+    # at most one topic queued for writing plus the search workers waiting to hand theirs on
+    assert max(ahead) <= 1 + 4
+    report = pipeline.report()
+    assert report["search"]["blocked"] > 0
+    assert report["fetch"]["max_queued"] == 1
+
+
+def test_topics_are_taken_only_when_there_is_room():
+    taken = []
+
+    def topics():
+        for i in range(6):
+            taken.append(time.perf_counter())
+            yield i
+
+    async def process(topic):
+        async with pipeline_stage("search"):
+            await asyncio.sleep(0.05)
+
+    pipeline = StagedPipeline(workers={"search": 1}, queue_size=1)
+    asyncio.run(pipeline.run(topics(), process))
+    # the first two fill the search worker and its queue; later ones wait for a topic to start searching
+    assert taken[-1] - taken[0] > 0.15
+
+
+def test_failures_are_returned_and_do_not_block_other_topics():
+    async def process(topic):
+        async with pipeline_stage("summarize"):
+            if topic == 1:
+                raise RuntimeError("boom")
+        async with pipeline_stage("narrate"):
+            return topic
+
+    results = asyncio.run(StagedPipeline(queue_size=1).run(range(4), process))
+    assert isinstance(results[1], RuntimeError)
+    assert [results[i] for i in (0, 2, 3)] == [0, 2, 3]
+
+
+def test_orchestrator_topics_run_through_the_pipeline(tmp_path):
+    titles = [f"Pipelined topic {i}" for i in range(4)]
+
+    with offline_pipeline(str(tmp_path), latency=0.05, output_tokens=20):
+        orchestrator = OrchestratorAgent()
+        pipeline = StagedPipeline(queue_size=1)
+        results = run_sync(pipeline.run(titles, lambda title: orchestrator.aexecute(title, force=True)))
+
+    assert all(set(result["stages"].values()) == {"ran"} for result in results)
+    report = pipeline.report()
+    assert all(report[stage]["topics"] == len(titles) for stage in report)
+
+
+def test_concurrent_entries_of_one_topic_share_its_worker():
+    async def write(seconds):
+        async with pipeline_stage("write"):
+            await asyncio.sleep(seconds)
+
+    async def process(topic):
+        # like the script and the article, both parts of the topic enter "write" at once
+        await asyncio.gather(write(0.001), write(0.002))
+        return topic
+
+    async def main(pipeline):
+        results = await asyncio.wait_for(pipeline.run(range(40), process), 10)
+        return results, pipeline._workers["write"]._value
+
+    pipeline = StagedPipeline(workers={"write": 2}, queue_size=1)
+    results, free = asyncio.run(main(pipeline))
+    assert results == list(range(40))
+    assert free == 2
+    assert pipeline.report()["write"]["topics"] == 40
@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents import ResearchAgent
+from src.ranking import BM25Index, select_chunks
+
+CHUNKS = [
+    "Home News Reviews Podcasts Events About us Contact",
+    "Quantum computers use qubits in superposition to run algorithms such as Shor's factoring algorithm.",
+    "Error correction builds logical qubits out of many noisy physical qubits.",
+    "Subscribe to our newsletter for the latest deals on laptops and headphones.",
+]
+
+
+def test_bm25_ranks_relevant_chunks_first():
+    scores = BM25Index(CHUNKS).scores("Quantum computing: qubits and error correction")
+
+    assert list(np.argsort(-scores)[:2]) == [2, 1]
+    assert scores[0] == scores[3] == 0
+
+
+def test_selection_respects_top_k_and_token_budget_and_keeps_document_order():
+    scores = np.array([0.0, 2.0, 3.0, 1.0])
+
+    assert select_chunks(CHUNKS, scores, top_k=2, token_budget=10_000) == [1, 2]
+    # Chunk 1 does not fit after chunk 2, but the smaller chunk 3 still does
+    assert select_chunks(CHUNKS, scores, top_k=5, token_budget=40) == [2, 3]
+
+
+def test_research_agent_logs_relevance_per_source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = ResearchAgent()
+    urls = ["http://nav.test/", "http://qubits.test/", "http://down.test/"]
+
+    class Search:
+        async def asearch(self, query):
+            return [{"url": u} for u in urls]
+
+        def summary(self):
+            return ""
+
+    async def scrape_and_chunk(urls):
+        return [("http://nav.test/", CHUNKS[:1]), ("http://qubits.test/", CHUNKS[1:3])]
+
+    agent.search = Search()
+    monkeypatch.setattr(agent, "_scrape_and_chunk", scrape_and_chunk)
+
+    chunks = agent.execute("Quantum computing", description="qubits and error correction")
+
+    with open("artifacts/quantum-computing/sources.json") as f:
+        sources = json.load(f)
+    assert list(chunks) == CHUNKS[:3]
+    assert list(chunks.sources) == [0, 1, 1]
+    assert [len(source["chunk_scores"]) for source in sources] == [1, 2, 0]
+    assert sources[1]["relevance"] > sources[0]["relevance"] == 0
+    assert sources[1]["content_preview"] == CHUNKS[1]
+    assert sources[2]["content_preview"] == "No content scraped"
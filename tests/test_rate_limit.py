@@ -0,0 +1,33 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rate_limit import RateLimiter, TokenBucket, get_rate_limiter
+
+
+def test_token_bucket_queues_callers_once_empty():
+    bucket = TokenBucket(per_minute=60)  # one token per second
+
+    assert bucket.reserve(60) == 0.0
+    first_wait = bucket.reserve(1)
+    second_wait = bucket.reserve(1)
+
+    assert 0.9 < first_wait <= 1.0
+    assert 1.9 < second_wait <= 2.0
+
+
+def test_rate_limiter_waits_for_the_tighter_bucket():
+    limiter = RateLimiter(rpm=1000, tpm=600)  # 10 tokens per second
+
+    assert limiter.reserve(600) == 0.0
+    assert 4.9 < limiter.reserve(50) <= 5.0
+
+
+def test_limiters_are_shared_per_provider(monkeypatch):
+    monkeypatch.setenv("TESTPROVIDER_RPM", "7")
+    limiter = get_rate_limiter("testprovider")
+
+    assert limiter is get_rate_limiter("TESTPROVIDER")
+    assert limiter.requests.capacity == 7
@@ -23,9 +23,9 @@ def test_research_agent_execution(research_agent):
     """
     # 1. Setup
     topic = "The future of AI"
-    output_dir = "artifacts"
+    output_dir = os.path.join("artifacts", "the-future-of-ai")
     sources_path = os.path.join(output_dir, "sources.json")
-    chunks_path = os.path.join(output_dir, "research_chunks.json")
+    chunks_path = os.path.join(output_dir, "chunks.npy")
 
     # Clean up previous run artifacts
     if os.path.exists(sources_path):
@@ -34,17 +34,19 @@ def test_research_agent_execution(research_agent):
         os.remove(chunks_path)
 
     # 2. Execution
-    research_agent.execute(topic)
+    store = research_agent.execute(topic)
 
     # 3. Verification
     assert os.path.exists(sources_path), "Research artifact (sources.json) was not created."
-    assert os.path.exists(chunks_path), "Research chunks artifact (research_chunks.json) was not created."
+    assert os.path.exists(chunks_path), "Research chunk index (chunks.npy) was not created."
 
     with open(sources_path, 'r') as f:
         sources_data = json.load(f)
         assert isinstance(sources_data, list)
         if sources_data:
             assert 'url' in sources_data[0]
+    # Every chunk is attributed to one of the sources
+    assert all(source < len(sources_data) for source in store.sources)
 
     print("\n✅ Research Agent test passed successfully!")
     print(f"   - Verified {sources_path}")
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.llm as llm_registry
+import src.router as router_module
+from benchmarks.harness import PROVIDER, FakeChatModel, offline_pipeline
+from src.agents import OrchestratorAgent
+from src.router import LatencyHistogram, ProviderRouter
+
+
+def _router(**settings):
+    settings.setdefault("hedge_seconds", 0.05)
+    return ProviderRouter(["A", "B"], **settings)
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.95) is None
+    for _ in range(19):
+        histogram.observe(0.01)
+    histogram.observe(3.0)
+    assert histogram.quantile(0.5) == 0.05
+    assert histogram.quantile(0.95) == 0.05
+    assert histogram.quantile(1.0) == 3.2
+
+
+def test_slow_calls_are_hedged_and_the_first_answer_wins():
+    router = _router()
+    cancelled = []
+
+    async def attempt(provider):
+        try:
+            await asyncio.sleep(1.0 if provider == "A" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        return provider
+
+    assert asyncio.run(router.call(attempt)) == "B"
+    assert cancelled == ["A"]
+    stats = router.to_dict()
+    assert stats["B"]["hedges"] == 1 and stats["B"]["wins"] == 1 and stats["A"]["wins"] == 0
+    # the cancelled attempt still counts, as a lower bound on A's latency
+    assert stats["A"]["latency"]["count"] == 1 and stats["A"]["latency"]["p95"] >= 0.05
+
+
+def test_hedge_deadline_follows_observed_latency():
+    router = _router(min_samples=5)
+    for _ in range(5):
+        router._succeeded("A", 0.3)
+    assert router.hedge_delay("A") == 0.4
+    assert router.hedge_delay("B") == 0.05
+
+
+def test_errors_fail_over_and_repeated_errors_take_a_provider_out():
+    router = _router(failover_errors=2, failover_seconds=60)
+    tried = []
+
+    async def attempt(provider):
+        tried.append(provider)
+        if provider == "A":
+            raise RuntimeError("A is down")
+        return provider
+
+    async def main():
+        return [await router.call(attempt) for _ in range(3)]
+
+    assert asyncio.run(main()) == ["B", "B", "B"]
+    # after two failures A is skipped
+    assert tried == ["A", "B", "A", "B", "B"]
+    assert router.order() == ["B", "A"]
+
+
+def test_every_provider_failing_raises_the_last_error():
+    router = _router()
+
+    async def attempt(provider):
+        raise RuntimeError(provider)
+
+    with pytest.raises(RuntimeError, match="B"):
+        asyncio.run(router.call(attempt))
+
+
+def test_streams_fail_over_before_the_first_chunk():
+    router = _router()
+
+    async def open_stream(provider):
+        if provider == "A":
+            raise RuntimeError("A is down")
+        yield "b1"
+        yield "b2"
+
+    async def collect():
+        return [chunk async for chunk in router.stream(open_stream)]
+
+    assert asyncio.run(collect()) == ["b1", "b2"]
+    assert router.to_dict()["A"]["errors"] == 1
+
+
+def test_pipeline_hedges_slow_provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(router_module, "_router", None)
+    monkeypatch.setenv("LLM_ROUTER_PROVIDERS", f"{PROVIDER},GOOGLE")
+    monkeypatch.setenv("LLM_HEDGE_SECONDS", "0.2")
+    monkeypatch.setenv("GOOGLE_RPM", "1000000000")
+    monkeypatch.setenv("GOOGLE_TPM", "1000000000")
+    monkeypatch.setitem(llm_registry.PROVIDERS, "GOOGLE",
+                        (lambda: FakeChatModel(model_name="fast", output_tokens=50), "model_name"))
+    monkeypatch.setattr(llm_registry, "_clients", {})
+
+    with offline_pipeline(str(tmp_path), latency=2.0, output_tokens=50):
+        start = time.perf_counter()
+        OrchestratorAgent().execute("Hedged Topic")
+        elapsed = time.perf_counter() - start
+
+    # four LLM calls in sequence would take 8s on the slow provider alone
+    assert elapsed < 4
+    with open(tmp_path / "artifacts" / "hedged-topic" / "run.json") as f:
+        run = json.load(f)
+    llm_spans = [span for span in run["spans"] if span["name"].startswith("llm.")]
+    assert llm_spans and all(span["attributes"]["provider"] == "GOOGLE" for span in llm_spans)
+    assert all(span["attributes"]["hedges"] == 1 for span in llm_spans)
+    assert run["router"]["GOOGLE"]["wins"] == len(llm_spans)
+
+
+def test_fallback_models_are_built_once_per_agent(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", PROVIDER)
+    monkeypatch.setitem(llm_registry.PROVIDERS, PROVIDER, (lambda: FakeChatModel(), "model_name"))
+    monkeypatch.setitem(llm_registry.PROVIDERS, "GOOGLE", (lambda: FakeChatModel(model_name="fast"), "model_name"))
+    monkeypatch.setattr(llm_registry, "_clients", {})
+    agent = OrchestratorAgent().scriptwriting_agent
+
+    assert agent._llm_for("GOOGLE") is agent._llm_for("GOOGLE")
+    assert agent._llm_for(PROVIDER) is agent.llm
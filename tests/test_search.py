@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.search import CachedSearch, FixtureBackend, SearchCache, TavilyBackend
+
+RESULTS = [{"url": "http://a.test/", "title": "A", "content": "about a"},
+           {"url": "http://b.test/", "title": "B", "content": "about b"}]
+
+
+class CountingBackend:
+    name = "counting"
+
+    def __init__(self, delay=0.0, results=RESULTS):
+        self.delay = delay
+        self.results = results
+        self.calls = 0
+
+    async def asearch(self, query, max_results):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.results[:max_results]
+
+
+def test_fixture_backend_serves_query_file_or_default(tmp_path):
+    (tmp_path / "quantum-computing.json").write_text(json.dumps({"results": RESULTS}))
+    (tmp_path / "default.json").write_text(json.dumps({"results": RESULTS[1:]}))
+    backend = FixtureBackend(str(tmp_path))
+
+    assert backend.search("Quantum Computing", 5) == RESULTS
+    assert backend.search("Quantum Computing", 1) == RESULTS[:1]
+    assert backend.search("anything else", 5) == RESULTS[1:]
+
+
+def test_repeated_queries_are_served_from_cache_until_they_expire(tmp_path):
+    backend = CountingBackend()
+    cache = SearchCache(path=str(tmp_path / "search.sqlite3"), ttl=60)
+    search = CachedSearch(backend, cache)
+
+    assert asyncio.run(search.asearch("The future of AI")) == RESULTS
+    assert asyncio.run(search.asearch("  the FUTURE of ai ")) == RESULTS
+    # A new process sees the same persistent entries
+    assert asyncio.run(CachedSearch(backend, SearchCache(path=cache.path, ttl=60)).asearch("The future of AI")) == RESULTS
+    assert backend.calls == 1
+
+    expired = CachedSearch(backend, SearchCache(path=cache.path, ttl=0))
+    asyncio.run(expired.asearch("The future of AI"))
+    assert backend.calls == 2
+
+
+def test_concurrent_misses_for_one_query_are_coalesced():
+    backend = CountingBackend(delay=0.2)
+    search = CachedSearch(backend)
+
+    async def main():
+        return await asyncio.gather(*(search.asearch("climate tech") for _ in range(5)))
+
+    assert asyncio.run(main()) == [RESULTS] * 5
+    assert backend.calls == 1
+    assert search.stats["coalesced"] == 4
+
+
+def test_backend_errors_reach_every_waiter():
+    class FailingBackend(CountingBackend):
+        async def asearch(self, query, max_results):
+            await asyncio.sleep(0.1)
+            raise RuntimeError("search down")
+
+    search = CachedSearch(FailingBackend())
+
+    async def main():
+        return await asyncio.gather(*(search.asearch("topic") for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(error, RuntimeError) for error in asyncio.run(main()))
+    with pytest.raises(RuntimeError):
+        asyncio.run(search.asearch("topic"))  # failures are not cached
+
+
+def test_empty_results_are_not_cached(tmp_path):
+    backend = CountingBackend(results=[])
+    search = CachedSearch(backend, SearchCache(path=str(tmp_path / "search.sqlite3"), ttl=60))
+
+    assert asyncio.run(search.asearch("The future of AI")) == []
+    backend.results = RESULTS
+    assert asyncio.run(search.asearch("The future of AI")) == RESULTS
+    assert backend.calls == 2 and search.stats["hits"] == 0
+
+
+def test_tavily_error_responses_raise():
+    with pytest.raises(RuntimeError, match="quota"):
+        TavilyBackend._results({"error": "quota exceeded"})
+    assert TavilyBackend._results({"results": [{"url": "http://a.test/"}]}) == [
+        {"url": "http://a.test/", "title": "", "content": ""}]
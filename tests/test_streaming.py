@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents import ArticleWriterAgent, ScriptwritingAgent
+from src.llm_cache import LLMCache
+from src.telemetry import trace_run
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_PROVIDER", "OPENAI")
+
+
+def _fake_llm(text, cache=None):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=text)]), cache=cache)
+
+
+def test_stream_yields_tokens_and_appends_to_artifact():
+    agent = ScriptwritingAgent()
+    agent.llm = _fake_llm("Intro body outro")
+    output_path = "artifacts/streamed-topic/script.md"
+
+    tokens = []
+    for token in agent.stream("a narrative", "Streamed Topic"):
+        tokens.append(token)
+        # The artifact already holds everything yielded so far
+        with open(output_path) as f:
+            assert f.read() == "".join(tokens)
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Intro body outro"
+
+
+def test_execute_with_callback_streams_and_returns_full_content():
+    agent = ArticleWriterAgent()
+    agent.llm = _fake_llm("Title and some paragraphs")
+    received = []
+
+    result = agent.execute("a narrative", "Streamed Topic", on_token=received.append)
+
+    assert "".join(received) == result["content"] == "Title and some paragraphs"
+    with open("artifacts/streamed-topic/article.md") as f:
+        assert f.read() == result["content"]
+
+
+def test_streamed_replies_use_the_llm_cache(tmp_path):
+    cache = LLMCache("scriptwriting", path=str(tmp_path / "llm.sqlite3"))
+    agent = ScriptwritingAgent()
+    agent.llm = _fake_llm("cached script text", cache=cache)
+    first = "".join(agent.stream("a narrative", "Streamed Topic"))
+
+    # A second model would produce something else; the cached reply wins
+    agent.llm = _fake_llm("different text", cache=cache)
+    second = "".join(agent.stream("a narrative", "Streamed Topic"))
+
+    assert first == second == "cached script text"
+    assert cache.stats["hits"] == 1
+
+
+def test_stream_is_traced_like_other_llm_calls():
+    agent = ArticleWriterAgent()
+    agent.llm = _fake_llm("Title and some paragraphs")
+
+    with trace_run("run") as tracer:
+        text = "".join(agent.stream("a narrative", "Streamed Topic"))
+
+    assert text == "Title and some paragraphs"
+    llm_spans = [s for s in tracer.spans if s.name == "llm.article"]
+    assert len(llm_spans) == 1 and llm_spans[0].attributes["streamed"] is True
+    assert tracer.totals()["llm_calls"] == 1
+
+
+def test_closing_the_stream_early_cancels_the_llm_call():
+    agent = ScriptwritingAgent()
+    agent.llm = _fake_llm("one two three four five six")
+
+    stream = agent.stream("a narrative", "Streamed Topic")
+    first = next(stream)
+    stream.close()
+    time.sleep(0.1)
+
+    with open("artifacts/streamed-topic/script.md") as f:
+        assert f.read() == first
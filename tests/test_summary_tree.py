@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import offline_pipeline
+from src.agents import OrchestratorAgent
+from src.summary_tree import LevelCache, reduce_calls
+
+
+def test_reduce_calls_shrink_geometrically_until_the_target_fits():
+    assert reduce_calls(500, 256, 4000, 3000, max_depth=4) == [34, 3]
+    assert reduce_calls(10, 256, 4000, 3000, max_depth=4) == []
+    assert reduce_calls(500, 256, 4000, 3000, max_depth=1) == [34]
+    assert reduce_calls(500, 256, 300, 3000, max_depth=4) == []  # one summary per request cannot shrink
+
+
+def test_level_cache_keeps_only_levels_used_by_the_last_run(tmp_path):
+    path = str(tmp_path / "summary_tree.json")
+    cache = LevelCache(path)
+    first, second = cache.key("t", "m", 256, ["a", "b"]), cache.key("t", "m", 256, ["c"])
+    cache.put(first, 0, ["ab"])
+    cache.put(second, 1, ["c"])
+    cache.save()
+
+    reopened = LevelCache(path)
+    assert reopened.get(first) == ["ab"]
+    assert reopened.get(cache.key("t", "m", 128, ["a", "b"])) is None
+    reopened.save()
+    assert [level["key"] for level in json.load(open(path))] == [first]
+
+
+def _llm_spans(topic_dir):
+    with open(topic_dir / "run.json") as f:
+        run = json.load(f)
+    return run, [span["name"] for span in run["spans"] if span["name"].startswith("llm.")]
+
+
+def test_large_research_is_tree_reduced_and_levels_are_reused(tmp_path, monkeypatch):
+    # Lift the selection cap and make every chunk its own request, with room for ~100 tokens of summaries
+    for name, value in {"SUMMARY_TOP_K": "0", "SUMMARY_TOKEN_BUDGET": "0", "CHUNK_MAX_TOKENS": "300",
+                        "NARRATIVE_INPUT_TOKENS": "100"}.items():
+        monkeypatch.setenv(name, value)
+    topic_dir = tmp_path / "artifacts" / "tree-topic"
+    with offline_pipeline(str(tmp_path), output_tokens=50):
+        OrchestratorAgent().execute("Tree Topic", force=True)
+        first_run, first_calls = _llm_spans(topic_dir)
+        OrchestratorAgent().execute("Tree Topic", force=True)
+        run, second_calls = _llm_spans(topic_dir)
+
+    assert first_calls.count("llm.summary") > 4
+    assert first_calls.count("llm.reduce") >= 1
+    assert first_calls.count("llm.narrative") == 1
+    # the rerun reads every level from summary_tree.json even though the LLM cache is off
+    assert "llm.summary" not in second_calls and "llm.reduce" not in second_calls
+    levels = lambda run: [span for span in run["spans"] if span["name"] == "summary.level"]
+    assert len(levels(run)) == len(levels(first_run)) >= 2
+    assert all(span["attributes"].get("cached") for span in levels(run))
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.harness import offline_pipeline
+from src.agents import OrchestratorAgent
+from src.dag import DagExecutor, Stage
+from src.telemetry import NULL_SPAN, span, trace_run
+
+
+def test_spans_nest_across_dag_stage_tasks():
+    def work(name):
+        with span("work", name=name) as s:
+            s.add("bytes", 10)
+        return name
+
+    stages = [Stage("a", lambda: work("a")), Stage("b", lambda a: work("b"), inputs=["a"])]
+    with trace_run("run") as tracer:
+        with span("outer"):
+            asyncio.run(DagExecutor(stages).arun())
+
+    run = tracer.to_dict()
+    outer = next(s for s in run["spans"] if s["name"] == "outer")
+    work_spans = [s for s in run["spans"] if s["name"] == "work"]
+    assert [s["parent"] for s in work_spans] == [outer["id"], outer["id"]]
+    assert all(s["duration"] is not None for s in run["spans"])
+
+
+def test_spans_are_noops_outside_a_run():
+    with span("orphan") as s:
+        s.set(bytes=1)
+    assert s is NULL_SPAN
+
+
+def test_errors_are_recorded_on_the_failing_span():
+    with pytest.raises(ValueError):
+        with trace_run("run") as tracer:
+            with span("fails"):
+                raise ValueError("boom")
+    assert "boom" in tracer.spans[1].error
+    assert "boom" in tracer.root.error
+
+
+def test_pipeline_writes_run_json(tmp_path):
+    with offline_pipeline(str(tmp_path), output_tokens=20) as server:
+        result = OrchestratorAgent().execute("Traced Topic")
+
+    with open(tmp_path / "artifacts" / "traced-topic" / "run.json") as f:
+        run = json.load(f)
+    names = Counter(s["name"] for s in run["spans"])
+    pages = len(server.urls())
+    assert names["search"] == 1
+    assert names["fetch"] == names["extract"] == pages
+    assert names["llm.summary"] == 1 and names["llm.narrative"] == 1
+    assert names["llm.script"] == names["llm.article"] == names["llm.visual_assets"] == 1
+    assert names["stage.research"] == 1
+    assert run["totals"]["llm_calls"] == 5
+    assert run["totals"]["bytes_fetched"] == sum(os.path.getsize(os.path.join(server.directory, name))
+                                                 for name in os.listdir(server.directory))
+    # Analysis token usage now covers the summarization calls as well as the narrative
+    analysis = result["token_usage"]["analysis"]
+    assert analysis["completion_tokens"] == 40
+    assert result["telemetry"]["completion_tokens"] == 100
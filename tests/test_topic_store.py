@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.topic_store import TopicStore, akeep_alive
+
+
+def _write_topics(path, statuses):
+    topics = [{"id": f"topic-{i}", "title": f"Topic {i}", "description": "", "status": status,
+               "created_at": "2025-08-09", "completed_at": None} for i, status in enumerate(statuses)]
+    with open(path, "w") as f:
+        json.dump({"topics": topics}, f)
+
+
+def test_json_round_trip_and_stale_in_progress(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["completed", "in_progress", "new"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"))
+
+    assert store.import_json(topics_path) == 3
+    assert store.import_json(topics_path) == 0
+
+    # The lease-less in_progress topic is reclaimed before the new one
+    claimed = store.claim("worker", limit=5)
+    assert [t["id"] for t in claimed] == ["topic-1", "topic-2"]
+
+    store.complete("topic-1", "worker")
+    store.export_json(topics_path)
+    with open(topics_path) as f:
+        exported = {t["id"]: t for t in json.load(f)["topics"]}
+    assert exported["topic-1"]["status"] == "completed" and exported["topic-1"]["completed_at"]
+    assert exported["topic-2"]["status"] == "in_progress"
+    assert set(exported["topic-0"]) == {"id", "title", "description", "status", "created_at", "completed_at"}
+
+
+def test_concurrent_claims_never_overlap(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["new"] * 40)
+    db_path = str(tmp_path / "topics.sqlite3")
+    TopicStore(path=db_path).import_json(topics_path)
+
+    claimed = []
+
+    def worker(name):
+        store = TopicStore(path=db_path)  # separate connection, as in another process
+        while True:
+            batch = store.claim(name, limit=3)
+            if not batch:
+                return
+            claimed.extend(t["id"] for t in batch)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(f"topic-{i}" for i in range(40))
+
+
+def test_expired_leases_return_to_new_then_fail(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["new"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"), lease_seconds=-1, max_attempts=2)
+    store.import_json(topics_path)
+
+    assert store.claim("crashed")
+    assert [t["id"] for t in store.claim("second")] == ["topic-0"]
+    assert store.claim("third") == []
+    assert store.get("topic-0")["status"] == "failed"
+
+
+def test_heartbeat_and_complete_require_the_lease(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["new"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"))
+    store.import_json(topics_path)
+    store.claim("owner")
+
+    assert store.heartbeat("topic-0", "owner")
+    assert not store.heartbeat("topic-0", "intruder")
+    assert not store.complete("topic-0", "intruder")
+    assert store.complete("topic-0", "owner")
+    assert store.count("completed") == 1
+
+
+def test_export_keeps_topics_added_and_edits_made_during_a_run(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["new", "failed"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"))
+    store.import_json(topics_path)
+    store.claim("worker")
+    store.export_json(topics_path)
+
+    # Someone appends a topic and retries the failed one while topic-0 runs
+    with open(topics_path) as f:
+        data = json.load(f)
+    data["topics"][1]["status"] = "new"
+    data["topics"].append({"id": "added", "title": "Added", "description": "", "status": "new"})
+    with open(topics_path, "w") as f:
+        json.dump(data, f)
+
+    store.complete("topic-0", "worker")
+    store.export_json(topics_path)
+    with open(topics_path) as f:
+        exported = {t["id"]: t["status"] for t in json.load(f)["topics"]}
+    assert exported == {"topic-0": "completed", "topic-1": "new", "added": "new"}
+    assert [t["id"] for t in store.claim("worker", limit=5)] == ["topic-1", "added"]
+
+
+def test_pending_count_includes_expired_leases(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["in_progress", "in_progress", "completed"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"))
+    store.import_json(topics_path)
+
+    assert store.count("new") == 2
+
+
+def test_async_heartbeat_renews_the_lease_without_blocking_the_loop(tmp_path):
+    topics_path = str(tmp_path / "topics.json")
+    _write_topics(topics_path, ["new"])
+    store = TopicStore(path=str(tmp_path / "topics.sqlite3"), lease_seconds=0.3)
+    store.import_json(topics_path)
+    store.claim("owner")
+    beats = []
+    heartbeat = store.heartbeat
+    store.heartbeat = lambda *args: beats.append(args) or heartbeat(*args)
+
+    async def run():
+        ticks = 0
+        async with akeep_alive(store, "topic-0", "owner"):
+            for _ in range(25):
+                await asyncio.sleep(0.01)
+                ticks += 1
+        return ticks
+
+    assert asyncio.run(run()) == 25
+    assert beats and store.complete("topic-0", "owner")